@@ -1,13 +1,22 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from app.realtime import ChatBroker
+from app.cache import Cache
+from app.audit import AuditWriter
+from app.pool import engine_options, is_memory_sqlite
+from app.routing import ReplicaRouter, RoutingSession
 # from flask_migrate import Migrate
 import os
 from dotenv import load_dotenv
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
+replicas = ReplicaRouter()
+broker = ChatBroker()
+cache = Cache()
+audit = AuditWriter()
 
 def create_app():
     # Load environment variables
@@ -20,42 +29,53 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['DATABASE_REPLICA_URLS'] = [url for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url]
+    app.config['CHAT_BROKER_URL'] = os.getenv('CHAT_BROKER_URL', 'memory://')
+    app.config['SEARCH_INDEX_PATH'] = os.getenv('SEARCH_INDEX_PATH', os.path.join(app.instance_path, 'job_search.idx'))
+    app.config['CACHE_URL'] = os.getenv('CACHE_URL', 'memory://')
+    app.config['AUDIT_ASYNC'] = os.getenv('AUDIT_ASYNC', '1') != '0'
+    app.config['NOTIFICATION_DIGEST'] = os.getenv('NOTIFICATION_DIGEST', '0') == '1'
+    app.config['WARM_JOB_INDEXES'] = os.getenv('WARM_JOB_INDEXES', '1') == '1'
     
-    # Initialize extensions with app
+    # Initialize extensions with app (replica binds must be registered before db)
+    replicas.init_app(app)
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'main.login'
     login_manager.login_message = 'Please login to access this page.'
+    broker.init_app(app)
+    cache.init_app(app)
+    audit.init_app(app)
     
     # Register blueprints
     from app.routes import main
     app.register_blueprint(main)
     
-    # Create database tables, views, and triggers
-    with app.app_context():
-        db.create_all()
-        
-        # Import after db is initialized
-        from app.models import create_all_views, create_email_validation_trigger
-        
-        # Create database views for admin dashboard
-        create_all_views()
-        
-        # Create email validation triggers
-        create_email_validation_trigger()
-        
-        # Create default admin user if not exists
-        from app.models import User
-        admin = User.query.filter_by(email='admin@colabify.com').first()
-        if not admin:
-            admin = User(
-                username='admin',
-                email='admin@colabify.com',
-                user_type='admin'
-            )
-            admin.set_password('admin123')  # Change this in production!
-            db.session.add(admin)
-            db.session.commit()
-            print("✅ Default admin user created: admin@colabify.com / admin123")
+    # Count each request's queries and flag probable N+1 patterns
+    from app.instrumentation import init_instrumentation
+    init_instrumentation(app)
+    
+    # Warm the job search index from its last snapshot
+    from app.search import init_search
+    init_search(app)
+    
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+    
+    # Schema changes are applied by `flask bootstrap-db` (or run.py), never by each worker;
+    # an in-memory database only lives in this process, so it is built here
+    if is_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        from app.schema import bootstrap_schema
+        with app.app_context():
+            bootstrap_schema()
+    
+    # Build the recommender and other job indexes now, not on the first request that needs them
+    # (WARM_JOB_INDEXES=0 skips it, e.g. for one-off flask commands)
+    if app.config['WARM_JOB_INDEXES']:
+        from app.jobsync import warm_job_indexes
+        with app.app_context():
+            warm_job_indexes()
     
     return app
\ No newline at end of file
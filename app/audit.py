@@ -0,0 +1,186 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+
+# ============= BATCHED AUDIT WRITER =============
+
+class AuditWriter:
+    """Queues audit rows and inserts them from a background thread in multi-row batches.
+
+    A batch is written as soon as AUDIT_BATCH_SIZE rows are waiting, and
+    whatever is waiting at least every AUDIT_FLUSH_INTERVAL seconds. The queue is bounded: when it
+    is full the caller waits up to AUDIT_ENQUEUE_TIMEOUT for room, then
+    writes its own row inline, so a stalled database slows requests down
+    rather than growing memory or losing rows. A failed write is retried
+    AUDIT_WRITE_ATTEMPTS times with doubling backoff, then row by row, so
+    only rows the database keeps rejecting are dropped. Whatever is queued
+    at interpreter exit is flushed before the process ends.
+    """
+
+    def __init__(self, app=None):
+        self._app = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._tags = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {'queued': 0, 'written': 0, 'batches': 0, 'inline': 0, 'errors': 0, 'retries': 0,
+                       'dropped': 0}
+        self.enabled = True
+        self.write_attempts = 3
+        self.retry_backoff = 0.5
+        # Once per writer; init_app runs for every app the factory creates
+        atexit.register(self.close)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._app = app
+        self.enabled = app.config.setdefault('AUDIT_ASYNC', True)
+        self.batch_size = app.config.setdefault('AUDIT_BATCH_SIZE', 200)
+        self.flush_interval = app.config.setdefault('AUDIT_FLUSH_INTERVAL', 1.0)
+        self.queue_size = app.config.setdefault('AUDIT_QUEUE_SIZE', 10000)
+        self.enqueue_timeout = app.config.setdefault('AUDIT_ENQUEUE_TIMEOUT', 0.05)
+        self.write_attempts = app.config.setdefault('AUDIT_WRITE_ATTEMPTS', 3)
+        self.retry_backoff = app.config.setdefault('AUDIT_RETRY_BACKOFF', 0.5)
+        app.extensions['audit'] = self
+
+    def invalidates(self, model, *tags):
+        """Cache tags to invalidate after rows of model are written (bulk inserts skip mapper events)"""
+        self._tags[model.__table__.name] = tags
+
+    def _count(self, counter, amount=1):
+        with self._stats_lock:
+            self._stats[counter] += amount
+
+    def stats(self):
+        """Counters for this process since it started"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize() if self._queue is not None else 0
+        stats['async'] = self.enabled
+        return stats
+
+    # ----- producing -----
+
+    def record(self, model, **values):
+        """Queue one row for model's table; never raises into the caller's request"""
+        row = (model.__table__, values)
+        if not self.enabled:
+            self._write([row])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._count('inline')
+            self._write([row])
+            return
+        self._count('queued')
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def _ensure_started(self):
+        # Threads do not survive a fork, so a pre-forked worker starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    # ----- consuming -----
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def _drain(self):
+        rows = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def flush(self):
+        """Write everything queued so far; safe to call from any thread"""
+        if self._queue is None or self._pid != os.getpid():
+            return
+        with self._flush_lock:
+            rows = self._drain()
+            while rows:
+                self._write(rows)
+                rows = self._drain()
+
+    def _write(self, rows):
+        """Insert rows, retrying with backoff; a batch that still fails is written row by row"""
+        error = None
+        for attempt in range(self.write_attempts):
+            if attempt:
+                self._count('retries')
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            error = self._insert(rows)
+            if error is None:
+                return
+        self._count('errors')
+        print(f"❌ Error writing {len(rows)} audit rows: {str(error)}")
+        dropped = len(rows)
+        if len(rows) > 1:
+            # One row the database rejects must not take the rest of the batch with it
+            dropped = sum(1 for row in rows if self._insert([row]) is not None)
+        self._count('dropped', dropped)
+
+    def _insert(self, rows):
+        """One multi-row INSERT per table, then invalidate their cache tags; returns the error, if any"""
+        from app import db, cache
+
+        by_table = {}
+        for table, values in rows:
+            by_table.setdefault(table, []).append(values)
+        tags = set()
+        try:
+            with self._app.app_context():
+                with db.engine.begin() as connection:
+                    for table, table_rows in by_table.items():
+                        # A multi-VALUES insert needs the same columns in every row
+                        columns = sorted({column for values in table_rows for column in values})
+                        connection.execute(table.insert().values([
+                            {column: values.get(column) for column in columns} for values in table_rows
+                        ]))
+                        tags.update(self._tags.get(table.name, ()))
+        except Exception as e:
+            return e
+        self._count('written', len(rows))
+        self._count('batches')
+        if tags:
+            cache.invalidate(*sorted(tags))
+        return None
+
+    def close(self, timeout=10):
+        """Stop the writer thread after it has flushed the queue"""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join(timeout)
+        self._thread = None
+        # Anything queued after the thread's last drain
+        self.flush()
+
@@ -0,0 +1,344 @@
+import functools
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import request, session
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.routing import replica_cache_timeout
+
+MISSING = object()
+
+
+# ============= BACKENDS =============
+
+class MemoryCache:
+    """In-process LRU with per-entry TTL. Entries are only shared within one worker process.
+
+    Tags are invalidated by bumping a version number; an entry stored under
+    an older version of any of its tags is treated as missing.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tag_versions = {}
+
+    def tag_versions(self, tags):
+        with self._lock:
+            return tuple((tag, self._tag_versions.get(tag, 0)) for tag in tags)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, versions, value = entry
+            if expires_at < time.monotonic() or any(
+                self._tag_versions.get(tag, 0) != version for tag, version in versions
+            ):
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout, versions):
+        """Store an entry; returns how many entries were evicted to make room"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, versions, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """Entries pickled into a SQLite file, shared by every worker process on the host"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            tags TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed ON cache_entries (accessed_at);
+        CREATE TABLE IF NOT EXISTS cache_tags (
+            tag TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+    """
+
+    # Refreshing the LRU position is a write, so do it at most this often per entry
+    TOUCH_INTERVAL = 1.0
+
+    def __init__(self, path, max_entries=1024):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _current_versions(self, connection, tags):
+        if not tags:
+            return {}
+        placeholders = ','.join('?' * len(tags))
+        return dict(connection.execute(
+            f'SELECT tag, version FROM cache_tags WHERE tag IN ({placeholders})', list(tags)
+        ).fetchall())
+
+    def tag_versions(self, tags):
+        current = self._current_versions(self._connection(), tags)
+        return tuple((tag, current.get(tag, 0)) for tag in tags)
+
+    def get(self, key):
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT value, tags, expires_at, accessed_at FROM cache_entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return MISSING
+        value, tags, expires_at, accessed_at = row
+        versions = json.loads(tags)
+        now = time.time()
+        current = self._current_versions(connection, [tag for tag, version in versions])
+        if expires_at < now or any(current.get(tag, 0) != version for tag, version in versions):
+            connection.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+            return MISSING
+        if now - accessed_at > self.TOUCH_INTERVAL:
+            connection.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, key))
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout, versions):
+        """Store an entry; returns how many entries were evicted to make room"""
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, tags, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), json.dumps(versions), now + timeout, now)
+        )
+        (count,) = connection.execute('SELECT COUNT(*) FROM cache_entries').fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        connection.execute('DELETE FROM cache_entries WHERE expires_at < ?', (now,))
+        (count,) = connection.execute('SELECT COUNT(*) FROM cache_entries').fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            connection.execute(
+                'DELETE FROM cache_entries WHERE key IN '
+                '(SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)', (excess,)
+            )
+            return excess
+        return 0
+
+    def invalidate(self, tags):
+        self._connection().executemany(
+            'INSERT INTO cache_tags (tag, version) VALUES (?, 1) '
+            'ON CONFLICT (tag) DO UPDATE SET version = version + 1',
+            [(tag,) for tag in tags]
+        )
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entries')
+
+
+# ============= CACHE FACADE =============
+
+class Cache:
+    """Tagged cache for route responses and query results with hit/miss/eviction counters"""
+
+    def __init__(self, app=None):
+        self._backend = None
+        self.default_timeout = 60
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'errors': 0}
+        self._session_hooks_installed = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        url = app.config.setdefault('CACHE_URL', 'memory://')
+        max_entries = app.config.setdefault('CACHE_MAX_ENTRIES', 1024)
+        self.default_timeout = app.config.setdefault('CACHE_DEFAULT_TIMEOUT', 60)
+        if url.startswith('memory://'):
+            self._backend = MemoryCache(max_entries)
+        elif url.startswith('sqlite:///'):
+            self._backend = SQLiteCache(url[len('sqlite:///'):], max_entries)
+        else:
+            raise ValueError(f'Unsupported CACHE_URL: {url}')
+        app.extensions['cache'] = self
+
+    def _count(self, counter, amount=1):
+        with self._stats_lock:
+            self._stats[counter] += amount
+
+    def stats(self):
+        """Counters for this process since it started"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+        stats['backend'] = type(self._backend).__name__
+        return stats
+
+    def tag_versions(self, tags):
+        try:
+            return self._backend.tag_versions(tuple(tags))
+        except Exception as e:
+            self._count('errors')
+            print(f"❌ Error reading cache tags: {str(e)}")
+            return None
+
+    def get(self, key):
+        """Return the cached value, or MISSING"""
+        try:
+            value = self._backend.get(key)
+        except Exception as e:
+            self._count('errors')
+            print(f"❌ Error reading cache: {str(e)}")
+            value = MISSING
+        self._count('misses' if value is MISSING else 'hits')
+        return value
+
+    def set(self, key, value, timeout=None, tags=(), versions=None):
+        """Store a value. Pass versions read before computing it so concurrent invalidations win."""
+        if versions is None:
+            versions = self.tag_versions(tags)
+            if versions is None:
+                return
+        timeout = timeout or self.default_timeout
+        # A replica read may predate an invalidation that already happened on the primary
+        replica_timeout = replica_cache_timeout()
+        if replica_timeout is not None:
+            timeout = min(timeout, replica_timeout)
+        try:
+            evicted = self._backend.set(key, value, timeout, versions)
+            if evicted:
+                self._count('evictions', evicted)
+        except Exception as e:
+            self._count('errors')
+            print(f"❌ Error writing cache: {str(e)}")
+
+    def invalidate(self, *tags):
+        if not tags:
+            return
+        try:
+            self._backend.invalidate(tags)
+            self._count('invalidations', len(tags))
+        except Exception as e:
+            self._count('errors')
+            print(f"❌ Error invalidating cache tags: {str(e)}")
+
+    def clear(self):
+        self._backend.clear()
+
+    def _get_or_compute(self, key, compute, timeout, tags):
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        versions = self.tag_versions(tags)
+        value = compute()
+        if versions is not None:
+            self.set(key, value, timeout, versions=versions)
+        return value
+
+    def memoize(self, timeout=None, tags=()):
+        """Cache a function's return value per arguments; the value must be picklable plain data"""
+        def decorator(f):
+            prefix = f'{f.__module__}.{f.__qualname__}'
+
+            @functools.wraps(f)
+            def wrapper(*args, **kwargs):
+                key = f'memo:{prefix}:{args!r}:{sorted(kwargs.items())!r}'
+                return self._get_or_compute(key, lambda: f(*args, **kwargs), timeout, tags)
+            return wrapper
+        return decorator
+
+    def cached_view(self, timeout=None, tags=(), vary=None):
+        """Cache a GET view's rendered HTML per URL (and per vary() value, e.g. the viewer).
+
+        Only string responses are stored, so redirects and error paths pass
+        through, and requests with pending flash messages skip the cache so
+        the messages are rendered exactly once.
+        """
+        def decorator(f):
+            @functools.wraps(f)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET' or session.get('_flashes'):
+                    return f(*args, **kwargs)
+                key = f'view:{request.endpoint}:{request.full_path}:{vary() if vary else ""!r}'
+                value = self.get(key)
+                if value is not MISSING:
+                    return value
+                versions = self.tag_versions(tags)
+                response = f(*args, **kwargs)
+                if isinstance(response, str) and versions is not None and not session.get('_flashes'):
+                    self.set(key, response, timeout, versions=versions)
+                return response
+            return wrapper
+        return decorator
+
+    # ----- invalidation from model writes -----
+
+    def invalidate_on_write(self, model, *tags):
+        """Invalidate tags after any committed insert, update or delete of model.
+
+        Query.update() and Core statements skip these mapper events, so their
+        write sites call invalidate_on_commit() themselves.
+        """
+        def mark(mapper, connection, target):
+            session = Session.object_session(target)
+            if session is not None:
+                self.invalidate_on_commit(session, *tags)
+
+        for name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(model, name, mark)
+        self._install_session_hooks()
+
+    def invalidate_on_commit(self, session, *tags):
+        """Invalidate tags once session commits; dropped if it rolls back"""
+        session.info.setdefault('cache_tags', set()).update(tags)
+        self._install_session_hooks()
+
+    def _install_session_hooks(self):
+        if not self._session_hooks_installed:
+            event.listen(Session, 'after_commit', self._invalidate_committed)
+            event.listen(Session, 'after_rollback', self._discard_pending)
+            self._session_hooks_installed = True
+
+    def _invalidate_committed(self, session):
+        tags = session.info.pop('cache_tags', None)
+        if tags and self._backend is not None:
+            self.invalidate(*sorted(tags))
+
+    def _discard_pending(self, session):
+        session.info.pop('cache_tags', None)
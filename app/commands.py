@@ -0,0 +1,117 @@
+import click
+
+
+def register_commands(app):
+    """Register maintenance commands on the flask CLI"""
+    
+    @app.cli.command('bootstrap-db')
+    def bootstrap_db_command():
+        """Create or upgrade the schema by applying every pending migration"""
+        from app.schema import bootstrap_schema
+        try:
+            applied = bootstrap_schema()
+        except Exception as e:
+            raise click.ClickException(f'Bootstrap stopped: {str(e)}')
+        click.echo(f"✅ Applied {len(applied)} migrations")
+    
+    @app.cli.command('schema-status')
+    def schema_status_command():
+        """List the migrations this database has not applied yet"""
+        from app.schema import pending_migrations
+        pending = pending_migrations()
+        for version, name in pending:
+            click.echo(f"   pending {version}: {name}")
+        click.echo(f"✅ {len(pending)} pending migrations")
+    
+    @app.cli.command('backfill-read-watermarks')
+    def backfill_read_watermarks_command():
+        """Initialize conversation read watermarks from Message.is_read"""
+        from app.models import backfill_read_watermarks
+        updated = backfill_read_watermarks()
+        click.echo(f"✅ Advanced {updated} read watermarks")
+    
+    @app.cli.command('reconcile-unread-counters')
+    def reconcile_unread_counters_command():
+        """Repair drift in the denormalized navbar unread counters"""
+        from app.models import reconcile_unread_counters
+        repaired = reconcile_unread_counters()
+        click.echo(f"✅ Repaired unread counters for {repaired} users")
+    
+    @app.cli.command('backfill-conversation-summaries')
+    def backfill_conversation_summaries_command():
+        """Fill the inbox last-message columns for existing conversations"""
+        from app.models import backfill_conversation_summaries
+        updated = backfill_conversation_summaries()
+        click.echo(f"✅ Filled last-message summaries for {updated} conversations")
+    
+    @app.cli.command('backfill-notification-last-seen')
+    def backfill_notification_last_seen_command():
+        """Date existing notifications for the coalesced notification list"""
+        from app.models import backfill_notification_last_seen
+        updated = backfill_notification_last_seen()
+        click.echo(f"✅ Dated {updated} notifications")
+    
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Re-index every job and write a fresh search index snapshot"""
+        from app.search import rebuild_search_index
+        indexed = rebuild_search_index()
+        click.echo(f"✅ Indexed {indexed} jobs")
+    
+    @app.cli.command('precompute-recommendations')
+    @click.option('--top', default=20, show_default=True, help='Jobs to store per freelancer.')
+    def precompute_recommendations_command(top):
+        """Batch-compute job recommendations for every freelancer with applications"""
+        from app.recommend import precompute_recommendations
+        stored = precompute_recommendations(top)
+        click.echo(f"✅ Stored recommendations for {stored} freelancers")
+    
+    @app.cli.command('backfill-job-skills')
+    @click.option('--batch-size', default=500, show_default=True, help='Jobs to process per transaction.')
+    def backfill_job_skills_command(batch_size):
+        """Parse existing jobs' skills_required into the normalized skill tables"""
+        from app.models import backfill_job_skills
+        updated = backfill_job_skills(batch_size)
+        click.echo(f"✅ Linked skills for {updated} jobs")
+    
+    @app.cli.command('rebuild-summary-stats')
+    def rebuild_summary_stats_command():
+        """Correct the admin summary table from the base tables and report any drift"""
+        from app.stats import rebuild_summary_stats
+        drift = rebuild_summary_stats()
+        for (scope, bucket), found, expected in drift:
+            click.echo(f"❌ {scope}/{bucket}: stored {found}, actual {expected}")
+        click.echo(f"✅ Rebuilt summary statistics ({len(drift)} drifted buckets)")
+    
+    @app.cli.command('backfill-activity-events')
+    def backfill_activity_events_command():
+        """Log job posts and applications made before the activity log existed"""
+        from app.models import backfill_activity_events
+        added = backfill_activity_events()
+        click.echo(f"✅ Logged {added} past activity events")
+    
+    @app.cli.command('reconcile-application-counts')
+    def reconcile_application_counts_command():
+        """Repair drift in the per-job application counters"""
+        from app.models import reconcile_application_counts
+        repaired = reconcile_application_counts()
+        click.echo(f"✅ Repaired application counts for {repaired} jobs")
+    
+    @app.cli.command('apply-retention')
+    @click.option('--table', 'tables', multiple=True, help='Only this table (repeatable).')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Rows to move per transaction.')
+    @click.option('--pause', default=0.1, show_default=True, help='Seconds to sleep between chunks.')
+    @click.option('--no-archive', is_flag=True, help='Delete expired rows instead of archiving them.')
+    @click.option('--dry-run', is_flag=True, help='Only count the expired rows.')
+    def apply_retention_command(tables, chunk_size, pause, no_archive, dry_run):
+        """Move rows past their retention period into the archive tables"""
+        from app.retention import apply_retention
+        results = apply_retention(
+            app.config.get('RETENTION_DAYS'), only=tables, archive=not no_archive,
+            chunk_size=chunk_size, pause=pause, dry_run=dry_run
+        )
+        for table, rows in results:
+            if dry_run:
+                click.echo(f"✅ {table}: {rows} rows past retention")
+            else:
+                click.echo(f"✅ {table}: moved {rows} rows")
@@ -0,0 +1,115 @@
+import re
+import sqlite3
+from functools import lru_cache
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from app import db
+
+# Dialects with view and trigger DDL below; the app runs on MySQL, SQLite is for local and CI runs
+SUPPORTED_DIALECTS = ('mysql', 'sqlite')
+
+
+# ============= SQLITE FUNCTIONS =============
+
+@lru_cache(maxsize=64)
+def _compiled(pattern):
+    return re.compile(pattern)
+
+
+def _regexp(pattern, value):
+    # SQLite runs `value REGEXP pattern` as regexp(pattern, value)
+    if pattern is None or value is None:
+        return None
+    return _compiled(pattern).search(value) is not None
+
+
+@event.listens_for(Engine, 'connect')
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    """SQLite has the REGEXP operator but no implementation; supply MySQL's (search anywhere)"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function('REGEXP', 2, _regexp, deterministic=True)
+
+
+# ============= PORTABLE DDL =============
+
+def supported():
+    """Whether this database gets the views and triggers below"""
+    return db.engine.dialect.name in SUPPORTED_DIALECTS
+
+
+def _dialect():
+    name = db.engine.dialect.name
+    if name not in SUPPORTED_DIALECTS:
+        raise RuntimeError(f'No view or trigger DDL for {name}: run Collabify on MySQL (or SQLite for local '
+                           f'runs), or check ddl.supported() and skip the views and triggers')
+    return name
+
+
+def sql_string(value):
+    """A string literal; MySQL also treats backslashes in literals as escapes"""
+    value = value.replace("'", "''")
+    if _dialect() == 'mysql':
+        value = value.replace('\\', '\\\\')
+    return f"'{value}'"
+
+
+def sql_concat(*parts):
+    """Concatenate SQL expressions (SQLite before 3.44 has no CONCAT())"""
+    if _dialect() == 'mysql':
+        return f"CONCAT({', '.join(parts)})"
+    return f"({' || '.join(parts)})"
+
+
+def create_view(name, select_sql):
+    """Create or replace a view"""
+    if _dialect() == 'sqlite':
+        db.session.execute(text(f'DROP VIEW IF EXISTS {name}'))
+        db.session.execute(text(f'CREATE VIEW {name} AS {select_sql}'))
+    else:
+        db.session.execute(text(f'CREATE OR REPLACE VIEW {name} AS {select_sql}'))
+
+
+def create_regexp_check_trigger(name, table, action, column, pattern, error_message):
+    """(Re)create a BEFORE INSERT/UPDATE trigger rejecting rows whose column does not match pattern"""
+    dialect = _dialect()
+    db.session.execute(text(f'DROP TRIGGER IF EXISTS {name}'))
+    if dialect == 'mysql':
+        # Like SQLite's UPDATE OF, only check updates that change the column
+        changed = f'NOT NEW.{column} <=> OLD.{column} AND ' if action == 'UPDATE' else ''
+        db.session.execute(text(f"""
+            CREATE TRIGGER {name}
+            BEFORE {action} ON {table}
+            FOR EACH ROW
+            BEGIN
+                IF {changed}NEW.{column} NOT REGEXP {sql_string(pattern)} THEN
+                    SIGNAL SQLSTATE '45000'
+                    SET MESSAGE_TEXT = {sql_string(error_message)};
+                END IF;
+            END
+        """))
+    else:
+        # UPDATE OF keeps the unread counter updates on users from running the regex
+        event_clause = f'UPDATE OF {column}' if action == 'UPDATE' else action
+        db.session.execute(text(f"""
+            CREATE TRIGGER {name}
+            BEFORE {event_clause} ON {table}
+            FOR EACH ROW
+            WHEN NEW.{column} NOT REGEXP {sql_string(pattern)}
+            BEGIN
+                SELECT RAISE(ABORT, {sql_string(error_message)});
+            END
+        """))
+
+
+def set_not_null(column):
+    """Add NOT NULL to an existing column; returns False on SQLite, which cannot alter a column"""
+    name = db.engine.dialect.name
+    table = column.table.name
+    if name == 'sqlite':
+        return False
+    if name == 'mysql':
+        column_type = column.type.compile(dialect=db.engine.dialect)
+        db.session.execute(text(f'ALTER TABLE {table} MODIFY {column.name} {column_type} NOT NULL'))
+    else:
+        db.session.execute(text(f'ALTER TABLE {table} ALTER COLUMN {column.name} SET NOT NULL'))
+    return True
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from datetime import datetime
+from flask import Response, stream_with_context
+from app import db
+from app.models import User, Job, Application, EmailValidationLog
+
+
+# ============= STREAMING EXPORTS =============
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_queries():
+    """kind -> (column labels, query); plain column tuples, never ORM entities"""
+    return {
+        'users': db.session.query(
+            User.id, User.username, User.email, User.user_type, User.created_at
+        ).filter(User.user_type != 'admin').order_by(User.id),
+        'jobs': db.session.query(
+            Job.id, Job.title, User.username.label('recruiter'), Job.budget, Job.duration,
+            Job.location, Job.status, Job.application_count, Job.created_at
+        ).join(User, User.id == Job.recruiter_id).order_by(Job.id),
+        'applications': db.session.query(
+            Application.id, Application.job_id, Job.title.label('job_title'),
+            User.username.label('freelancer'), Application.proposed_rate, Application.status,
+            Application.created_at
+        ).join(Job, Job.id == Application.job_id).join(
+            User, User.id == Application.freelancer_id
+        ).order_by(Application.id),
+        'email-logs': db.session.query(
+            EmailValidationLog.id, EmailValidationLog.email, EmailValidationLog.is_valid,
+            EmailValidationLog.validation_message, EmailValidationLog.action_type,
+            EmailValidationLog.attempted_at
+        ).order_by(EmailValidationLog.id),
+    }
+
+
+EXPORT_KINDS = ('users', 'jobs', 'applications', 'email-logs')
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_lines(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_plain(value) for value in row])
+        # Hand the worker a chunk every batch so memory stays flat
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_lines(columns, rows):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps({column: _plain(value) for column, value in zip(columns, row)}))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+
+def export_response(kind, fmt):
+    """Stream every row of an admin list as CSV or NDJSON in constant memory"""
+    query = _export_queries()[kind]
+    columns = [description['name'] for description in query.column_descriptions]
+    rows = query.yield_per(EXPORT_BATCH_SIZE)
+    if fmt == 'csv':
+        body, mimetype = _csv_lines(columns, rows), 'text/csv'
+    else:
+        body, mimetype = _ndjson_lines(columns, rows), 'application/x-ndjson'
+    filename = f'{kind}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}'
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
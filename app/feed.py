@@ -0,0 +1,40 @@
+from sqlalchemy.orm import joinedload
+from app import cache
+from app.models import Job, User
+from app.pagination import Page, paginate_keyset
+
+
+# ============= OPEN JOBS FEED =============
+
+JOB_FEED_TIMEOUT = 30
+
+
+def serialize_job(job):
+    """Plain-dict copy of a job card, safe to share between requests"""
+    return {
+        'id': job.id,
+        'title': job.title,
+        'description': job.description,
+        'skills_required': job.skills_required,
+        'budget': job.budget,
+        'duration': job.duration,
+        'location': job.location,
+        'status': job.status,
+        'recruiter_id': job.recruiter_id,
+        'created_at': job.created_at,
+        'recruiter': {'username': job.recruiter.username}
+    }
+
+
+@cache.memoize(timeout=JOB_FEED_TIMEOUT, tags=('jobs',))
+def get_open_jobs_page(cursor=None, per_page=20):
+    """Return a page of open jobs, newest first, from the shared cache when possible.
+
+    Committed job writes invalidate the 'jobs' tag; with the in-process
+    backend the timeout bounds how stale other worker processes can be.
+    """
+    query = Job.query.options(
+        joinedload(Job.recruiter).load_only(User.username)
+    ).filter(Job.status == 'open')
+    result = paginate_keyset(query, [Job.created_at, Job.id], cursor=cursor, per_page=per_page)
+    return Page([serialize_job(job) for job in result.items], result.next_cursor)
@@ -0,0 +1,171 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('colabify.sql')
+
+
+# ============= QUERY RECORDING =============
+
+PARAMETER_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """Normalize a statement so the same query with different parameters looks identical"""
+    return PARAMETER_LIST.sub('(...)', WHITESPACE.sub(' ', statement).strip())
+
+
+class QueryRecorder:
+    """Counts the statements (and their time) executed while it is active on this thread"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold):
+        """Statement shapes run at least threshold times: probable N+1 lazy loads"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_active = threading.local()
+
+
+def _recorders():
+    stack = getattr(_active, 'recorders', None)
+    if stack is None:
+        stack = _active.recorders = []
+    return stack
+
+
+def start_recording():
+    """Begin recording this thread's statements; pair with stop_recording()"""
+    recorder = QueryRecorder()
+    _recorders().append(recorder)
+    return recorder
+
+
+def stop_recording(recorder):
+    stack = _recorders()
+    if recorder in stack:
+        stack.remove(recorder)
+
+
+@contextmanager
+def recording():
+    """Record every statement this thread executes inside the block"""
+    recorder = start_recording()
+    try:
+        yield recorder
+    finally:
+        stop_recording(recorder)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if _recorders():
+        conn.info.setdefault('query_start_times', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    recorders = _recorders()
+    start_times = conn.info.get('query_start_times')
+    if not recorders or not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    for recorder in recorders:
+        recorder.record(statement, elapsed)
+
+
+# ============= QUERY BUDGETS =============
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries, n_plus_one_threshold=None):
+    """Fail if the block runs more than max_queries statements (or any N+1 pattern).
+
+        with query_budget(5):
+            client.get('/admin/jobs')
+    """
+    with recording() as recorder:
+        yield recorder
+    problems = []
+    if recorder.count > max_queries:
+        problems.append(f'{recorder.count} queries, budget is {max_queries}')
+    if n_plus_one_threshold is not None:
+        for shape, count in recorder.repeated(n_plus_one_threshold):
+            problems.append(f'{count}x {shape[:200]}')
+    if problems:
+        raise QueryBudgetExceeded('; '.join(problems))
+
+
+# ============= PER-REQUEST REPORTING =============
+
+def init_instrumentation(app):
+    """Record each request's queries; report them as headers in debug, as a log line otherwise"""
+    app.config.setdefault('SQL_INSTRUMENTATION', True)
+    app.config.setdefault('SQL_DEBUG_HEADERS', app.debug)
+    app.config.setdefault('SQL_N_PLUS_ONE_THRESHOLD', 5)
+    app.config.setdefault('SQL_SLOW_REQUEST_MS', 500)
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+
+    @app.before_request
+    def _start_recording():
+        g.sql_recorder = start_recording()
+
+    @app.after_request
+    def _report_queries(response):
+        recorder = g.get('sql_recorder')
+        if recorder is None:
+            return response
+        threshold = app.config['SQL_N_PLUS_ONE_THRESHOLD']
+        repeated = recorder.repeated(threshold)
+        db_ms = round(recorder.total_time * 1000, 2)
+
+        if app.config['SQL_DEBUG_HEADERS'] or app.debug:
+            response.headers['X-SQL-Queries'] = str(recorder.count)
+            response.headers['X-SQL-Time-Ms'] = str(db_ms)
+            if repeated:
+                response.headers['X-SQL-N-Plus-One'] = '; '.join(
+                    f'{count}x {shape[:120]}' for shape, count in repeated[:3]
+                )
+
+        line = json.dumps({
+            'event': 'sql_request',
+            'method': request.method,
+            'endpoint': request.endpoint,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': db_ms,
+            'n_plus_one': [{'count': count, 'statement': shape[:300]} for shape, count in repeated]
+        })
+        if repeated or db_ms >= app.config['SQL_SLOW_REQUEST_MS']:
+            logger.warning(line)
+        else:
+            logger.info(line)
+        return response
+
+    @app.teardown_request
+    def _stop_recording(exc):
+        recorder = g.pop('sql_recorder', None)
+        if recorder is not None:
+            stop_recording(recorder)
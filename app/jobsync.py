@@ -0,0 +1,91 @@
+import threading
+from datetime import datetime, timedelta
+from app.models import Job
+
+
+# ============= CATCHING UP WITH OTHER PROCESSES =============
+
+class JobSync:
+    """How far an in-process job index has read the jobs other processes wrote.
+
+    An index applies its own process's commits as they happen, but only a
+    scan of the jobs table moves synced_at, so a job another worker
+    committed in between (with a lower id, or an edit to an old one) is
+    still found by the next scan. Each scan re-reads rows stamped within
+    LAG of the last one, since a transaction can commit, or reach a
+    replica, well after it stamped updated_at. Deletes are not seen here;
+    readers drop hits the database no longer has.
+    """
+
+    LAG = timedelta(seconds=60)
+
+    def __init__(self, synced_at=None):
+        self._lock = threading.Lock()
+        self.synced_at = synced_at
+        self._seen = {}
+
+    def reset(self, synced_at=None):
+        """Start over from a full build that read the table as of synced_at"""
+        with self._lock:
+            self.synced_at = synced_at
+            self._seen = {}
+
+    def _holds(self, job_id, updated_at):
+        seen = self._seen.get(job_id)
+        return seen is not None and updated_at is not None and updated_at <= seen
+
+    def seen(self, job_id, updated_at):
+        """Record a version of a job the index already holds, so scans skip it"""
+        if updated_at is None:
+            return
+        with self._lock:
+            if not self._holds(job_id, updated_at):
+                self._seen[job_id] = updated_at
+
+    def catch_up(self, query, apply):
+        """Call apply(job) for every job from query written since the last scan; returns how many"""
+        started = datetime.utcnow()
+        with self._lock:
+            since = None if self.synced_at is None else self.synced_at - self.LAG
+        if since is not None:
+            query = query.filter(Job.updated_at >= since)
+        applied = 0
+        for job in query.order_by(Job.id).all():
+            with self._lock:
+                if self._holds(job.id, job.updated_at):
+                    continue
+            apply(job)
+            self.seen(job.id, job.updated_at)
+            applied += 1
+        # Advanced only once every job is applied, so a snapshot never claims jobs it lacks
+        with self._lock:
+            if self.synced_at is None or started > self.synced_at:
+                self.synced_at = started
+            horizon = self.synced_at - self.LAG
+            self._seen = {job_id: stamp for job_id, stamp in self._seen.items() if stamp >= horizon}
+        return applied
+
+
+# ============= WARMING =============
+
+def warm_job_indexes():
+    """Build the in-process job indexes before the first request needs them; returns whether it ran"""
+    from app import db
+    from app.recommend import ensure_recommender
+    from app.schema import pending_migrations
+    from app.search import catch_up_search_index
+    from app.skills import ensure_skill_index
+    try:
+        # A worker can start before `flask bootstrap-db`; the indexes then build on first use
+        if pending_migrations():
+            print("❌ Skipping job index warm-up: the schema has pending migrations")
+            return False
+        ensure_recommender()
+        ensure_skill_index()
+        catch_up_search_index()
+        print("✅ Job indexes warmed")
+        return True
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Error warming job indexes: {str(e)}")
+        return False
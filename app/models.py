@@ -1,19 +1,22 @@
-from app import db, login_manager
+from app import db, login_manager, cache, audit, ddl
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timezone
-from sqlalchemy import text
+from datetime import datetime
+from sqlalchemy import text, inspect, case, func
+from sqlalchemy.orm import selectinload
+from sqlalchemy.schema import CreateColumn
 import re
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
-# Email validation function (used by trigger)
+# Same check as the users email triggers
+EMAIL_PATTERN = r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$'
+
 def validate_email(email):
     """Validate email format using regex"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return re.match(EMAIL_PATTERN, email) is not None
 
 
 # ============= MAIN MODELS =============
@@ -26,7 +29,11 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255))
     user_type = db.Column(db.String(20), nullable=False)  # 'freelancer', 'recruiter', or 'admin'
-    created_at = db.Column(db.DateTime, default=timezone.utc)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Denormalized navbar badges, kept in step by the write paths (see adjust_unread_counts)
+    unread_messages = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     jobs_posted = db.relationship('Job', backref='recruiter', lazy=True, foreign_keys='Job.recruiter_id')
@@ -43,9 +50,24 @@ class User(UserMixin, db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
-    @property
-    def unread_messages_count(self):
-        return Message.query.filter_by(receiver_id=self.id, is_read=False).count()
+    @staticmethod
+    def adjust_unread_counts(user_id, messages=0, notifications=0):
+        """Atomically add to a user's unread counters in the current transaction"""
+        values = {}
+        if messages:
+            values[User.unread_messages] = case(
+                (User.unread_messages + messages < 0, 0),
+                else_=User.unread_messages + messages
+            )
+        if notifications:
+            values[User.unread_notifications] = case(
+                (User.unread_notifications + notifications < 0, 0),
+                else_=User.unread_notifications + notifications
+            )
+        if values:
+            User.query.filter(User.id == user_id).update(values, synchronize_session=False)
+            # Only the badges read these; 'users' would drop every admin page on each chat message
+            cache.invalidate_on_commit(db.session, 'unread')
     
     def validate_email_format(self):
         """Validate email format"""
@@ -64,11 +86,68 @@ class Job(db.Model):
     location = db.Column(db.String(100))
     status = db.Column(db.String(20), default='open')  # open, in_progress, completed, cancelled
     recruiter_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=timezone.utc)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=timezone.utc)
+    application_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # maintained by app/popular.py
+    # NOT NULL: the open jobs feed pages by (created_at, id), and a NULL never compares past a cursor
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_jobs_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_jobs_application_count', 'application_count', 'id'),
+        db.Index('ix_jobs_recruiter', 'recruiter_id', 'id'),
+        db.Index('ix_jobs_updated_at', 'updated_at'),
+    )
     
     # Relationships
     applications = db.relationship('Application', backref='job', lazy=True, cascade='all, delete-orphan')
+    skills = db.relationship('Skill', secondary='job_skills', lazy=True)
+
+
+# ============= SKILL TAXONOMY =============
+
+SKILL_SEPARATORS = re.compile(r'[,;|\n]+')
+
+
+def parse_skills(skills_required):
+    """Split a free-text skills field into normalized, de-duplicated skill names"""
+    names = []
+    for raw in SKILL_SEPARATORS.split(skills_required or ''):
+        name = ' '.join(raw.lower().split()).strip('.')[:50]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+job_skills = db.Table(
+    'job_skills',
+    db.Column('job_id', db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_job_skills_skill_job', 'skill_id', 'job_id')
+)
+
+
+class Skill(db.Model):
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+    
+    @staticmethod
+    def for_names(names, known=None):
+        """Skill rows for the given normalized names, creating the missing ones"""
+        known = {} if known is None else known
+        missing = [name for name in names if name not in known]
+        if missing:
+            for skill in Skill.query.filter(Skill.name.in_(missing)):
+                known[skill.name] = skill
+        skills = []
+        for name in names:
+            skill = known.get(name)
+            if skill is None:
+                skill = known[name] = Skill(name=name)
+                db.session.add(skill)
+            skills.append(skill)
+        return skills
 
 
 class Application(db.Model):
@@ -80,8 +159,87 @@ class Application(db.Model):
     cover_letter = db.Column(db.Text)
     proposed_rate = db.Column(db.Float)
     status = db.Column(db.String(20), default='pending')  # pending, accepted, rejected
-    created_at = db.Column(db.DateTime, default=timezone.utc)
-    updated_at = db.Column(db.DateTime, default=timezone.utc, onupdate=timezone.utc)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_applications_freelancer_job', 'freelancer_id', 'job_id'),
+        db.Index('ix_applications_freelancer_id', 'freelancer_id', 'id'),
+        db.Index('ix_applications_job_id', 'job_id', 'id'),
+    )
+
+
+class JobRecommendation(db.Model):
+    """Precomputed "recommended for you" jobs, written by the batch recommender"""
+    __tablename__ = 'job_recommendations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    rank = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_job_recommendations_user_rank', 'user_id', 'rank'),
+    )
+
+
+class SummaryStat(db.Model):
+    """Running totals behind the admin dashboard, kept current by app/stats.py"""
+    __tablename__ = 'summary_stats'
+    
+    scope = db.Column(db.String(20), primary_key=True)  # users, jobs, applications, messages
+    bucket = db.Column(db.String(20), primary_key=True)  # user_type or status ('all' when unbucketed)
+    slot = db.Column(db.Integer, primary_key=True, autoincrement=False, default=0, server_default='0')  # counter shard; totals sum every slot
+    row_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    amount_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # rows with a budget/rate
+    amount_total = db.Column(db.Float, nullable=False, default=0, server_default='0')
+
+
+class ActivityEvent(db.Model):
+    """Append-only platform activity log with the display fields copied in at write time"""
+    __tablename__ = 'activity_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(30), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'))
+    username = db.Column(db.String(80))
+    subject_id = db.Column(db.Integer)  # job, application or conversation id, depending on event_type
+    title = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_activity_events_created', 'created_at', 'id'),
+        db.Index('ix_activity_events_type_created', 'event_type', 'created_at', 'id'),
+        db.Index('ix_activity_events_user_created', 'user_id', 'created_at', 'id'),
+    )
+    
+    DESCRIPTIONS = {
+        'job_posted': 'Posted job: {title}',
+        'application_submitted': 'Applied to: {title}',
+        'application_accepted': 'Accepted an application for: {title}',
+        'application_rejected': 'Rejected an application for: {title}',
+        'message_sent': 'Sent a message to {title}'
+    }
+    
+    @property
+    def description(self):
+        return self.DESCRIPTIONS.get(self.event_type, '{title}').format(title=self.title)
+    
+    @staticmethod
+    def record(event_type, user, title, subject_id=None):
+        """Add an event to the current transaction"""
+        event = ActivityEvent(
+            event_type=event_type,
+            user_id=user.id,
+            username=user.username,
+            subject_id=subject_id,
+            title=(title or '')[:200],
+            created_at=datetime.utcnow()
+        )
+        db.session.add(event)
+        return event
 
 
 class Notification(db.Model):
@@ -92,7 +250,52 @@ class Notification(db.Model):
     message = db.Column(db.String(500), nullable=False)
     type = db.Column(db.String(50))  # application_received, application_accepted, etc.
     is_read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=timezone.utc)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Coalescing: repeats of an unread notification bump it instead of adding rows
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id', ondelete='CASCADE'))
+    event_count = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_notifications_user_id', 'user_id', 'id'),
+        db.Index('ix_notifications_user_recent', 'user_id', 'last_seen_at', 'id'),
+        db.Index('ix_notifications_unread', 'user_id', 'is_read', 'type', 'conversation_id'),
+        db.Index('ix_notifications_last_seen_at', 'last_seen_at'),
+    )
+    
+    @staticmethod
+    def notify_coalesced(user_id, message, type, conversation_id=None):
+        """Bump the user's unread notification of this type (and conversation), or add one.
+        
+        Returns True when a new notification was added, so the unread badge
+        only grows once per unread (type, conversation) however many events
+        arrive. Must run in the caller's transaction.
+        """
+        now = datetime.utcnow()
+        bumped = Notification.query.filter(
+            Notification.user_id == user_id,
+            Notification.is_read == False,
+            Notification.type == type,
+            Notification.conversation_id == conversation_id
+        ).update({
+            Notification.event_count: Notification.event_count + 1,
+            Notification.message: message,
+            Notification.last_seen_at: now
+        }, synchronize_session=False)
+        if bumped:
+            return False
+        
+        db.session.add(Notification(
+            user_id=user_id,
+            message=message,
+            type=type,
+            conversation_id=conversation_id,
+            created_at=now,
+            last_seen_at=now
+        ))
+        User.adjust_unread_counts(user_id, notifications=1)
+        return True
 
 
 class Conversation(db.Model):
@@ -101,8 +304,24 @@ class Conversation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user1_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     user2_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=timezone.utc)
-    updated_at = db.Column(db.DateTime, default=timezone.utc, onupdate=timezone.utc)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # NOT NULL: the inbox pages by (updated_at, id), and a NULL never compares past a cursor
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Read watermarks: every message up to this id has been read by that participant
+    user1_last_read_id = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    user2_last_read_id = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Denormalized inbox summary, maintained by set_last_message()
+    last_message_id = db.Column(db.Integer)
+    last_message_sender_id = db.Column(db.Integer)
+    last_message_preview = db.Column(db.String(120))
+    last_message_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_conversations_user1_updated', 'user1_id', 'updated_at', 'id'),
+        db.Index('ix_conversations_user2_updated', 'user2_id', 'updated_at', 'id'),
+    )
     
     # Relationships
     messages = db.relationship('Message', backref='conversation', lazy='dynamic', cascade='all, delete-orphan')
@@ -120,6 +339,67 @@ class Conversation(db.Model):
     def get_last_message(self):
         """Get the most recent message in the conversation"""
         return self.messages.order_by(Message.created_at.desc()).first()
+    
+    def set_last_message(self, message):
+        """Copy the inbox summary of a newly sent message onto the conversation"""
+        preview = message.content[:100]
+        if len(message.content) > 100:
+            preview += '...'
+        self.last_message_id = message.id
+        self.last_message_sender_id = message.sender_id
+        self.last_message_preview = preview
+        self.last_message_at = message.created_at
+        self.updated_at = message.created_at
+    
+    def has_unread(self, user_id):
+        """Whether the participant may have unread messages, judged from the summary alone"""
+        return (self.last_message_id is not None
+                and self.last_message_sender_id != user_id
+                and self.last_message_id > self.get_last_read_id(user_id))
+    
+    def _last_read_column(self, user_id):
+        if self.user1_id == user_id:
+            return Conversation.user1_last_read_id
+        return Conversation.user2_last_read_id
+    
+    def get_last_read_id(self, user_id):
+        """Get the read watermark of a participant"""
+        if self.user1_id == user_id:
+            return self.user1_last_read_id
+        return self.user2_last_read_id
+    
+    def mark_read(self, user_id, message_id):
+        """Advance a participant's read watermark; returns how many received messages became read"""
+        last_read_id = self.get_last_read_id(user_id)
+        if message_id <= last_read_id:
+            return 0
+        
+        newly_read = self.messages.filter(
+            Message.receiver_id == user_id,
+            Message.id > last_read_id,
+            Message.id <= message_id
+        ).count()
+        
+        # Compare-and-set so concurrent readers never decrement the counter twice.
+        # Keep updated_at: the inbox is ordered by it, and reading is not activity
+        column = self._last_read_column(user_id)
+        updated = Conversation.query.filter(
+            Conversation.id == self.id,
+            column == last_read_id
+        ).update({column: message_id, Conversation.updated_at: Conversation.updated_at}, synchronize_session=False)
+        if not updated:
+            return 0
+        cache.invalidate_on_commit(db.session, 'unread')
+        
+        User.adjust_unread_counts(user_id, messages=-newly_read)
+        return newly_read
+    
+    def unread_count(self, user_id):
+        """Count messages received after the participant's read watermark"""
+        return self.messages.filter(
+            Message.receiver_id == user_id,
+            Message.id > self.get_last_read_id(user_id)
+        ).count()
 
 
 class Message(db.Model):
@@ -130,8 +410,23 @@ class Message(db.Model):
     sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     receiver_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    is_read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=timezone.utc)
+    is_read = db.Column(db.Boolean, default=False)  # superseded by Conversation read watermarks
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_messages_conversation_id_id', 'conversation_id', 'id'),
+        db.Index('ix_messages_created_at', 'created_at'),
+    )
+    
+    def to_dict(self):
+        """Serialize for the chat polling and streaming endpoints"""
+        return {
+            'id': self.id,
+            'content': self.content,
+            'sender_id': self.sender_id,
+            'sender_username': self.sender.username,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M')
+        }
     
     def __repr__(self):
         return f'<Message from {self.sender_id} to {self.receiver_id}>'
@@ -147,12 +442,56 @@ class EmailValidationLog(db.Model):
     email = db.Column(db.String(120), nullable=False)
     is_valid = db.Column(db.Boolean, nullable=False)
     validation_message = db.Column(db.String(255))
-    attempted_at = db.Column(db.DateTime, default=timezone.utc)
+    attempted_at = db.Column(db.DateTime, default=datetime.utcnow)
     action_type = db.Column(db.String(20))  # 'registration' or 'login'
     
     def __repr__(self):
         return f'<EmailValidationLog {self.email} - Valid: {self.is_valid}>'
 
+    @staticmethod
+    def log(email, is_valid, message, action_type):
+        """Queue an attempt for the batched audit writer instead of committing it on the request"""
+        audit.record(
+            EmailValidationLog,
+            email=email,
+            is_valid=is_valid,
+            validation_message=message,
+            action_type=action_type,
+            attempted_at=datetime.utcnow()
+        )
+
+
+# ============= ARCHIVE TABLES =============
+
+def archive_table(table):
+    """Cold copy of a table for rows moved out by app/retention.py; compressed pages on MySQL"""
+    columns = [
+        db.Column(column.name, column.type, primary_key=column.primary_key, autoincrement=False)
+        for column in table.columns
+    ]
+    return db.Table(
+        f'{table.name}_archive', db.metadata,
+        *columns,
+        db.Column('archived_at', db.DateTime, nullable=False),
+        mysql_row_format='COMPRESSED'
+    )
+
+
+notifications_archive = archive_table(Notification.__table__)
+messages_archive = archive_table(Message.__table__)
+email_validation_logs_archive = archive_table(EmailValidationLog.__table__)
+
+
+# ============= SCHEMA VERSIONING =============
+
+class SchemaMigration(db.Model):
+    """One row per migration applied by app/schema.py"""
+    __tablename__ = 'schema_migrations'
+    
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
 
 # ============= DATABASE VIEWS FOR ADMIN DASHBOARD =============
 
@@ -166,9 +505,8 @@ class UserStatsView(db.Model):
     
     @staticmethod
     def create_view():
-        """Create the database view for MySQL"""
-        view_query = text("""
-            CREATE OR REPLACE VIEW user_stats_view AS
+        """Create the database view"""
+        ddl.create_view('user_stats_view', """
             SELECT 
                 user_type,
                 COUNT(*) as total_users
@@ -176,7 +514,6 @@ class UserStatsView(db.Model):
             WHERE user_type IN ('freelancer', 'recruiter')
             GROUP BY user_type
         """)
-        db.session.execute(view_query)
         db.session.commit()
 
 
@@ -191,9 +528,8 @@ class JobStatsView(db.Model):
     
     @staticmethod
     def create_view():
-        """Create the database view for MySQL"""
-        view_query = text("""
-            CREATE OR REPLACE VIEW job_stats_view AS
+        """Create the database view"""
+        ddl.create_view('job_stats_view', """
             SELECT 
                 status,
                 COUNT(*) as total_jobs,
@@ -201,7 +537,6 @@ class JobStatsView(db.Model):
             FROM jobs
             GROUP BY status
         """)
-        db.session.execute(view_query)
         db.session.commit()
 
 
@@ -216,9 +551,8 @@ class ApplicationStatsView(db.Model):
     
     @staticmethod
     def create_view():
-        """Create the database view for MySQL"""
-        view_query = text("""
-            CREATE OR REPLACE VIEW application_stats_view AS
+        """Create the database view"""
+        ddl.create_view('application_stats_view', """
             SELECT 
                 status,
                 COUNT(*) as total_applications,
@@ -226,7 +560,6 @@ class ApplicationStatsView(db.Model):
             FROM applications
             GROUP BY status
         """)
-        db.session.execute(view_query)
         db.session.commit()
 
 
@@ -243,26 +576,25 @@ class RecentActivityView(db.Model):
     
     @staticmethod
     def create_view():
-        """Create the database view for recent activities (MySQL)"""
-        view_query = text("""
-            CREATE OR REPLACE VIEW recent_activity_view AS
+        """Create the database view for recent activities"""
+        ddl.create_view('recent_activity_view', f"""
             SELECT 
-                CONCAT('JOB_', j.id) as id,
+                {ddl.sql_concat("'JOB_'", 'j.id')} as id,
                 'job_posted' as activity_type,
-                CONCAT('Posted job: ', j.title) as description,
+                {ddl.sql_concat("'Posted job: '", 'j.title')} as description,
                 u.username,
-                j.created_at
+                j.created_at as created_at
             FROM jobs j
             JOIN users u ON j.recruiter_id = u.id
             
             UNION ALL
             
             SELECT 
-                CONCAT('APP_', a.id) as id,
+                {ddl.sql_concat("'APP_'", 'a.id')} as id,
                 'application_submitted' as activity_type,
-                CONCAT('Applied to: ', jo.title) as description,
+                {ddl.sql_concat("'Applied to: '", 'jo.title')} as description,
                 u.username,
-                a.created_at
+                a.created_at as created_at
             FROM applications a
             JOIN jobs jo ON a.job_id = jo.id
             JOIN users u ON a.freelancer_id = u.id
@@ -270,7 +602,6 @@ class RecentActivityView(db.Model):
             ORDER BY created_at DESC
             LIMIT 50
         """)
-        db.session.execute(view_query)
         db.session.commit()
 
 
@@ -288,9 +619,8 @@ class PopularJobsView(db.Model):
     
     @staticmethod
     def create_view():
-        """Create the database view for popular jobs (MySQL)"""
-        view_query = text("""
-            CREATE OR REPLACE VIEW popular_jobs_view AS
+        """Create the database view for popular jobs"""
+        ddl.create_view('popular_jobs_view', """
             SELECT 
                 j.id as job_id,
                 j.title as job_title,
@@ -304,7 +634,6 @@ class PopularJobsView(db.Model):
             GROUP BY j.id, j.title, u.username, j.budget, j.status
             ORDER BY application_count DESC
         """)
-        db.session.execute(view_query)
         db.session.commit()
 
 
@@ -312,7 +641,18 @@ class PopularJobsView(db.Model):
 
 def create_all_views():
     """Create all database views"""
+    if not ddl.supported():
+        print(f"❌ Skipping database views: none are defined for {db.engine.dialect.name}; the app does not read them")
+        return
     try:
+        # Earlier versions let db.create_all() create the view names as plain tables
+        stale_tables = set(inspect(db.engine).get_table_names())
+        for table in db.Model.metadata.sorted_tables:
+            if table.info.get('is_view') and table.name in stale_tables:
+                db.session.execute(text(f'DROP TABLE {table.name}'))
+                print(f"✅ Dropped table {table.name} so it can be recreated as a view")
+        db.session.commit()
+        
         UserStatsView.create_view()
         JobStatsView.create_view()
         ApplicationStatsView.create_view()
@@ -322,48 +662,294 @@ def create_all_views():
     except Exception as e:
         print(f"❌ Error creating views: {str(e)}")
         db.session.rollback()
+        raise
 
 
 def create_email_validation_trigger():
-    """Create trigger for email validation (MySQL)"""
+    """Create triggers for email validation"""
+    if not ddl.supported():
+        print(f"❌ Skipping email validation triggers: none are defined for {db.engine.dialect.name}; "
+              f"emails are still validated by the app")
+        return
     try:
-        # Drop existing triggers if they exist
-        db.session.execute(text("DROP TRIGGER IF EXISTS validate_email_before_insert"))
-        db.session.execute(text("DROP TRIGGER IF EXISTS validate_email_before_update"))
-        
-        # MySQL trigger for email validation on INSERT
-        trigger_insert = text("""
-            CREATE TRIGGER validate_email_before_insert
-            BEFORE INSERT ON users
-            FOR EACH ROW
-            BEGIN
-                IF NEW.email NOT REGEXP '^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\\.[A-Za-z]{2,}$' THEN
-                    SIGNAL SQLSTATE '45000'
-                    SET MESSAGE_TEXT = 'Invalid email format. Email must be in format: user@domain.com';
-                END IF;
-            END
-        """)
-        db.session.execute(trigger_insert)
-        
-        # MySQL trigger for email validation on UPDATE
-        trigger_update = text("""
-            CREATE TRIGGER validate_email_before_update
-            BEFORE UPDATE ON users
-            FOR EACH ROW
-            BEGIN
-                IF NEW.email NOT REGEXP '^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\\.[A-Za-z]{2,}$' THEN
-                    SIGNAL SQLSTATE '45000'
-                    SET MESSAGE_TEXT = 'Invalid email format. Email must be in format: user@domain.com';
-                END IF;
-            END
-        """)
-        db.session.execute(trigger_update)
-        
+        for action in ('INSERT', 'UPDATE'):
+            ddl.create_regexp_check_trigger(
+                f'validate_email_before_{action.lower()}', 'users', action, 'email', EMAIL_PATTERN,
+                'Invalid email format. Email must be in format: user@domain.com'
+            )
         db.session.commit()
         print("✅ Email validation triggers created successfully!")
     except Exception as e:
         print(f"❌ Error creating triggers: {str(e)}")
         db.session.rollback()
+        raise
+
+
+def create_tables():
+    """db.create_all() for real tables only; the *_view models are created by create_all_views()"""
+    tables = [table for table in db.Model.metadata.sorted_tables if not table.info.get('is_view')]
+    db.Model.metadata.create_all(db.engine, tables=tables)
+
+
+def create_default_admin():
+    """Create the default admin user if there is none"""
+    admin = User.query.filter_by(email='admin@colabify.com').first()
+    if not admin:
+        admin = User(
+            username='admin',
+            email='admin@colabify.com',
+            user_type='admin',
+            created_at=datetime.utcnow()
+        )
+        admin.set_password('admin123')  # Change this in production!
+        db.session.add(admin)
+        db.session.commit()
+        print("✅ Default admin user created: admin@colabify.com / admin123")
+
+
+def add_missing_columns():
+    """Add columns and indexes that db.create_all() skips on existing tables"""
+    try:
+        inspector = inspect(db.engine)
+        for table in db.Model.metadata.sorted_tables:
+            if table.info.get('is_view') or not inspector.has_table(table.name):
+                continue
+            
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    column_ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                    db.session.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column_ddl}'))
+                    print(f"✅ Added column {table.name}.{column.name}")
+            db.session.commit()
+            
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
+    except Exception as e:
+        print(f"❌ Error adding missing columns: {str(e)}")
+        db.session.rollback()
+        raise
+
+
+def require_column(column, fill, keep=(), tags=()):
+    """Replace NULLs in an existing column with fill, then make the column NOT NULL.
+
+    `keep` lists columns with onupdate defaults that the backfill must not
+    touch, and `tags` the cache tags it invalidates. SQLite cannot alter a column, so there only the backfill runs;
+    tables it creates from the models already have the constraint.
+    """
+    model = column.class_
+    try:
+        filled = db.session.query(model).filter(column.is_(None)).update(
+            {column: fill, **{other: other for other in keep}}, synchronize_session=False
+        )
+        if filled and tags:
+            cache.invalidate_on_commit(db.session, *tags)
+        db.session.commit()
+        if filled:
+            print(f"✅ Filled {filled} NULL {model.__tablename__}.{column.key} values")
+        ddl.set_not_null(column.expression)
+        db.session.commit()
+    except Exception as e:
+        print(f"❌ Error requiring {model.__tablename__}.{column.key}: {str(e)}")
+        db.session.rollback()
+        raise
+
+
+def require_conversation_updated_at():
+    """Conversations without updated_at fall back to their last message, then to when they started"""
+    require_column(Conversation.updated_at, func.coalesce(
+        Conversation.last_message_at, Conversation.created_at, datetime.utcnow()
+    ))
+
+
+def require_job_created_at():
+    """Jobs without created_at fall back to their last edit; the job indexes keep their versions"""
+    require_column(Job.created_at, func.coalesce(Job.updated_at, datetime.utcnow()),
+                   keep=(Job.updated_at,), tags=('jobs',))
+
+
+def backfill_job_skills(batch_size=500):
+    """Parse skills_required into the skills/job_skills tables for existing jobs"""
+    known = {}
+    updated = 0
+    last_id = 0
+    while True:
+        jobs = Job.query.options(selectinload(Job.skills)).filter(
+            Job.id > last_id
+        ).order_by(Job.id).limit(batch_size).all()
+        if not jobs:
+            break
+        for job in jobs:
+            names = parse_skills(job.skills_required)
+            if [skill.name for skill in job.skills] != names:
+                job.skills = Skill.for_names(names, known)
+                updated += 1
+        last_id = jobs[-1].id
+        db.session.commit()
+    return updated
+
+
+def backfill_activity_events(batch_size=1000):
+    """Log job posts and applications that predate the activity_events table"""
+    sources = [
+        ('job_posted', db.session.query(
+            Job.id, Job.title, Job.created_at, User.id, User.username
+        ).join(User, User.id == Job.recruiter_id), Job),
+        ('application_submitted', db.session.query(
+            Application.id, Job.title, Application.created_at, User.id, User.username
+        ).join(Job, Job.id == Application.job_id).join(User, User.id == Application.freelancer_id), Application),
+    ]
+    
+    added = 0
+    for event_type, query, model in sources:
+        # Ids only grow, so everything older than the first logged subject predates the log
+        first_logged = db.session.query(func.min(ActivityEvent.subject_id)).filter(
+            ActivityEvent.event_type == event_type
+        ).scalar()
+        if first_logged is not None:
+            query = query.filter(model.id < first_logged)
+        last_id = 0
+        while True:
+            rows = query.filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+            db.session.bulk_insert_mappings(ActivityEvent, [{
+                'event_type': event_type,
+                'user_id': user_id,
+                'username': username,
+                'subject_id': subject_id,
+                'title': (title or '')[:200],
+                'created_at': created_at or datetime.utcnow()
+            } for subject_id, title, created_at, user_id, username in rows])
+            db.session.commit()
+            added += len(rows)
+            last_id = rows[-1][0]
+    return added
+
+
+def backfill_read_watermarks():
+    """Derive conversation read watermarks from the legacy Message.is_read flags"""
+    latest_ids = dict(db.session.query(
+        Message.conversation_id, func.max(Message.id)
+    ).group_by(Message.conversation_id).all())
+    
+    first_unread_ids = {
+        (conversation_id, receiver_id): first_unread_id
+        for conversation_id, receiver_id, first_unread_id in db.session.query(
+            Message.conversation_id, Message.receiver_id, func.min(Message.id)
+        ).filter(Message.is_read == False).group_by(Message.conversation_id, Message.receiver_id).all()
+    }
+    
+    updated = 0
+    for conversation in Conversation.query.filter(Conversation.id.in_(latest_ids.keys())).all():
+        for user_id in (conversation.user1_id, conversation.user2_id):
+            first_unread_id = first_unread_ids.get((conversation.id, user_id))
+            if first_unread_id is None:
+                watermark = latest_ids[conversation.id]
+            else:
+                watermark = first_unread_id - 1
+            updated += Conversation.query.filter(
+                Conversation.id == conversation.id,
+                conversation._last_read_column(user_id) < watermark
+            ).update({
+                conversation._last_read_column(user_id): watermark,
+                Conversation.updated_at: Conversation.updated_at
+            }, synchronize_session=False)
+    db.session.commit()
+    return updated
+
+
+def backfill_conversation_summaries(batch_size=500):
+    """Fill the denormalized last-message columns for conversations that predate them"""
+    updated = 0
+    while True:
+        conversations = Conversation.query.filter(
+            Conversation.last_message_id.is_(None),
+            Conversation.messages.any()
+        ).limit(batch_size).all()
+        if not conversations:
+            break
+        
+        latest_ids = db.session.query(func.max(Message.id)).filter(
+            Message.conversation_id.in_([conversation.id for conversation in conversations])
+        ).group_by(Message.conversation_id)
+        latest_messages = {
+            message.conversation_id: message
+            for message in Message.query.filter(Message.id.in_(latest_ids)).all()
+        }
+        for conversation in conversations:
+            conversation.set_last_message(latest_messages[conversation.id])
+            updated += 1
+        db.session.commit()
+    return updated
+
+
+def backfill_notification_last_seen(batch_size=1000):
+    """Copy created_at into last_seen_at for notifications that predate coalescing"""
+    updated = 0
+    while True:
+        ids = [notification_id for (notification_id,) in db.session.query(Notification.id).filter(
+            Notification.last_seen_at.is_(None)
+        ).limit(batch_size).all()]
+        if not ids:
+            break
+        Notification.query.filter(Notification.id.in_(ids)).update({
+            Notification.last_seen_at: func.coalesce(Notification.created_at, datetime.utcnow())
+        }, synchronize_session=False)
+        db.session.commit()
+        updated += len(ids)
+    return updated
+
+
+def reconcile_application_counts():
+    """Recompute Job.application_count from the applications table; returns the jobs repaired"""
+    actual = func.coalesce(
+        db.session.query(func.count(Application.id)).filter(
+            Application.job_id == Job.id
+        ).correlate(Job).scalar_subquery(),
+        0
+    )
+    repaired = Job.query.filter(Job.application_count != actual).update(
+        {Job.application_count: actual, Job.updated_at: Job.updated_at}, synchronize_session=False
+    )
+    if repaired:
+        cache.invalidate_on_commit(db.session, 'jobs')
+    db.session.commit()
+    return repaired
+
+
+def reconcile_unread_counters():
+    """Recompute every user's unread counters from source rows; returns the users repaired"""
+    last_read_id = case(
+        (Conversation.user1_id == Message.receiver_id, Conversation.user1_last_read_id),
+        else_=Conversation.user2_last_read_id
+    )
+    unread_messages = dict(db.session.query(
+        Message.receiver_id, func.count(Message.id)
+    ).join(Conversation, Message.conversation_id == Conversation.id).filter(
+        Message.id > last_read_id
+    ).group_by(Message.receiver_id).all())
+    
+    unread_notifications = dict(db.session.query(
+        Notification.user_id, func.count(Notification.id)
+    ).filter(Notification.is_read == False).group_by(Notification.user_id).all())
+    
+    repaired = 0
+    users = db.session.query(User.id, User.unread_messages, User.unread_notifications).all()
+    for user_id, cached_messages, cached_notifications in users:
+        actual_messages = unread_messages.get(user_id, 0)
+        actual_notifications = unread_notifications.get(user_id, 0)
+        if (cached_messages, cached_notifications) != (actual_messages, actual_notifications):
+            User.query.filter(User.id == user_id).update({
+                User.unread_messages: actual_messages,
+                User.unread_notifications: actual_notifications
+            }, synchronize_session=False)
+            repaired += 1
+    if repaired:
+        cache.invalidate_on_commit(db.session, 'unread')
+    db.session.commit()
+    return repaired
 
 
 def drop_all_views():
@@ -390,4 +976,15 @@ def drop_all_triggers():
         print("✅ All triggers dropped successfully!")
     except Exception as e:
         print(f"❌ Error dropping triggers: {str(e)}")
-        db.session.rollback()
\ No newline at end of file
+        db.session.rollback()
+
+
+# ============= CACHE INVALIDATION =============
+
+cache.invalidate_on_write(User, 'users')
+cache.invalidate_on_write(Job, 'jobs')
+cache.invalidate_on_write(Application, 'applications')
+cache.invalidate_on_write(Message, 'messages')
+cache.invalidate_on_write(ActivityEvent, 'activity')
+cache.invalidate_on_write(EmailValidationLog, 'email_logs')
+audit.invalidates(EmailValidationLog, 'email_logs')
@@ -0,0 +1,113 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+# ============= KEYSET (CURSOR) PAGINATION =============
+
+def encode_cursor(*values):
+    """Pack the sort-key values of the last row on a page into an opaque URL-safe token"""
+    tagged = []
+    for value in values:
+        if isinstance(value, datetime):
+            tagged.append(['d', value.isoformat()])
+        else:
+            tagged.append(['v', value])
+    raw = json.dumps(tagged, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Unpack a token from encode_cursor; returns None for missing or malformed cursors"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = []
+        for tag, value in json.loads(raw):
+            values.append(datetime.fromisoformat(value) if tag == 'd' else value)
+        return values
+    except (ValueError, TypeError):
+        return None
+
+
+def after_cursor(columns, values, descending=True):
+    """Filter for rows strictly after the cursor in (columns...) order.
+
+    Expanded to (a < x) OR (a = x AND b < y) rather than a row-value
+    comparison so every backend can use the matching composite index.
+    """
+    clauses = []
+    for position, column in enumerate(columns):
+        equal_prefix = [columns[i] == values[i] for i in range(position)]
+        beyond = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equal_prefix, beyond))
+    return or_(*clauses)
+
+
+class Page:
+    """One page of keyset-paginated results"""
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def paginate_keyset(query, columns, cursor=None, per_page=20, descending=True):
+    """Return the page after `cursor` of `query`, ordered by `columns`.
+
+    The last column must be unique (normally the primary key) so ties on
+    the earlier ones are broken deterministically.
+    """
+    values = decode_cursor(cursor)
+    if values is not None and len(values) == len(columns):
+        query = query.filter(after_cursor(columns, values, descending))
+
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*ordering).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(*(getattr(last, column.key) for column in columns))
+    return Page(rows, next_cursor)
+
+
+def paginate_sortable(query, sortable, id_column, sort=None, direction=None, cursor=None, per_page=50):
+    """Keyset page ordered by one of the `sortable` columns (name -> column), ties broken by id.
+
+    Unknown sort names fall back to id, newest first. NULLs in a nullable
+    sort column come last in either direction. Returns (page, sort,
+    direction) so links can carry the normalized values.
+    """
+    if sort not in sortable:
+        sort = 'id'
+    direction = 'asc' if direction == 'asc' else 'desc'
+    descending = direction == 'desc'
+    column = sortable.get(sort, id_column)
+    if column is id_column:
+        page = paginate_keyset(query, [id_column], cursor=cursor, per_page=per_page, descending=descending)
+        return page, sort, direction
+
+    columns = [column, id_column]
+    if not column.expression.nullable:
+        page = paginate_keyset(query, columns, cursor=cursor, per_page=per_page, descending=descending)
+        return page, sort, direction
+
+    # NULL never compares, so the NULL rows form a final group paged by id alone
+    values = decode_cursor(cursor)
+    if values is not None and len(values) == 2:
+        if values[0] is None:
+            beyond_id = id_column < values[1] if descending else id_column > values[1]
+            query = query.filter(column.is_(None), beyond_id)
+        else:
+            query = query.filter(or_(after_cursor(columns, values, descending), column.is_(None)))
+    query = query.order_by(column.is_(None))
+    page = paginate_keyset(query, columns, per_page=per_page, descending=descending)
+    return page, sort, direction
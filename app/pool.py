@@ -0,0 +1,185 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, StaticPool
+
+logger = logging.getLogger('colabify.pool')
+
+
+# ============= ENGINE OPTIONS =============
+
+# DB_POOL_PRESET picks one of these; individual DB_POOL_* variables override it
+POOL_PRESETS = {
+    'development': {
+        'pool_size': 5,
+        'max_overflow': 5,
+        'pool_timeout': 30,
+        'pool_recycle': 3600,
+        'pool_pre_ping': True,
+    },
+    # Sized for a few threads per worker; recycle below MySQL's default
+    # wait_timeout so idle connections are never used after the server drops them
+    'production': {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 5,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    },
+}
+
+POOL_ENV = {
+    'pool_size': ('DB_POOL_SIZE', int),
+    'max_overflow': ('DB_MAX_OVERFLOW', int),
+    'pool_timeout': ('DB_POOL_TIMEOUT', float),
+    'pool_recycle': ('DB_POOL_RECYCLE', int),
+    'pool_pre_ping': ('DB_POOL_PRE_PING', lambda value: value.lower() in ('1', 'true', 'yes')),
+}
+
+
+def is_memory_sqlite(database_url):
+    """True for sqlite:// and sqlite:///:memory:, a private database per process"""
+    return database_url in ('sqlite://', 'sqlite:///:memory:')
+
+
+def engine_options(database_url, name='primary', env=None):
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URL, from DB_POOL_PRESET and DB_* overrides"""
+    env = os.environ if env is None else env
+    if is_memory_sqlite(database_url):
+        # Every connection to :memory: is a new empty database, so all threads share one
+        return {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+    if not database_url or database_url.startswith('sqlite'):
+        return {}
+
+    preset = env.get('DB_POOL_PRESET', 'production')
+    if preset not in POOL_PRESETS:
+        raise ValueError(f'Unknown DB_POOL_PRESET: {preset}')
+    options = dict(POOL_PRESETS[preset])
+    for option, (variable, parse) in POOL_ENV.items():
+        if env.get(variable):
+            options[option] = parse(env[variable])
+
+    options['poolclass'] = InstrumentedQueuePool
+    options['pool_logging_name'] = name
+    connect_timeout = env.get('DB_CONNECT_TIMEOUT', '5')
+    if database_url.startswith('mysql'):
+        options['connect_args'] = {'connect_timeout': int(connect_timeout)}
+    return options
+
+
+# ============= POOL METRICS =============
+
+class PoolMetrics:
+    """Checkout latency, saturation and timeouts for one named pool"""
+
+    LATENCY_SAMPLES = 1000
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.peak_in_use = 0
+        self.peak_overflow = 0
+        self._recent = deque(maxlen=self.LATENCY_SAMPLES)
+
+    def record_checkout(self, wait, in_use, overflow, slow_threshold):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+            self._recent.append(wait)
+            if wait >= slow_threshold:
+                self.slow_checkouts += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            recent = sorted(self._recent)
+            stats = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'slow_checkouts': self.slow_checkouts,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else None,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'peak_in_use': self.peak_in_use,
+                'peak_overflow': self.peak_overflow,
+            }
+        for label, quantile in (('p50_wait_ms', 0.5), ('p95_wait_ms', 0.95), ('p99_wait_ms', 0.99)):
+            stats[label] = round(recent[min(len(recent) - 1, int(len(recent) * quantile))] * 1000, 3) if recent else None
+        return stats
+
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def pool_metrics(name):
+    """The metrics for a pool name; shared by the pools an engine recreates after dispose()"""
+    with _metrics_lock:
+        metrics = _metrics.get(name)
+        if metrics is None:
+            metrics = _metrics[name] = PoolMetrics(name)
+        return metrics
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout, including waits for a free slot and pre-pings"""
+
+    # Checkouts slower than this are counted and logged
+    SLOW_CHECKOUT = float(os.getenv('DB_POOL_SLOW_CHECKOUT_MS', '100')) / 1000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = pool_metrics(self._orig_logging_name or 'default')
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            logger.warning(f'Pool {self.metrics.name} timed out after {self._timeout}s: '
+                           f'{self.checkedout()} in use, overflow {self.overflow()}')
+            raise
+        wait = time.perf_counter() - start
+        self.metrics.record_checkout(wait, self.checkedout(), max(self.overflow(), 0), self.SLOW_CHECKOUT)
+        if wait >= self.SLOW_CHECKOUT:
+            logger.warning(f'Pool {self.metrics.name} checkout took {wait * 1000:.1f}ms')
+        return connection
+
+    def stats(self):
+        """Current occupancy plus the running metrics"""
+        return {
+            'size': self.size(),
+            'checked_in': self.checkedin(),
+            'in_use': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            'max_overflow': self._max_overflow,
+            'timeout': self._timeout,
+            **self.metrics.snapshot(),
+        }
+
+
+def pool_stats(engines):
+    """{bind name: pool stats} for every engine, e.g. db.engines"""
+    stats = {}
+    for key, engine in engines.items():
+        pool = engine.pool
+        name = key or 'primary'
+        if isinstance(pool, InstrumentedQueuePool):
+            stats[name] = pool.stats()
+        else:
+            stats[name] = {'pool': type(pool).__name__, 'status': pool.status()}
+    return stats
@@ -0,0 +1,149 @@
+import heapq
+import threading
+import time
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app import db, cache
+from app.models import Job, Application, User
+
+
+# ============= TOP-K TRACKER =============
+
+class TopKCounter:
+    """The highest-counted ids from a stream of absolute count updates.
+
+    Holds at most `capacity` ids. `floor` is the highest count an untracked
+    id can have, so the top k is exact while the k-th tracked count is at
+    or above it; otherwise top() asks for a reload from the database.
+    """
+
+    def __init__(self, capacity=50):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._floor = 0
+        self.loaded_at = None
+
+    def load(self, rows):
+        """Replace the contents with (id, count) rows, highest count first"""
+        rows = list(rows)[:self.capacity]
+        with self._lock:
+            self._counts = dict(rows)
+            self._floor = rows[-1][1] if len(rows) == self.capacity else 0
+            self.loaded_at = time.monotonic()
+
+    def offer(self, key, count):
+        """Record an id's new count"""
+        with self._lock:
+            if key not in self._counts and count <= self._floor:
+                return
+            self._counts[key] = count
+            if len(self._counts) > self.capacity:
+                evicted = min(self._counts, key=self._counts.get)
+                self._floor = max(self._floor, self._counts.pop(evicted))
+
+    def discard(self, key):
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def top(self, k):
+        """[(id, count)] highest first, or None when the tracked set can no longer answer exactly"""
+        with self._lock:
+            best = heapq.nlargest(k, self._counts.items(), key=lambda item: (item[1], item[0]))
+            if self._floor and (len(best) < k or best[-1][1] < self._floor):
+                return None
+            return best
+
+
+popular_jobs = TopKCounter()
+
+POPULAR_JOBS_REFRESH_INTERVAL = 60
+
+
+def reload_popular_jobs():
+    """Reseed the tracker from the application_count index"""
+    rows = db.session.query(Job.id, Job.application_count).order_by(
+        Job.application_count.desc(), Job.id.desc()
+    ).limit(popular_jobs.capacity).all()
+    popular_jobs.load(rows)
+
+
+def get_popular_jobs(k=10):
+    """Leaderboard rows for the k jobs with the most applications"""
+    stale = (popular_jobs.loaded_at is None
+             or time.monotonic() - popular_jobs.loaded_at > POPULAR_JOBS_REFRESH_INTERVAL)
+    ranked = None if stale else popular_jobs.top(k)
+    if ranked is None:
+        reload_popular_jobs()
+        ranked = popular_jobs.top(k) or []
+
+    job_ids = [job_id for job_id, count in ranked]
+    rows = {}
+    if job_ids:
+        rows = {row.job_id: row for row in db.session.query(
+            Job.id.label('job_id'),
+            Job.title.label('job_title'),
+            User.username.label('recruiter_name'),
+            Job.application_count,
+            Job.budget,
+            Job.status
+        ).join(User, User.id == Job.recruiter_id).filter(Job.id.in_(job_ids))}
+    return [rows[job_id] for job_id in job_ids if job_id in rows]
+
+
+# ============= APPLICATION COUNTERS =============
+
+def _adjust_application_count(connection, job_id, delta):
+    """Move the job's counter in the flush's transaction and queue its new value for the tracker"""
+    jobs = Job.__table__
+    # Keeps updated_at, which the job indexes scan for edits (see app/jobsync.py)
+    connection.execute(
+        jobs.update().where(jobs.c.id == job_id).values(
+            application_count=jobs.c.application_count + delta, updated_at=jobs.c.updated_at
+        )
+    )
+    return connection.execute(select(jobs.c.application_count).where(jobs.c.id == job_id)).scalar()
+
+
+def _queue_count(application, count):
+    session = Session.object_session(application)
+    if session is None:
+        return
+    # The counter moved in a Core update, which the Job mapper events never see
+    cache.invalidate_on_commit(session, 'jobs')
+    if count is not None:
+        session.info.setdefault('popular_job_counts', {})[application.job_id] = count
+
+
+@event.listens_for(Application, 'after_insert')
+def _count_application(mapper, connection, target):
+    _queue_count(target, _adjust_application_count(connection, target.job_id, 1))
+
+
+@event.listens_for(Application, 'after_delete')
+def _uncount_application(mapper, connection, target):
+    _queue_count(target, _adjust_application_count(connection, target.job_id, -1))
+
+
+@event.listens_for(Job, 'after_delete')
+def _forget_popular_job(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('popular_job_counts', {})[target.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_popular_job_counts(session):
+    counts = session.info.pop('popular_job_counts', None)
+    if not counts or popular_jobs.loaded_at is None:
+        return
+    for job_id, count in counts.items():
+        if count is None:
+            popular_jobs.discard(job_id)
+        else:
+            popular_jobs.offer(job_id, count)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_popular_job_counts(session):
+    session.info.pop('popular_job_counts', None)
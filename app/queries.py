@@ -0,0 +1,36 @@
+from sqlalchemy.orm import contains_eager, joinedload, load_only
+from app.models import Application, Job, User
+from app.pagination import paginate_keyset
+
+
+# ============= APPLICATION LOADERS =============
+
+def recruiter_applications(recruiter_id, cursor=None, per_page=20):
+    """A page of applications to the recruiter's jobs, newest first.
+
+    Applications are joined through jobs in the same statement, the
+    freelancer comes from a joined load, and every entity loads only the
+    columns applications.html renders.
+    """
+    query = Application.query.join(Job, Job.id == Application.job_id).filter(
+        Job.recruiter_id == recruiter_id
+    ).options(
+        load_only(Application.job_id, Application.freelancer_id, Application.cover_letter,
+                  Application.proposed_rate, Application.status, Application.created_at),
+        contains_eager(Application.job).load_only(Job.title),
+        joinedload(Application.freelancer).load_only(User.username, User.email)
+    )
+    return paginate_keyset(query, [Application.id], cursor=cursor, per_page=per_page)
+
+
+def freelancer_applications(freelancer_id, cursor=None, per_page=20):
+    """A page of the freelancer's own applications with each job and its recruiter, newest first"""
+    query = Application.query.filter(
+        Application.freelancer_id == freelancer_id
+    ).options(
+        load_only(Application.job_id, Application.proposed_rate, Application.status, Application.created_at),
+        joinedload(Application.job).load_only(
+            Job.title, Job.description, Job.budget, Job.duration, Job.recruiter_id
+        ).joinedload(Job.recruiter).load_only(User.username)
+    )
+    return paginate_keyset(query, [Application.id], cursor=cursor, per_page=per_page)
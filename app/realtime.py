@@ -0,0 +1,235 @@
+import json
+import queue
+import threading
+from abc import ABC, abstractmethod
+
+
+# ============= CHAT PUB/SUB BROKER =============
+
+class Subscription(ABC):
+    """A single subscriber's view of one or more channels"""
+
+    @abstractmethod
+    def get(self, timeout=None):
+        """Return the next payload, or None if nothing arrived before timeout"""
+
+    @abstractmethod
+    def close(self):
+        """Stop receiving and release the subscription"""
+
+
+class MemorySubscription(Subscription):
+    def __init__(self, backend, channel, maxsize):
+        self._backend = backend
+        self._channel = channel
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, payload):
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            # A stalled reader must never block the publisher; it will
+            # catch up from the database when it reconnects.
+            pass
+
+    def get(self, timeout=None):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._backend._unsubscribe(self._channel, self)
+
+
+class MemoryBackend:
+    """In-process broker. Only delivers to subscribers (and keeps stamps) in the same process,
+    so multi-worker deployments must use a shared backend."""
+
+    # Another worker's sends and reads never reach this process
+    shared = False
+
+    def __init__(self, queue_size=100):
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._stamps = {}
+
+    def publish(self, channel, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(payload)
+
+    def subscribe(self, channel):
+        subscription = MemorySubscription(self, channel, self._queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def get_stamp(self, key):
+        with self._lock:
+            stamp = self._stamps.get(key)
+            return dict(stamp) if stamp is not None else None
+
+    def update_stamp(self, key, fields):
+        with self._lock:
+            stamp = self._stamps.setdefault(key, {})
+            for field, value in fields.items():
+                if value > stamp.get(field, 0):
+                    stamp[field] = value
+
+    def _unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+
+class RedisSubscription(Subscription):
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def get(self, timeout=None):
+        message = self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout or 0)
+        if message is None:
+            return None
+        return json.loads(message['data'])
+
+    def close(self):
+        self._pubsub.close()
+
+
+class RedisBackend:
+    """Redis pub/sub broker, shared by every worker process pointed at the same server"""
+
+    shared = True
+
+    # Raise each field to the given value, never lower it
+    UPDATE_STAMP_SCRIPT = """
+        for i = 1, #ARGV - 1, 2 do
+            local current = tonumber(redis.call('HGET', KEYS[1], ARGV[i]) or '0')
+            if tonumber(ARGV[i + 1]) > current then
+                redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+            end
+        end
+        redis.call('EXPIRE', KEYS[1], ARGV[#ARGV])
+    """
+    STAMP_TTL = 24 * 60 * 60
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('CHAT_BROKER_URL points at Redis but the "redis" package is not installed')
+        self._client = redis.Redis.from_url(url)
+        self._update_stamp = self._client.register_script(self.UPDATE_STAMP_SCRIPT)
+
+    def publish(self, channel, payload):
+        self._client.publish(channel, json.dumps(payload))
+
+    def subscribe(self, channel):
+        pubsub = self._client.pubsub()
+        pubsub.subscribe(channel)
+        return RedisSubscription(pubsub)
+
+    def get_stamp(self, key):
+        stamp = self._client.hgetall(f'stamp:{key}')
+        if not stamp:
+            return None
+        return {field.decode(): int(value) for field, value in stamp.items()}
+
+    def update_stamp(self, key, fields):
+        args = []
+        for field, value in fields.items():
+            args.extend([field, value])
+        args.append(self.STAMP_TTL)
+        self._update_stamp(keys=[f'stamp:{key}'], args=args)
+
+
+class ChatBroker:
+    """Publishes new chat messages to anyone streaming the conversation.
+
+    The default memory:// backend only reaches streams in the same process.
+    With several workers, SSE streams then fall back to ending after one
+    heartbeat so the client reconnects and catches up from the database.
+    Point CHAT_BROKER_URL at Redis for live delivery across workers.
+    """
+
+    def __init__(self, app=None):
+        self._backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        url = app.config.setdefault('CHAT_BROKER_URL', 'memory://')
+        if url.startswith('memory://'):
+            self._backend = MemoryBackend()
+            if not (app.debug or app.testing):
+                print("❌ CHAT_BROKER_URL is memory://: chat streams only see messages sent through "
+                      "this worker; use a shared broker with multiple workers")
+        elif url.startswith(('redis://', 'rediss://', 'unix://')):
+            self._backend = RedisBackend(url)
+        else:
+            raise ValueError(f'Unsupported CHAT_BROKER_URL: {url}')
+        app.extensions['chat_broker'] = self
+
+    @property
+    def shared(self):
+        """True when every worker publishes and stamps through the same backend"""
+        return self._backend.shared
+
+    @staticmethod
+    def channel_for(conversation_id):
+        return f'conversation:{conversation_id}'
+
+    def publish_message(self, conversation_id, payload):
+        """Publish a serialized message; failures never break the sender's request"""
+        try:
+            self._backend.publish(self.channel_for(conversation_id), payload)
+        except Exception as e:
+            print(f"❌ Error publishing chat message: {str(e)}")
+
+    def subscribe(self, conversation_id):
+        return self._backend.subscribe(self.channel_for(conversation_id))
+
+    # Version stamps let idle polls skip the database. A conversation's stamp holds
+    # its participants, its latest message id and, per participant, the id up to
+    # which their received messages are known to be marked read.
+
+    def get_stamp(self, conversation_id):
+        try:
+            return self._backend.get_stamp(self.channel_for(conversation_id))
+        except Exception as e:
+            print(f"❌ Error reading conversation stamp: {str(e)}")
+            return None
+
+    def update_stamp(self, conversation_id, participants, latest_message_id, read_by=None):
+        """Raise the stamp's latest id (and read marker for read_by); stamps never go backwards"""
+        fields = {
+            'user1': participants[0],
+            'user2': participants[1],
+            'latest': latest_message_id
+        }
+        if read_by is not None:
+            fields[f'read:{read_by}'] = latest_message_id
+        try:
+            self._backend.update_stamp(self.channel_for(conversation_id), fields)
+        except Exception as e:
+            print(f"❌ Error updating conversation stamp: {str(e)}")
+
+    def is_up_to_date(self, conversation_id, user_id, last_message_id):
+        """True when user_id already has every message and nothing is left to mark read.
+
+        Always False for a per-process backend: a send handled by another
+        worker never reaches this one's stamp, so only the database can tell.
+        """
+        if not self.shared:
+            return False
+        stamp = self.get_stamp(conversation_id)
+        if not stamp or user_id not in (stamp.get('user1'), stamp.get('user2')):
+            return False
+        latest = stamp.get('latest', 0)
+        return last_message_id >= latest and stamp.get(f'read:{user_id}', 0) >= latest
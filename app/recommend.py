@@ -0,0 +1,365 @@
+import math
+import threading
+from datetime import datetime
+import numpy as np
+from scipy import sparse
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.jobsync import JobSync
+from app.models import Job, Application, User, JobRecommendation
+from app.search import tokenize
+
+
+# ============= TF-IDF JOB VECTORS =============
+
+class JobRecommender:
+    """Scores open jobs against a freelancer's profile with one sparse matrix-vector product.
+
+    Each job is an L2-normalized TF-IDF row over its skills (weighted
+    double) and description. A freelancer's profile is the normalized sum
+    of the rows of the jobs they applied to, so a job's score is its
+    cosine similarity to that history. New jobs are appended with the IDF
+    known at the time; a rebuild recomputes every row with fresh IDF.
+    """
+
+    SKILLS_WEIGHT = 2.0
+    # Retired rows are dropped from the matrix once they are this share of it
+    COMPACT_RATIO = 0.25
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.sync = JobSync()
+        self._reset()
+
+    def _reset(self):
+        self._vocabulary = {}
+        self._document_frequency = []
+        self._columns_for_job = {}
+        self._row_for_job = {}
+        self._job_ids = np.zeros(0, dtype=np.int64)
+        self._is_open = np.zeros(0, dtype=bool)
+        self._pending = []
+        self._retired = 0
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float64)
+        self._published = None
+        self.built = False
+
+    def __len__(self):
+        return len(self._row_for_job)
+
+    @classmethod
+    def _term_counts(cls, skills_required, description):
+        counts = {}
+        for token in tokenize(skills_required):
+            counts[token] = counts.get(token, 0.0) + cls.SKILLS_WEIGHT
+        for token in tokenize(description):
+            counts[token] = counts.get(token, 0.0) + 1.0
+        return counts
+
+    def _count_terms(self, job_id, counts):
+        """Add a job's terms to the document frequencies (caller holds the lock)"""
+        columns = []
+        for term in counts:
+            column = self._vocabulary.get(term)
+            if column is None:
+                column = self._vocabulary[term] = len(self._document_frequency)
+                self._document_frequency.append(0)
+            self._document_frequency[column] += 1
+            columns.append(column)
+        self._columns_for_job[job_id] = columns
+
+    def _idf(self, column, document_count):
+        return math.log((1 + document_count) / (1 + self._document_frequency[column])) + 1.0
+
+    def idf(self, term):
+        """The IDF a job vectorized now would get for term, or None for an unseen term"""
+        with self._lock:
+            column = self._vocabulary.get(term)
+            if column is None:
+                return None
+            return self._idf(column, len(self._row_for_job))
+
+    def _vectorize(self, counts, document_count):
+        columns = np.fromiter((self._vocabulary[term] for term in counts), dtype=np.int32, count=len(counts))
+        values = np.fromiter(
+            (weight * self._idf(self._vocabulary[term], document_count) for term, weight in counts.items()),
+            dtype=np.float64, count=len(counts)
+        )
+        norm = np.linalg.norm(values)
+        if norm:
+            values /= norm
+        return columns, values
+
+    def build(self, jobs):
+        """Vectorize every job from scratch; jobs yields (id, skills_required, description, status)"""
+        with self._lock:
+            self._reset()
+            documents = []
+            for job_id, skills_required, description, status in jobs:
+                counts = self._term_counts(skills_required, description)
+                self._count_terms(job_id, counts)
+                documents.append((job_id, counts, status))
+
+            for job_id, counts, status in documents:
+                self._pending.append((job_id, status == 'open') + self._vectorize(counts, len(documents)))
+                self._row_for_job[job_id] = None
+            self._materialize()
+            self.built = True
+
+    def add(self, job_id, skills_required, description, status='open'):
+        """Append (or re-vectorize) one job without touching the other rows"""
+        with self._lock:
+            if job_id in self._row_for_job:
+                self.remove(job_id)
+            counts = self._term_counts(skills_required, description)
+            self._count_terms(job_id, counts)
+            self._pending.append((job_id, status == 'open') + self._vectorize(counts, len(self._row_for_job) + 1))
+            self._row_for_job[job_id] = None
+            self._published = None
+
+    def remove(self, job_id):
+        """Retire a job's row and its document frequencies; the row is dropped at the next compaction"""
+        with self._lock:
+            if job_id not in self._row_for_job:
+                return
+            row = self._row_for_job.pop(job_id)
+            for column in self._columns_for_job.pop(job_id, ()):
+                self._document_frequency[column] -= 1
+            if row is None:
+                self._pending = [entry for entry in self._pending if entry[0] != job_id]
+            else:
+                # Safe in place: readers only ever see the copies in the published snapshot
+                self._is_open[row] = False
+                self._job_ids[row] = 0
+                self._retired += 1
+            self._published = None
+
+    def _compact(self):
+        """Drop retired rows and renumber the live ones (caller holds the lock)"""
+        keep = self._job_ids != 0
+        new_rows = np.cumsum(keep) - 1
+        self._matrix = self._matrix[np.flatnonzero(keep)]
+        self._job_ids = self._job_ids[keep]
+        self._is_open = self._is_open[keep]
+        self._row_for_job = {
+            job_id: None if row is None else int(new_rows[row])
+            for job_id, row in self._row_for_job.items()
+        }
+        self._retired = 0
+
+    def _materialize(self):
+        """Compact if needed, then stack pending rows onto the matrix (caller holds the lock)"""
+        if self._retired and self._retired >= self.COMPACT_RATIO * self._matrix.shape[0]:
+            self._compact()
+        width = len(self._vocabulary)
+        if self._matrix.shape[1] < width:
+            # A new matrix over the same arrays; resizing in place would change published snapshots
+            matrix = self._matrix
+            self._matrix = sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr),
+                                             shape=(matrix.shape[0], width))
+        if not self._pending:
+            return
+
+        indptr = [0]
+        indices = []
+        data = []
+        first_row = self._matrix.shape[0]
+        for offset, (job_id, is_open, columns, values) in enumerate(self._pending):
+            self._row_for_job[job_id] = first_row + offset
+            indices.append(columns)
+            data.append(values)
+            indptr.append(indptr[-1] + len(columns))
+        block = sparse.csr_matrix(
+            (np.concatenate(data), np.concatenate(indices), indptr),
+            shape=(len(self._pending), width)
+        )
+        self._matrix = sparse.vstack([self._matrix, block], format='csr')
+        self._job_ids = np.concatenate([self._job_ids, [entry[0] for entry in self._pending]]).astype(np.int64)
+        self._is_open = np.concatenate([self._is_open, [entry[1] for entry in self._pending]]).astype(bool)
+        self._pending = []
+
+    def _snapshot(self):
+        # Published once per change: readers keep using a snapshot after the lock
+        # is released, so it holds copies that later adds and removes never touch
+        with self._lock:
+            if self._published is None:
+                self._materialize()
+                self._published = (self._matrix, self._job_ids.copy(), self._is_open.copy(), dict(self._row_for_job))
+            return self._published
+
+    def profile(self, applied_job_ids, matrix=None, row_for_job=None):
+        """Normalized sum of the applied jobs' vectors, or None without usable history"""
+        if matrix is None:
+            matrix, _, _, row_for_job = self._snapshot()
+        rows = [row_for_job[job_id] for job_id in applied_job_ids if job_id in row_for_job]
+        if not rows:
+            return None
+        vector = np.asarray(matrix[rows].sum(axis=0)).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    @staticmethod
+    def _top_k(scores, job_ids, k):
+        k = min(k, int(np.count_nonzero(scores > 0)))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(int(job_ids[row]), float(scores[row])) for row in best]
+
+    def recommend(self, applied_job_ids, k=20):
+        """Return [(job_id, score)] for the best open jobs the freelancer has not applied to"""
+        matrix, job_ids, is_open, row_for_job = self._snapshot()
+        vector = self.profile(applied_job_ids, matrix, row_for_job)
+        if vector is None:
+            return []
+        scores = matrix @ vector
+        scores[~is_open] = 0.0
+        for job_id in applied_job_ids:
+            row = row_for_job.get(job_id)
+            if row is not None:
+                scores[row] = 0.0
+        return self._top_k(scores, job_ids, k)
+
+    def recommend_batch(self, applied_by_user, k=20, chunk_size=64):
+        """Top-k for many freelancers at once; yields (user_id, [(job_id, score)])"""
+        matrix, job_ids, is_open, row_for_job = self._snapshot()
+        users = list(applied_by_user.items())
+        for start in range(0, len(users), chunk_size):
+            chunk = []
+            profiles = []
+            for user_id, applied_job_ids in users[start:start + chunk_size]:
+                vector = self.profile(applied_job_ids, matrix, row_for_job)
+                if vector is not None:
+                    chunk.append((user_id, applied_job_ids))
+                    profiles.append(vector)
+            if not profiles:
+                continue
+
+            # One (jobs x terms) @ (terms x users) product scores the whole chunk
+            scores = np.asarray(matrix @ np.column_stack(profiles))
+            scores[~is_open, :] = 0.0
+            for column, (user_id, applied_job_ids) in enumerate(chunk):
+                user_scores = scores[:, column]
+                for job_id in applied_job_ids:
+                    row = row_for_job.get(job_id)
+                    if row is not None:
+                        user_scores[row] = 0.0
+                yield user_id, self._top_k(user_scores, job_ids, k)
+
+
+recommender = JobRecommender()
+
+
+def _job_rows(query):
+    return ((job.id, job.skills_required, job.description, job.status) for job in query)
+
+
+def build_recommender():
+    """Vectorize every job from the database"""
+    synced_at = datetime.utcnow()
+    recommender.build(_job_rows(Job.query.order_by(Job.id).yield_per(1000)))
+    recommender.sync.reset(synced_at)
+
+
+def ensure_recommender():
+    """Build on first use, then pick up jobs other processes posted or edited since"""
+    if not recommender.built:
+        build_recommender()
+        return
+    recommender.sync.catch_up(Job.query, lambda job: recommender.add(
+        job.id, job.skills_required, job.description, job.status
+    ))
+
+
+def applied_job_ids_for(user_id):
+    return [job_id for (job_id,) in db.session.query(Application.job_id).filter(Application.freelancer_id == user_id)]
+
+
+def recommend_jobs(user_id, k=20):
+    """Ranked job ids for one freelancer, preferring the last batch run when there is one"""
+    applied_job_ids = applied_job_ids_for(user_id)
+    # The batch run may predate a job closing; only open jobs are recommended
+    precomputed = db.session.query(JobRecommendation.job_id, JobRecommendation.score).join(
+        Job, Job.id == JobRecommendation.job_id
+    ).filter(
+        JobRecommendation.user_id == user_id,
+        Job.status == 'open'
+    ).order_by(JobRecommendation.rank).all()
+    applied = set(applied_job_ids)
+    precomputed = [(job_id, score) for job_id, score in precomputed if job_id not in applied]
+    if precomputed:
+        return precomputed[:k]
+
+    ensure_recommender()
+    return recommender.recommend(applied_job_ids, k)
+
+
+def precompute_recommendations(k=20):
+    """Batch mode: recompute and store the top-k for every freelancer with applications"""
+    build_recommender()
+
+    applied_by_user = {}
+    rows = db.session.query(Application.freelancer_id, Application.job_id).join(
+        User, User.id == Application.freelancer_id
+    ).filter(User.user_type == 'freelancer')
+    for user_id, job_id in rows:
+        applied_by_user.setdefault(user_id, []).append(job_id)
+
+    JobRecommendation.query.delete()
+    stored = 0
+    for user_id, ranked in recommender.recommend_batch(applied_by_user, k):
+        db.session.bulk_insert_mappings(JobRecommendation, [
+            {'user_id': user_id, 'job_id': job_id, 'score': score, 'rank': rank}
+            for rank, (job_id, score) in enumerate(ranked, start=1)
+        ])
+        stored += 1
+    db.session.commit()
+    return stored
+
+
+# ============= INCREMENTAL UPDATES =============
+
+@event.listens_for(Job, 'after_insert')
+@event.listens_for(Job, 'after_update')
+def _queue_job_vector(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('recommender_changes', {})[target.id] = (
+            target.skills_required, target.description, target.status, target.__dict__.get('updated_at')
+        )
+
+
+@event.listens_for(Job, 'after_delete')
+def _queue_job_vector_removal(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('recommender_changes', {})[target.id] = None
+
+
+@event.listens_for(Application, 'after_insert')
+def _queue_precomputed_refresh(mapper, connection, target):
+    # Drop the freelancer's batch results so their next visit scores the new history
+    connection.execute(
+        JobRecommendation.__table__.delete().where(JobRecommendation.user_id == target.freelancer_id)
+    )
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_recommender_changes(session):
+    changes = session.info.pop('recommender_changes', None)
+    if not changes or not recommender.built:
+        return
+    for job_id, fields in changes.items():
+        if fields is None:
+            recommender.remove(job_id)
+        else:
+            skills_required, description, status, updated_at = fields
+            recommender.add(job_id, skills_required, description, status)
+            recommender.sync.seen(job_id, updated_at)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_recommender_changes(session):
+    session.info.pop('recommender_changes', None)
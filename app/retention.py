@@ -0,0 +1,138 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import case, func, literal, select
+from app import db, cache
+from app.models import (
+    Notification, Message, Conversation, EmailValidationLog,
+    notifications_archive, messages_archive, email_validation_logs_archive
+)
+from app.stats import uncount_rows
+
+
+# ============= RETENTION POLICIES =============
+
+# table -> days a row stays in the hot table; override with app.config['RETENTION_DAYS'], None keeps forever.
+# Chat history is the users' own data, so archiving messages is opt-in.
+DEFAULT_RETENTION_DAYS = {
+    'notifications': 90,
+    'messages': None,
+    'email_validation_logs': 180,
+}
+
+
+class RetentionPolicy:
+    """Which rows of a table are past retention, and the archive table they move to"""
+
+    def __init__(self, model, age_column, archive, conditions=None, join=None, tags=()):
+        self.model = model
+        self.name = model.__tablename__
+        self.age_column = age_column
+        self.archive = archive
+        self.conditions = conditions or (lambda: [])
+        self.join = join
+        self.tags = tags
+
+    def cold_ids(self, cutoff, after_id=0):
+        """Select the ids of expired rows in id order"""
+        query = select(self.model.id)
+        if self.join is not None:
+            query = query.join(*self.join)
+        return query.where(
+            self.age_column < cutoff,
+            self.model.id > after_id,
+            *self.conditions()
+        ).order_by(self.model.id)
+
+
+def _read_by_receiver():
+    # Unread messages still count towards the receiver's badge, and the
+    # conversation's latest message backs its inbox summary
+    watermark = case(
+        (Message.receiver_id == Conversation.user1_id, Conversation.user1_last_read_id),
+        else_=Conversation.user2_last_read_id
+    )
+    return [Message.id <= watermark, Message.id != Conversation.last_message_id]
+
+
+POLICIES = [
+    RetentionPolicy(
+        Notification, Notification.last_seen_at, notifications_archive,
+        # Unread notifications still count towards the navbar badge
+        conditions=lambda: [Notification.is_read == True]
+    ),
+    RetentionPolicy(
+        Message, Message.created_at, messages_archive,
+        conditions=_read_by_receiver,
+        join=(Conversation, Conversation.id == Message.conversation_id),
+        tags=('messages',)
+    ),
+    RetentionPolicy(
+        EmailValidationLog, EmailValidationLog.attempted_at, email_validation_logs_archive,
+        tags=('email_logs',)
+    ),
+]
+
+
+# ============= CHUNKED ARCHIVE AND DELETE =============
+
+def count_expired(policy, days, now=None):
+    """How many rows the policy would move right now"""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    return db.session.execute(
+        select(func.count()).select_from(policy.cold_ids(cutoff).order_by(None).subquery())
+    ).scalar()
+
+
+def apply_policy(policy, days, archive=True, chunk_size=1000, pause=0.1, now=None):
+    """Move expired rows out of the hot table one short transaction at a time; returns rows moved.
+
+    Each chunk is selected by primary key, copied to the archive table,
+    deleted and committed on its own, then the loop sleeps for `pause`
+    seconds so replication and other writers keep up.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=days)
+    table = policy.model.__table__
+    moved = 0
+    last_id = 0
+    while True:
+        ids = db.session.execute(policy.cold_ids(cutoff, last_id).limit(chunk_size)).scalars().all()
+        if not ids:
+            break
+        try:
+            if archive:
+                db.session.execute(policy.archive.insert().from_select(
+                    [column.name for column in table.columns] + ['archived_at'],
+                    select(*table.columns, literal(now, db.DateTime)).where(table.c.id.in_(ids))
+                ))
+            # Bulk deletes skip the mapper events that keep the dashboard totals current
+            uncount_rows(db.session.connection(), policy.model, ids)
+            db.session.execute(table.delete().where(table.c.id.in_(ids)))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if policy.tags:
+            cache.invalidate(*policy.tags)
+        moved += len(ids)
+        last_id = ids[-1]
+        if len(ids) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return moved
+
+
+def apply_retention(retention_days=None, only=None, archive=True, chunk_size=1000, pause=0.1, dry_run=False):
+    """Run every policy with a retention period; returns [(table, rows moved or expired)]"""
+    retention_days = {**DEFAULT_RETENTION_DAYS, **(retention_days or {})}
+    results = []
+    for policy in POLICIES:
+        days = retention_days.get(policy.name)
+        if days is None or (only and policy.name not in only):
+            continue
+        if dry_run:
+            results.append((policy.name, count_expired(policy, days)))
+        else:
+            results.append((policy.name, apply_policy(policy, days, archive, chunk_size, pause)))
+    return results
@@ -1,13 +1,48 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, Response, current_app, session
 from flask_login import login_user, logout_user, login_required, current_user
-from app import db
-from app.models import User, Job, Application, Notification, Conversation, Message, UserStatsView, JobStatsView, ApplicationStatsView, RecentActivityView, PopularJobsView, EmailValidationLog,validate_email
+from app import db, broker, cache, audit, replicas
+from app.models import User, Job, Skill, Application, ActivityEvent, Notification, Conversation, Message, parse_skills, EmailValidationLog,validate_email
+from app.feed import get_open_jobs_page
+from app.exports import EXPORT_KINDS, export_response
+from app.pagination import paginate_keyset, paginate_sortable
+from app.pool import pool_stats
+from app.popular import get_popular_jobs
+from app.queries import recruiter_applications, freelancer_applications
+from app.recommend import recommend_jobs
+from app.routing import read_replica, on_primary
+from app.search import search_index, catch_up_search_index
+from app.skills import skill_index, ensure_skill_index
+from app.stats import get_dashboard_stats
 from werkzeug.security import generate_password_hash
-from sqlalchemy import or_, and_, text
+from sqlalchemy import or_, and_, text, func, case
+from sqlalchemy.orm import joinedload
 from functools import wraps
+from datetime import datetime
+import json
+import time
 
 main = Blueprint('main', __name__)
 
+INBOX_PAGE_SIZE = 30
+CONVERSATION_PAGE_SIZE = 50
+JOB_FEED_PAGE_SIZE = 20
+SEARCH_PAGE_SIZE = 20
+RECOMMENDATION_COUNT = 20
+ACTIVITY_PAGE_SIZE = 50
+APPLICATIONS_PAGE_SIZE = 20
+ADMIN_PAGE_SIZE = 50
+NOTIFICATIONS_PAGE_SIZE = 50
+
+# Sortable admin list columns; dates sort by id, which follows insertion order and is never NULL
+ADMIN_USER_SORTS = {'id': User.id, 'created_at': User.id, 'username': User.username,
+                    'email': User.email, 'user_type': User.user_type}
+ADMIN_JOB_SORTS = {'id': Job.id, 'created_at': Job.id, 'title': Job.title,
+                   'budget': Job.budget, 'status': Job.status}
+ADMIN_APPLICATION_SORTS = {'id': Application.id, 'created_at': Application.id,
+                           'proposed_rate': Application.proposed_rate, 'status': Application.status}
+ADMIN_EMAIL_LOG_SORTS = {'id': EmailValidationLog.id, 'attempted_at': EmailValidationLog.id,
+                         'email': EmailValidationLog.email, 'is_valid': EmailValidationLog.is_valid}
+
 # Admin required decorator
 def admin_required(f):
     @wraps(f)
@@ -18,6 +53,10 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def viewer_cache_key():
+    """Cached pages embed the navbar, so they vary by viewer and their unread badges"""
+    return (current_user.id, current_user.unread_messages, current_user.unread_notifications)
+
 @main.route('/')
 def index():
     return render_template('index.html')
@@ -38,14 +77,7 @@ def register():
         # Validate email format using Python validation
         if not validate_email(email):
             # Log validation attempt
-            log = EmailValidationLog(
-                email=email,
-                is_valid=False,
-                validation_message='Invalid email format',
-                action_type='registration'
-            )
-            db.session.add(log)
-            db.session.commit()
+            EmailValidationLog.log(email, False, 'Invalid email format', 'registration')
             
             flash('Invalid email format! Please enter a valid email address.', 'error')
             return redirect(url_for('main.register'))
@@ -75,14 +107,7 @@ def register():
             db.session.commit()
             
             # Log successful validation
-            log = EmailValidationLog(
-                email=email,
-                is_valid=True,
-                validation_message='Email validated successfully',
-                action_type='registration'
-            )
-            db.session.add(log)
-            db.session.commit()
+            EmailValidationLog.log(email, True, 'Email validated successfully', 'registration')
             
             flash('Registration successful! Please login.', 'success')
             return redirect(url_for('main.login'))
@@ -113,14 +138,7 @@ def login():
         # Validate email format
         if not validate_email(email):
             # Log validation attempt
-            log = EmailValidationLog(
-                email=email,
-                is_valid=False,
-                validation_message='Invalid email format',
-                action_type='login'
-            )
-            db.session.add(log)
-            db.session.commit()
+            EmailValidationLog.log(email, False, 'Invalid email format', 'login')
             
             flash('Invalid email format!', 'error')
             return render_template('login.html')
@@ -137,14 +155,7 @@ def login():
                 return render_template('login.html')
             
             # Log successful validation
-            log = EmailValidationLog(
-                email=email,
-                is_valid=True,
-                validation_message='Login successful',
-                action_type='login'
-            )
-            db.session.add(log)
-            db.session.commit()
+            EmailValidationLog.log(email, True, 'Login successful', 'login')
             
             # Login the user
             login_user(user)
@@ -175,22 +186,148 @@ def logout():
 
 @main.route('/dashboard')
 @login_required
+@read_replica
 def dashboard():
     try:
         if current_user.user_type == 'recruiter':
             jobs = Job.query.filter_by(recruiter_id=current_user.id).order_by(Job.created_at.desc()).all()
             return render_template('dashboard.html', jobs=jobs)
         else:  # freelancer
-            # Get all open jobs
-            jobs = Job.query.filter_by(status='open').order_by(Job.created_at.desc()).all()
-            # Get user's applications
-            applications = Application.query.filter_by(freelancer_id=current_user.id).all()
-            applied_job_ids = [app.job_id for app in applications]
-            return render_template('dashboard.html', jobs=jobs, applied_job_ids=applied_job_ids)
+            # Get a page of open jobs (shared between freelancers, so usually cached)
+            page = get_open_jobs_page(cursor=request.args.get('cursor'), per_page=JOB_FEED_PAGE_SIZE)
+            # Overlay which of these jobs the user has applied to
+            page_job_ids = [job['id'] for job in page.items]
+            applied_job_ids = set()
+            if page_job_ids:
+                applied_job_ids = {job_id for (job_id,) in db.session.query(Application.job_id).filter(
+                    Application.freelancer_id == current_user.id,
+                    Application.job_id.in_(page_job_ids)
+                )}
+            return render_template('dashboard.html',
+                                 jobs=page.items,
+                                 applied_job_ids=applied_job_ids,
+                                 next_cursor=page.next_cursor)
     except Exception as e:
         flash(f'Error loading dashboard: {str(e)}', 'error')
         return redirect(url_for('main.index'))
 
+@main.route('/jobs/search')
+@login_required
+@read_replica
+def search_jobs():
+    """Full-text and skill-filtered search over open jobs"""
+    try:
+        query = request.args.get('q', '').strip()
+        skills = parse_skills(request.args.get('skills', ''))
+        skill_match = 'any' if request.args.get('skill_match') == 'any' else 'all'
+        page = max(request.args.get('page', 1, type=int), 1)
+        search_args = {
+            'q': query,
+            'skills': ', '.join(skills),
+            'skill_match': skill_match if skills else None,
+            'location': request.args.get('location', '').strip(),
+            'min_budget': request.args.get('min_budget', type=float),
+            'max_budget': request.args.get('max_budget', type=float)
+        }
+        search_args = {key: value for key, value in search_args.items() if value not in (None, '')}
+        
+        jobs = []
+        has_next = False
+        ranked_ids = []
+        offset = (page - 1) * SEARCH_PAGE_SIZE
+        
+        skill_matches = None
+        if skills:
+            ensure_skill_index()
+            if skill_match == 'any':
+                skill_matches = skill_index.match(any_of=skills)
+            else:
+                skill_matches = skill_index.match(all_of=skills)
+        
+        if query:
+            # Pick up jobs other workers have posted or edited since the last catch-up
+            catch_up_search_index()
+            results = search_index.search(
+                query,
+                min_budget=search_args.get('min_budget'),
+                max_budget=search_args.get('max_budget'),
+                location=search_args.get('location'),
+                limit=SEARCH_PAGE_SIZE + 1,
+                offset=offset,
+                job_ids=skill_matches
+            )
+            has_next = len(results) > SEARCH_PAGE_SIZE
+            ranked_ids = [job_id for job_id, score in results[:SEARCH_PAGE_SIZE]]
+        elif skill_matches is not None:
+            # Skill filter alone: newest matching jobs first, straight off the bitmap
+            matching_ids = []
+            for job_id in skill_matches.iter_descending():
+                matching_ids.append(job_id)
+                if len(matching_ids) > offset + SEARCH_PAGE_SIZE:
+                    break
+            has_next = len(matching_ids) > offset + SEARCH_PAGE_SIZE
+            ranked_ids = matching_ids[offset:offset + SEARCH_PAGE_SIZE]
+        
+        # Load the hits in rank order; jobs deleted or closed by other workers drop out here
+        if ranked_ids:
+            jobs_query = Job.query.options(joinedload(Job.recruiter))
+            found = {job.id: job for job in jobs_query.filter(Job.id.in_(ranked_ids))}
+            missing = [job_id for job_id in ranked_ids if job_id not in found]
+            if missing:
+                # A lagging replica may not have jobs this worker already indexed; only the primary says they are gone
+                with on_primary():
+                    found.update((job.id, job) for job in jobs_query.filter(Job.id.in_(missing)))
+            for job_id in ranked_ids:
+                job = found.get(job_id)
+                if job is None:
+                    search_index.remove(job_id)
+                    skill_index.remove(job_id)
+                elif job.status == 'open':
+                    jobs.append(job)
+        
+        applied_job_ids = set()
+        if jobs and current_user.user_type == 'freelancer':
+            applied_job_ids = {job_id for (job_id,) in db.session.query(Application.job_id).filter(
+                Application.freelancer_id == current_user.id,
+                Application.job_id.in_([job.id for job in jobs])
+            )}
+        
+        return render_template('job_search.html',
+                             query=query,
+                             skills=skills,
+                             jobs=jobs,
+                             applied_job_ids=applied_job_ids,
+                             page=page,
+                             has_next=has_next,
+                             search_args=search_args)
+    except Exception as e:
+        flash(f'Error searching jobs: {str(e)}', 'error')
+        return redirect(url_for('main.dashboard'))
+
+@main.route('/jobs/recommended')
+@login_required
+def recommended_jobs():
+    """Open jobs ranked by similarity to the ones the freelancer applied to"""
+    if current_user.user_type != 'freelancer':
+        flash('Recommendations are only available to freelancers!', 'error')
+        return redirect(url_for('main.dashboard'))
+    
+    try:
+        ranked_ids = [job_id for job_id, score in recommend_jobs(current_user.id, RECOMMENDATION_COUNT)]
+        
+        jobs = []
+        if ranked_ids:
+            found = {job.id: job for job in Job.query.options(joinedload(Job.recruiter)).filter(
+                Job.id.in_(ranked_ids),
+                Job.status == 'open'
+            )}
+            jobs = [found[job_id] for job_id in ranked_ids if job_id in found]
+        
+        return render_template('job_recommendations.html', jobs=jobs, applied_job_ids=set())
+    except Exception as e:
+        flash(f'Error loading recommendations: {str(e)}', 'error')
+        return redirect(url_for('main.dashboard'))
+
 @main.route('/job/new', methods=['GET', 'POST'])
 @login_required
 def new_job():
@@ -207,10 +344,14 @@ def new_job():
                 budget=float(request.form.get('budget', 0)),
                 duration=request.form.get('duration'),
                 location=request.form.get('location'),
-                recruiter_id=current_user.id
+                recruiter_id=current_user.id,
+                created_at=datetime.utcnow()
             )
+            job.skills = Skill.for_names(parse_skills(job.skills_required))
             
             db.session.add(job)
+            db.session.flush()
+            ActivityEvent.record('job_posted', current_user, job.title, job.id)
             db.session.commit()
             
             flash('Job posted successfully!', 'success')
@@ -246,10 +387,13 @@ def apply_job(job_id):
             job_id=job_id,
             freelancer_id=current_user.id,
             cover_letter=request.form.get('cover_letter'),
-            proposed_rate=float(request.form.get('proposed_rate', 0))
+            proposed_rate=float(request.form.get('proposed_rate', 0)),
+            created_at=datetime.utcnow()
         )
         
         db.session.add(application)
+        db.session.flush()
+        ActivityEvent.record('application_submitted', current_user, job.title, application.id)
         
         # Create notification for recruiter
         notification = Notification(
@@ -258,6 +402,7 @@ def apply_job(job_id):
             type='application_received'
         )
         db.session.add(notification)
+        User.adjust_unread_counts(job.recruiter_id, notifications=1)
         
         db.session.commit()
         
@@ -272,15 +417,15 @@ def apply_job(job_id):
 @login_required
 def applications():
     try:
+        cursor = request.args.get('cursor')
         if current_user.user_type == 'recruiter':
-            # Get applications for recruiter's jobs
-            job_ids = [job.id for job in current_user.jobs_posted]
-            apps = Application.query.filter(Application.job_id.in_(job_ids)).order_by(Application.created_at.desc()).all()
+            # Applications to the recruiter's jobs, joined through jobs in one statement
+            page = recruiter_applications(current_user.id, cursor=cursor, per_page=APPLICATIONS_PAGE_SIZE)
         else:
             # Get freelancer's applications
-            apps = Application.query.filter_by(freelancer_id=current_user.id).order_by(Application.created_at.desc()).all()
+            page = freelancer_applications(current_user.id, cursor=cursor, per_page=APPLICATIONS_PAGE_SIZE)
         
-        return render_template('applications.html', applications=apps)
+        return render_template('applications.html', applications=page.items, next_cursor=page.next_cursor)
     except Exception as e:
         flash(f'Error loading applications: {str(e)}', 'error')
         return redirect(url_for('main.dashboard'))
@@ -313,6 +458,8 @@ def update_application(app_id, action):
             type=f'application_{action}ed'
         )
         db.session.add(notification)
+        User.adjust_unread_counts(application.freelancer_id, notifications=1)
+        ActivityEvent.record(f'application_{action}ed', current_user, application.job.title, application.id)
         db.session.commit()
         
         flash(f'Application {action}ed successfully!', 'success')
@@ -327,12 +474,20 @@ def update_application(app_id, action):
 def notifications():
     try:
         # Mark all notifications as read
-        Notification.query.filter_by(user_id=current_user.id, is_read=False).update({'is_read': True})
+        marked_read = Notification.query.filter_by(user_id=current_user.id, is_read=False).update({'is_read': True})
+        User.adjust_unread_counts(current_user.id, notifications=-marked_read)
         db.session.commit()
         
-        # Get all notifications
-        notifs = Notification.query.filter_by(user_id=current_user.id).order_by(Notification.created_at.desc()).all()
-        return render_template('notifications.html', notifications=notifs)
+        # Most recently active first, one page at a time
+        page, sort, direction = paginate_sortable(
+            Notification.query.filter_by(user_id=current_user.id),
+            {'recent': Notification.last_seen_at},
+            Notification.id,
+            sort='recent',
+            cursor=request.args.get('cursor'),
+            per_page=NOTIFICATIONS_PAGE_SIZE
+        )
+        return render_template('notifications.html', notifications=page.items, next_cursor=page.next_cursor)
     except Exception as e:
         db.session.rollback()
         flash(f'Error loading notifications: {str(e)}', 'error')
@@ -342,18 +497,44 @@ def notifications():
 
 @main.route('/messages')
 @login_required
+@read_replica
 def messages():
     """Display all conversations for the current user"""
     try:
-        # Get all conversations where user is either user1 or user2
-        conversations = Conversation.query.filter(
+        # Get a page of conversations where user is either user1 or user2,
+        # with both participants loaded in the same query
+        query = Conversation.query.options(
+            joinedload(Conversation.user1),
+            joinedload(Conversation.user2)
+        ).filter(
             or_(
                 Conversation.user1_id == current_user.id,
                 Conversation.user2_id == current_user.id
             )
-        ).order_by(Conversation.updated_at.desc()).all()
+        )
+        page = paginate_keyset(query, [Conversation.updated_at, Conversation.id],
+                               cursor=request.args.get('cursor'), per_page=INBOX_PAGE_SIZE)
         
-        return render_template('messages.html', conversations=conversations)
+        # Count unread messages only where the summary says there can be any
+        unread_ids = [conv.id for conv in page.items if conv.has_unread(current_user.id)]
+        unread_counts = {}
+        if unread_ids:
+            last_read_id = case(
+                (Conversation.user1_id == current_user.id, Conversation.user1_last_read_id),
+                else_=Conversation.user2_last_read_id
+            )
+            unread_counts = dict(db.session.query(
+                Message.conversation_id, func.count(Message.id)
+            ).join(Conversation, Message.conversation_id == Conversation.id).filter(
+                Message.conversation_id.in_(unread_ids),
+                Message.receiver_id == current_user.id,
+                Message.id > last_read_id
+            ).group_by(Message.conversation_id).all())
+        
+        return render_template('messages.html',
+                             conversations=page.items,
+                             unread_counts=unread_counts,
+                             next_cursor=page.next_cursor)
     except Exception as e:
         flash(f'Error loading messages: {str(e)}', 'error')
         return redirect(url_for('main.dashboard'))
@@ -379,7 +560,9 @@ def new_conversation(user_id):
         # Create new conversation
         conversation = Conversation(
             user1_id=current_user.id,
-            user2_id=user_id
+            user2_id=user_id,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow()
         )
         db.session.add(conversation)
         db.session.commit()
@@ -402,29 +585,55 @@ def conversation(conversation_id):
             flash('You do not have access to this conversation.', 'error')
             return redirect(url_for('main.messages'))
         
+        participants = (conversation.user1_id, conversation.user2_id)
+        latest_message_id = conversation.last_message_id or db.session.query(func.max(Message.id)).filter(
+            Message.conversation_id == conversation_id
+        ).scalar() or 0
+        
+        # Mark received messages as read (before loading, so the commit expires nothing we render)
+        if latest_message_id > conversation.get_last_read_id(current_user.id):
+            conversation.mark_read(current_user.id, latest_message_id)
+            db.session.commit()
+        
+        broker.update_stamp(conversation_id, participants, latest_message_id, read_by=current_user.id)
+        
         # Get the other user
         other_user = conversation.get_other_user(current_user.id)
         
-        # Get all messages in this conversation
-        messages = conversation.messages.order_by(Message.created_at.asc()).all()
-        
-        # Mark received messages as read
-        Message.query.filter_by(
-            conversation_id=conversation_id,
-            receiver_id=current_user.id,
-            is_read=False
-        ).update({'is_read': True})
-        db.session.commit()
+        # Get the newest page of messages; older ones load through message_history
+        page = paginate_keyset(conversation.messages, [Message.id], per_page=CONVERSATION_PAGE_SIZE)
+        messages = list(reversed(page.items))
         
         return render_template('conversation.html', 
                              conversation=conversation, 
                              other_user=other_user, 
-                             messages=messages)
+                             messages=messages,
+                             older_cursor=page.next_cursor)
     except Exception as e:
         db.session.rollback()
         flash(f'Error loading conversation: {str(e)}', 'error')
         return redirect(url_for('main.messages'))
 
+@main.route('/messages/<int:conversation_id>/history')
+@login_required
+@read_replica
+def message_history(conversation_id):
+    """Fetch a page of older messages (for the "Load older messages" button)"""
+    try:
+        conversation = Conversation.query.get_or_404(conversation_id)
+        
+        # Verify user is part of this conversation
+        if conversation.user1_id != current_user.id and conversation.user2_id != current_user.id:
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        page = paginate_keyset(conversation.messages, [Message.id],
+                               cursor=request.args.get('before'), per_page=CONVERSATION_PAGE_SIZE)
+        messages_data = [msg.to_dict() for msg in reversed(page.items)]
+        
+        return jsonify({'messages': messages_data, 'next_cursor': page.next_cursor})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @main.route('/messages/<int:conversation_id>/send', methods=['POST'])
 @login_required
 def send_message(conversation_id):
@@ -446,31 +655,40 @@ def send_message(conversation_id):
         
         # Determine receiver
         receiver_id = conversation.user2_id if conversation.user1_id == current_user.id else conversation.user1_id
+        participants = (conversation.user1_id, conversation.user2_id)
         
         # Create message
         message = Message(
             conversation_id=conversation_id,
             sender_id=current_user.id,
             receiver_id=receiver_id,
-            content=content
+            content=content,
+            created_at=datetime.utcnow()
         )
         
         db.session.add(message)
         
-        # Update conversation timestamp
-        from datetime import datetime
-        conversation.updated_at = datetime.utcnow()
+        # Bump the receiver's unread notification for this conversation (or, as a digest, for all of them)
+        User.adjust_unread_counts(receiver_id, messages=1)
+        if current_app.config['NOTIFICATION_DIGEST']:
+            Notification.notify_coalesced(receiver_id, f'New messages, latest from {current_user.username}', 'new_message')
+        else:
+            Notification.notify_coalesced(receiver_id, f'New message from {current_user.username}', 'new_message', conversation_id)
         
-        # Create notification for receiver
-        notification = Notification(
-            user_id=receiver_id,
-            message=f'New message from {current_user.username}',
-            type='new_message'
-        )
-        db.session.add(notification)
+        # Serialize before commit expires the instance
+        db.session.flush()
+        payload = message.to_dict()
+        
+        # Update the inbox summary and conversation timestamp
+        conversation.set_last_message(message)
+        ActivityEvent.record('message_sent', current_user, conversation.get_other_user(current_user.id).username, conversation_id)
         
         db.session.commit()
         
+        # Push to anyone streaming this conversation and let idle polls see the new version
+        broker.update_stamp(conversation_id, participants, payload['id'])
+        broker.publish_message(conversation_id, payload)
+        
         flash('Message sent successfully!', 'success')
         return redirect(url_for('main.conversation', conversation_id=conversation_id))
         
@@ -480,9 +698,20 @@ def send_message(conversation_id):
         return redirect(url_for('main.conversation', conversation_id=conversation_id))
 
 @main.route('/messages/<int:conversation_id>/fetch')
-@login_required
 def fetch_messages(conversation_id):
     """Fetch new messages (for AJAX polling)"""
+    # Get timestamp of last message client has
+    last_message_id = request.args.get('last_message_id', 0, type=int)
+    
+    # Idle poll: the stamp says there is nothing new and nothing to mark read. Checked
+    # against the signed session's user id, before @login_required loads the user row
+    user_id = session.get('_user_id')
+    if user_id is not None and broker.is_up_to_date(conversation_id, int(user_id), last_message_id):
+        return jsonify({'messages': []})
+    return _fetch_new_messages(conversation_id, last_message_id)
+
+@login_required
+def _fetch_new_messages(conversation_id, last_message_id):
     try:
         conversation = Conversation.query.get_or_404(conversation_id)
         
@@ -490,56 +719,110 @@ def fetch_messages(conversation_id):
         if conversation.user1_id != current_user.id and conversation.user2_id != current_user.id:
             return jsonify({'error': 'Unauthorized'}), 403
         
-        # Get timestamp of last message client has
-        last_message_id = request.args.get('last_message_id', 0, type=int)
+        participants = (conversation.user1_id, conversation.user2_id)
         
         # Get new messages
         new_messages = Message.query.filter(
             Message.conversation_id == conversation_id,
             Message.id > last_message_id
         ).order_by(Message.created_at.asc()).all()
+        messages_data = [msg.to_dict() for msg in new_messages]
+        
+        if messages_data:
+            latest_message_id = max(msg['id'] for msg in messages_data)
+        else:
+            latest_message_id = db.session.query(func.max(Message.id)).filter(
+                Message.conversation_id == conversation_id
+            ).scalar() or 0
         
         # Mark received messages as read
-        Message.query.filter_by(
-            conversation_id=conversation_id,
-            receiver_id=current_user.id,
-            is_read=False
-        ).update({'is_read': True})
+        conversation.mark_read(current_user.id, latest_message_id)
         db.session.commit()
         
-        messages_data = [{
-            'id': msg.id,
-            'content': msg.content,
-            'sender_id': msg.sender_id,
-            'sender_username': msg.sender.username,
-            'created_at': msg.created_at.strftime('%Y-%m-%d %H:%M')
-        } for msg in new_messages]
+        broker.update_stamp(conversation_id, participants, latest_message_id, read_by=current_user.id)
         
         return jsonify({'messages': messages_data})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@main.route('/messages/<int:conversation_id>/stream')
+@login_required
+def stream_messages(conversation_id):
+    """Push new messages over Server-Sent Events (fetch_messages remains for polling clients)"""
+    conversation = Conversation.query.get_or_404(conversation_id)
+    
+    # Verify user is part of this conversation
+    if conversation.user1_id != current_user.id and conversation.user2_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    # EventSource sends Last-Event-ID when it reconnects
+    last_message_id = request.headers.get('Last-Event-ID', type=int) or request.args.get('last_message_id', 0, type=int)
+    
+    # Subscribe before catching up so nothing published in between is lost
+    subscription = broker.subscribe(conversation_id)
+    missed_messages = [msg.to_dict() for msg in Message.query.filter(
+        Message.conversation_id == conversation_id,
+        Message.id > last_message_id
+    ).order_by(Message.id.asc()).all()]
+    
+    # Give the connection back to the pool; the stream holds none while idle
+    db.session.remove()
+    
+    heartbeat = current_app.config.get('CHAT_STREAM_HEARTBEAT', 15)
+    max_duration = current_app.config.get('CHAT_STREAM_MAX_DURATION', 300)
+    if not broker.shared:
+        # Sends handled by other workers never reach a per-process broker, so
+        # reconnect (and catch up from the database) every heartbeat instead
+        max_duration = min(max_duration, heartbeat)
+    
+    def format_event(payload):
+        return f"id: {payload['id']}\ndata: {json.dumps(payload)}\n\n"
+    
+    def generate():
+        last_sent_id = last_message_id
+        try:
+            yield 'retry: 3000\n\n'
+            for payload in missed_messages:
+                last_sent_id = payload['id']
+                yield format_event(payload)
+            
+            # Close periodically; EventSource reconnects and resumes from the last id
+            deadline = time.monotonic() + max_duration
+            while time.monotonic() < deadline:
+                payload = subscription.get(timeout=heartbeat)
+                if payload is None:
+                    yield ': keep-alive\n\n'
+                elif payload['id'] > last_sent_id:
+                    last_sent_id = payload['id']
+                    yield format_event(payload)
+        finally:
+            subscription.close()
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 
 # ============= ADMIN DASHBOARD ROUTES =============
 
 @main.route('/admin')
 @login_required
 @admin_required
+@read_replica
+@cache.cached_view(tags=('users', 'jobs', 'applications', 'activity', 'email_logs'), vary=viewer_cache_key)
 def admin_dashboard():
-    """Admin dashboard with statistics from database views"""
+    """Admin dashboard with statistics from the incrementally maintained summary table.
+
+    Not tagged 'messages', so chat traffic leaves it cached; the message
+    total can lag by up to CACHE_DEFAULT_TIMEOUT.
+    """
     try:
-        # Get statistics from views
-        user_stats = db.session.query(UserStatsView).all()
-        job_stats = db.session.query(JobStatsView).all()
-        app_stats = db.session.query(ApplicationStatsView).all()
-        recent_activities = db.session.query(RecentActivityView).limit(20).all()
-        popular_jobs = db.session.query(PopularJobsView).limit(10).all()
-        
-        # Get overall counts
-        total_users = User.query.filter(User.user_type.in_(['freelancer', 'recruiter'])).count()
-        total_jobs = Job.query.count()
-        total_applications = Application.query.count()
-        total_messages = Message.query.count()
+        stats = get_dashboard_stats()
+        recent_activities = ActivityEvent.query.order_by(
+            ActivityEvent.created_at.desc(), ActivityEvent.id.desc()
+        ).limit(20).all()
+        popular_jobs = get_popular_jobs(10)
         
         # Get recent email validation logs
         recent_validations = EmailValidationLog.query.order_by(
@@ -547,16 +830,10 @@ def admin_dashboard():
         ).limit(10).all()
         
         return render_template('admin_dashboard.html',
-                             user_stats=user_stats,
-                             job_stats=job_stats,
-                             app_stats=app_stats,
                              recent_activities=recent_activities,
                              popular_jobs=popular_jobs,
-                             total_users=total_users,
-                             total_jobs=total_jobs,
-                             total_applications=total_applications,
-                             total_messages=total_messages,
-                             recent_validations=recent_validations)
+                             recent_validations=recent_validations,
+                             **stats)
     except Exception as e:
         flash(f'Error loading admin dashboard: {str(e)}', 'error')
         return redirect(url_for('main.index'))
@@ -565,11 +842,19 @@ def admin_dashboard():
 @main.route('/admin/users')
 @login_required
 @admin_required
+@read_replica
+@cache.cached_view(tags=('users',), vary=viewer_cache_key)
 def admin_users():
-    """View all users"""
+    """View users, one sortable page at a time"""
     try:
-        users = User.query.filter(User.user_type != 'admin').order_by(User.created_at.desc()).all()
-        return render_template('admin_users.html', users=users)
+        query = User.query.filter(User.user_type != 'admin')
+        page, sort, direction = paginate_sortable(
+            query, ADMIN_USER_SORTS, User.id,
+            sort=request.args.get('sort'), direction=request.args.get('direction'),
+            cursor=request.args.get('cursor'), per_page=ADMIN_PAGE_SIZE
+        )
+        return render_template('admin_users.html', users=page.items, next_cursor=page.next_cursor,
+                             sort=sort, direction=direction, stats=get_dashboard_stats())
     except Exception as e:
         flash(f'Error loading users: {str(e)}', 'error')
         return redirect(url_for('main.admin_dashboard'))
@@ -578,11 +863,19 @@ def admin_users():
 @main.route('/admin/jobs')
 @login_required
 @admin_required
+@read_replica
+@cache.cached_view(tags=('jobs', 'users'), vary=viewer_cache_key)
 def admin_jobs():
-    """View all jobs"""
+    """View jobs, one sortable page at a time"""
     try:
-        jobs = Job.query.order_by(Job.created_at.desc()).all()
-        return render_template('admin_jobs.html', jobs=jobs)
+        query = Job.query.options(joinedload(Job.recruiter).load_only(User.username))
+        page, sort, direction = paginate_sortable(
+            query, ADMIN_JOB_SORTS, Job.id,
+            sort=request.args.get('sort'), direction=request.args.get('direction'),
+            cursor=request.args.get('cursor'), per_page=ADMIN_PAGE_SIZE
+        )
+        return render_template('admin_jobs.html', jobs=page.items, next_cursor=page.next_cursor,
+                             sort=sort, direction=direction, stats=get_dashboard_stats())
     except Exception as e:
         flash(f'Error loading jobs: {str(e)}', 'error')
         return redirect(url_for('main.admin_dashboard'))
@@ -591,29 +884,125 @@ def admin_jobs():
 @main.route('/admin/applications')
 @login_required
 @admin_required
+@read_replica
+@cache.cached_view(tags=('applications', 'jobs', 'users'), vary=viewer_cache_key)
 def admin_applications():
-    """View all applications"""
+    """View applications, one sortable page at a time"""
     try:
-        applications = Application.query.order_by(Application.created_at.desc()).all()
-        return render_template('admin_applications.html', applications=applications)
+        query = Application.query.options(
+            joinedload(Application.job).load_only(Job.title),
+            joinedload(Application.freelancer).load_only(User.username)
+        )
+        page, sort, direction = paginate_sortable(
+            query, ADMIN_APPLICATION_SORTS, Application.id,
+            sort=request.args.get('sort'), direction=request.args.get('direction'),
+            cursor=request.args.get('cursor'), per_page=ADMIN_PAGE_SIZE
+        )
+        return render_template('admin_applications.html', applications=page.items, next_cursor=page.next_cursor,
+                             sort=sort, direction=direction, stats=get_dashboard_stats())
     except Exception as e:
         flash(f'Error loading applications: {str(e)}', 'error')
         return redirect(url_for('main.admin_dashboard'))
 
 
+@main.route('/admin/export/<kind>.<fmt>')
+@login_required
+@admin_required
+@read_replica
+def admin_export(kind, fmt):
+    """Stream a full admin list as CSV or NDJSON"""
+    if kind not in EXPORT_KINDS or fmt not in ('csv', 'ndjson'):
+        flash('Unknown export!', 'error')
+        return redirect(url_for('main.admin_dashboard'))
+    return export_response(kind, fmt)
+
+
+@main.route('/admin/activity')
+@login_required
+@admin_required
+@read_replica
+@cache.cached_view(tags=('activity',), vary=viewer_cache_key)
+def admin_activity():
+    """Platform activity feed, newest first, optionally filtered by event type"""
+    try:
+        event_types = [event_type for event_type in request.args.getlist('type')
+                       if event_type in ActivityEvent.DESCRIPTIONS]
+        query = ActivityEvent.query
+        if event_types:
+            query = query.filter(ActivityEvent.event_type.in_(event_types))
+        page = paginate_keyset(
+            query,
+            [ActivityEvent.created_at, ActivityEvent.id],
+            cursor=request.args.get('cursor'),
+            per_page=ACTIVITY_PAGE_SIZE
+        )
+        return render_template('admin_activity.html',
+                             events=page.items,
+                             next_cursor=page.next_cursor,
+                             event_types=event_types,
+                             all_event_types=list(ActivityEvent.DESCRIPTIONS))
+    except Exception as e:
+        flash(f'Error loading activity: {str(e)}', 'error')
+        return redirect(url_for('main.admin_dashboard'))
+
+
 @main.route('/admin/email-logs')
 @login_required
 @admin_required
+@read_replica
+@cache.cached_view(tags=('email_logs',), vary=viewer_cache_key)
 def admin_email_logs():
-    """View email validation logs"""
+    """View email validation logs, one sortable page at a time"""
     try:
-        logs = EmailValidationLog.query.order_by(EmailValidationLog.attempted_at.desc()).all()
-        return render_template('admin_email_logs.html', logs=logs)
+        page, sort, direction = paginate_sortable(
+            EmailValidationLog.query, ADMIN_EMAIL_LOG_SORTS, EmailValidationLog.id,
+            sort=request.args.get('sort'), direction=request.args.get('direction'),
+            cursor=request.args.get('cursor'), per_page=ADMIN_PAGE_SIZE
+        )
+        total, valid = db.session.query(
+            func.count(EmailValidationLog.id),
+            func.coalesce(func.sum(case((EmailValidationLog.is_valid == True, 1), else_=0)), 0)
+        ).one()
+        return render_template('admin_email_logs.html', logs=page.items, next_cursor=page.next_cursor,
+                             sort=sort, direction=direction,
+                             total_logs=total, valid_logs=valid, invalid_logs=total - valid)
     except Exception as e:
         flash(f'Error loading email logs: {str(e)}', 'error')
         return redirect(url_for('main.admin_dashboard'))
 
 
+@main.route('/admin/cache-stats')
+@login_required
+@admin_required
+def admin_cache_stats():
+    """Hit/miss/eviction counters for this worker's cache"""
+    return jsonify(cache.stats())
+
+
+@main.route('/admin/audit-stats')
+@login_required
+@admin_required
+def admin_audit_stats():
+    """Queue depth and write counters for this worker's audit writer"""
+    return jsonify(audit.stats())
+
+
+@main.route('/admin/pool-stats')
+@login_required
+@admin_required
+def admin_pool_stats():
+    """Connection pool occupancy and checkout latency for this worker"""
+    return jsonify(pool_stats(db.engines))
+
+
+@main.route('/admin/replica-stats')
+@login_required
+@admin_required
+def admin_replica_stats():
+    """Replica lag and how this worker's reads were routed"""
+    return jsonify(replicas.stats())
+
+
 @main.route('/admin/user/<int:user_id>/delete', methods=['POST'])
 @login_required
 @admin_required
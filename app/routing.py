@@ -0,0 +1,174 @@
+import functools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy.sql import Select
+
+
+# ============= READ REPLICA ROUTING =============
+
+class ReplicaRouter:
+    """Sends reads from @read_replica views to a healthy replica bind.
+
+    Replicas are the DATABASE_REPLICA_URLS binds (replica0, replica1, ...).
+    A replica is skipped while its lag is above REPLICA_MAX_LAG seconds or
+    cannot be measured, and reads fall back to the primary when none is
+    usable. After a request writes, the same browser session reads from the
+    primary for READ_YOUR_WRITES_SECONDS so it always sees its own changes.
+    """
+
+    def __init__(self, app=None):
+        self.keys = []
+        self._lock = threading.Lock()
+        self._lag = {}
+        self._stats = {'replica_reads': 0, 'primary_reads': 0, 'fallbacks': 0, 'sticky_requests': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the replica binds; call before db.init_app(app)"""
+        from app.pool import engine_options
+
+        urls = app.config.setdefault('DATABASE_REPLICA_URLS', [])
+        self.max_lag = app.config.setdefault('REPLICA_MAX_LAG', 5)
+        self.check_interval = app.config.setdefault('REPLICA_LAG_CHECK_INTERVAL', 5)
+        self.sticky_seconds = app.config.setdefault('READ_YOUR_WRITES_SECONDS', 10)
+
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        self.keys = []
+        for number, url in enumerate(urls):
+            key = f'replica{number}'
+            binds[key] = {'url': url, **engine_options(url, name=key)}
+            self.keys.append(key)
+        app.extensions['replicas'] = self
+        app.after_request(self._remember_write)
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    # ----- lag -----
+
+    def _measure_lag(self, engine):
+        """Seconds behind the primary; None when replication is broken. A standalone server reports 0."""
+        with engine.connect() as connection:
+            if engine.dialect.name != 'mysql':
+                return 0.0
+            try:
+                status = connection.exec_driver_sql('SHOW REPLICA STATUS').mappings().first()
+            except Exception:
+                # MySQL before 8.0.22
+                status = connection.exec_driver_sql('SHOW SLAVE STATUS').mappings().first()
+            if status is None:
+                return 0.0
+            lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+            return None if lag is None else float(lag)
+
+    def lag(self, key, engines):
+        """A replica's lag, re-measured at most every REPLICA_LAG_CHECK_INTERVAL seconds"""
+        now = time.monotonic()
+        with self._lock:
+            checked = self._lag.get(key)
+        if checked is not None and now - checked[0] < self.check_interval:
+            return checked[1]
+        try:
+            lag = self._measure_lag(engines[key])
+        except Exception as e:
+            print(f"❌ Error checking replica {key}: {str(e)}")
+            lag = None
+        with self._lock:
+            self._lag[key] = (now, lag)
+        return lag
+
+    def healthy_replicas(self, engines):
+        return [key for key in self.keys if (lag := self.lag(key, engines)) is not None and lag <= self.max_lag]
+
+    # ----- routing -----
+
+    def replica_for_read(self, engines):
+        """The engine this request's read should use, or None for the primary"""
+        if not self.keys or not has_request_context() or not g.get('read_replica'):
+            return None
+        if g.get('db_wrote') or self._sticky():
+            self._count('primary_reads')
+            return None
+        key = g.get('replica_key')
+        if key is None:
+            # One replica per request so every read sees the same snapshot
+            healthy = self.healthy_replicas(engines)
+            if not healthy:
+                self._count('fallbacks')
+                return None
+            key = g.replica_key = random.choice(healthy)
+        self._count('replica_reads')
+        return engines[key]
+
+    def _sticky(self):
+        return session.get('_primary_until', 0) > time.time()
+
+    def note_write(self):
+        if has_request_context():
+            g.db_wrote = True
+
+    def _remember_write(self, response):
+        if g.get('db_wrote') and self.keys:
+            session['_primary_until'] = time.time() + self.sticky_seconds
+            self._count('sticky_requests')
+        return response
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            lags = {key: self._lag.get(key, (None, None))[1] for key in self.keys}
+        stats['replicas'] = lags
+        stats['max_lag'] = self.max_lag
+        return stats
+
+
+def replica_cache_timeout():
+    """Cap for caching a value computed from replica reads, so a lagging read is not kept past REPLICA_MAX_LAG"""
+    if not has_request_context() or not g.get('replica_key'):
+        return None
+    return current_app.extensions['replicas'].max_lag
+
+
+def read_replica(f):
+    """Let a view's reads go to a replica (writes still go to the primary).
+
+    Only for views that never write: reads made before a view's first write
+    would come from a replica that may be behind what the write relies on.
+    """
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        g.read_replica = True
+        return f(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def on_primary():
+    """Send the reads in this block to the primary, even inside a @read_replica view"""
+    previous = g.get('read_replica')
+    g.read_replica = False
+    try:
+        yield
+    finally:
+        g.read_replica = previous
+
+
+class RoutingSession(FlaskSession):
+    """db.session that sends plain SELECTs from @read_replica views to a replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and 'replicas' in current_app.extensions:
+            router = current_app.extensions['replicas']
+            if self._flushing or not isinstance(clause, Select):
+                router.note_write()
+            else:
+                engine = router.replica_for_read(self._db.engines)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
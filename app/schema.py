@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import inspect, text
+from app import db
+from app.models import (
+    SchemaMigration, create_tables, add_missing_columns, create_default_admin,
+    create_all_views, create_email_validation_trigger, require_conversation_updated_at,
+    require_job_created_at
+)
+from app.stats import seed_summary_stats, shard_summary_stats
+
+
+# ============= MIGRATIONS =============
+
+# (version, name, apply) in order. Never renumber or edit an applied
+# migration; append a new one instead. Each must be safe to re-run if it
+# failed halfway, since only a completed migration is recorded.
+MIGRATIONS = [
+    (1, 'create_tables', create_tables),
+    # Databases created before versioning may predate columns and indexes
+    (2, 'add_missing_columns', add_missing_columns),
+    (3, 'seed_summary_stats', seed_summary_stats),
+    (4, 'create_default_admin', create_default_admin),
+    (5, 'create_views', create_all_views),
+    (6, 'create_email_validation_triggers', create_email_validation_trigger),
+    # Version 6 sent MySQL an unescaped \. so the pattern matched any character before the TLD
+    (7, 'recreate_email_validation_triggers', create_email_validation_trigger),
+    (8, 'shard_summary_stats', shard_summary_stats),
+    # Indexes jobs.updated_at for the job indexes' catch-up scans
+    (9, 'add_job_updated_at_index', add_missing_columns),
+    # The MySQL update trigger now skips updates that leave the email unchanged, like SQLite's
+    (10, 'guard_email_update_trigger', create_email_validation_trigger),
+    # The inbox's keyset pages skipped conversations with a NULL updated_at after the first page
+    (11, 'require_conversation_updated_at', require_conversation_updated_at),
+    # Likewise for the open jobs feed and jobs.created_at
+    (12, 'require_job_created_at', require_job_created_at),
+]
+
+SCHEMA_LOCK_NAME = 'colabify_schema_bootstrap'
+SCHEMA_LOCK_TIMEOUT = 300
+
+
+def applied_versions():
+    """Versions already recorded, or an empty set on a database that has never been bootstrapped"""
+    if not inspect(db.engine).has_table(SchemaMigration.__tablename__):
+        return set()
+    return {version for (version,) in db.session.query(SchemaMigration.version).all()}
+
+
+def pending_migrations():
+    applied = applied_versions()
+    return [(version, name) for version, name, apply in MIGRATIONS if version not in applied]
+
+
+@contextmanager
+def schema_lock():
+    """Hold a server-wide lock so only one process migrates at a time (MySQL); a no-op elsewhere"""
+    if db.engine.dialect.name != 'mysql':
+        yield
+        return
+    with db.engine.connect() as connection:
+        acquired = connection.execute(
+            text('SELECT GET_LOCK(:name, :timeout)'),
+            {'name': SCHEMA_LOCK_NAME, 'timeout': SCHEMA_LOCK_TIMEOUT}
+        ).scalar()
+        if acquired != 1:
+            raise RuntimeError('Timed out waiting for another process to finish migrating')
+        try:
+            yield
+        finally:
+            connection.execute(text('SELECT RELEASE_LOCK(:name)'), {'name': SCHEMA_LOCK_NAME})
+
+
+def bootstrap_schema():
+    """Apply every migration not yet recorded in schema_migrations; returns the names applied.
+
+    Stops at the first failure, which stays pending for the next run.
+    """
+    applied = []
+    with schema_lock():
+        SchemaMigration.__table__.create(db.engine, checkfirst=True)
+        # Read under the lock so a process that waited sees what the leader applied
+        done = applied_versions()
+        for version, name, apply in MIGRATIONS:
+            if version in done:
+                continue
+            try:
+                apply()
+                db.session.add(SchemaMigration(version=version, name=name, applied_at=datetime.utcnow()))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Error applying migration {version} ({name}): {str(e)}")
+                raise
+            print(f"✅ Applied migration {version}: {name}")
+            applied.append(name)
+    return applied
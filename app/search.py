@@ -0,0 +1,317 @@
+import atexit
+import bisect
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.jobsync import JobSync
+from app.models import Job
+
+
+# ============= TOKENIZER =============
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'our', 'the', 'to', 'we', 'will', 'with', 'you', 'your'
+}
+
+
+def tokenize(text):
+    """Lowercase word tokens, keeping names like c++, c# and node.js intact"""
+    if not text:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+# ============= INVERTED INDEX =============
+
+class JobSearchIndex:
+    """In-memory BM25 index over job title, skills and description.
+
+    Title and skill matches count for more than description matches. The
+    last query term also matches as a prefix, so "pyth" finds "python".
+    """
+
+    FIELD_WEIGHTS = (('title', 3.0), ('skills_required', 2.0), ('description', 1.0))
+    PREFIX_WEIGHT = 0.5
+    MAX_PREFIX_EXPANSIONS = 20
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._terms = []
+        self._docs = {}
+        self._lengths = {}
+        self._total_length = 0.0
+        self.sync = JobSync()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, job_id, title, description, skills_required, budget=None, location=None, status='open'):
+        """Index (or re-index) one job"""
+        frequencies = {}
+        for field, weight in self.FIELD_WEIGHTS:
+            text = {'title': title, 'description': description, 'skills_required': skills_required}[field]
+            for token in tokenize(text):
+                frequencies[token] = frequencies.get(token, 0.0) + weight
+
+        with self._lock:
+            self.remove(job_id)
+            length = sum(frequencies.values())
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._terms, term)
+                postings[job_id] = frequency
+            self._docs[job_id] = {
+                'terms': list(frequencies),
+                'budget': budget,
+                'location': (location or '').lower(),
+                'status': status
+            }
+            self._lengths[job_id] = length
+            self._total_length += length
+
+    def add_job(self, job):
+        self.add(job.id, job.title, job.description, job.skills_required,
+                 budget=job.budget, location=job.location, status=job.status)
+
+    def remove(self, job_id):
+        with self._lock:
+            doc = self._docs.pop(job_id, None)
+            if doc is None:
+                return
+            self._total_length -= self._lengths.pop(job_id)
+            for term in doc['terms']:
+                postings = self._postings[term]
+                postings.pop(job_id, None)
+                if not postings:
+                    del self._postings[term]
+                    del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def _expand(self, token, is_last):
+        """Indexed terms a query token matches, with the weight of each match"""
+        matches = {}
+        if token in self._postings:
+            matches[token] = 1.0
+        if is_last:
+            start = bisect.bisect_left(self._terms, token)
+            for term in self._terms[start:start + self.MAX_PREFIX_EXPANSIONS + 1]:
+                if not term.startswith(token):
+                    break
+                matches.setdefault(term, self.PREFIX_WEIGHT)
+        return matches
+
+    def _accepts(self, job_id, doc, min_budget, max_budget, location, status, job_ids):
+        if job_ids is not None and job_id not in job_ids:
+            return False
+        if status is not None and doc['status'] != status:
+            return False
+        if min_budget is not None and (doc['budget'] is None or doc['budget'] < min_budget):
+            return False
+        if max_budget is not None and (doc['budget'] is None or doc['budget'] > max_budget):
+            return False
+        if location and location.lower() not in doc['location']:
+            return False
+        return True
+
+    def search(self, query, min_budget=None, max_budget=None, location=None, status='open', limit=20, offset=0,
+               job_ids=None):
+        """Return [(job_id, score)] best first, optionally only among job_ids (any container)"""
+        tokens = tokenize(query)
+        with self._lock:
+            document_count = len(self._docs)
+            if not tokens or not document_count:
+                return []
+            average_length = self._total_length / document_count or 1.0
+
+            # BM25 with the per-document length normalization hoisted out of the loop
+            lengths = self._lengths
+            norm_base = self.k1 * (1 - self.b)
+            norm_scale = self.k1 * self.b / average_length
+            scores = {}
+            get_score = scores.get
+            for position, token in enumerate(tokens):
+                for term, match_weight in self._expand(token, position == len(tokens) - 1).items():
+                    postings = self._postings[term]
+                    idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    term_weight = match_weight * idf * (self.k1 + 1)
+                    for job_id, frequency in postings.items():
+                        scores[job_id] = get_score(job_id, 0.0) + term_weight * frequency / (
+                            frequency + norm_base + norm_scale * lengths[job_id])
+
+            candidates = (
+                (score, job_id) for job_id, score in scores.items()
+                if self._accepts(job_id, self._docs[job_id], min_budget, max_budget, location, status, job_ids)
+            )
+            best = heapq.nlargest(offset + limit, candidates)
+        return [(job_id, score) for score, job_id in best[offset:]]
+
+    # ----- persistence -----
+
+    def save(self, path):
+        """Write a snapshot atomically so a crashing worker never leaves half a file"""
+        with self._lock:
+            state = (self._postings, self._docs, self._lengths, self._total_length, self.sync.synced_at)
+            data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as snapshot:
+            snapshot.write(data)
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        with open(path, 'rb') as snapshot:
+            postings, docs, lengths, total_length, synced_at = pickle.load(snapshot)
+        if not isinstance(synced_at, datetime):
+            # Older snapshots stored the highest job id; rescan the table once
+            synced_at = None
+        with self._lock:
+            self._postings = postings
+            self._terms = sorted(postings)
+            self._docs = docs
+            self._lengths = lengths
+            self._total_length = total_length
+            self.sync.reset(synced_at)
+
+
+search_index = JobSearchIndex()
+
+_state = {'path': None, 'save_interval': 60, 'last_saved': 0.0, 'dirty': False, 'timer': None,
+          'exit_hook': False}
+_state_lock = threading.Lock()
+
+
+def init_search(app):
+    """Warm the index from the on-disk snapshot, if there is one"""
+    path = app.config['SEARCH_INDEX_PATH']
+    _state['path'] = path
+    _state['save_interval'] = app.config.setdefault('SEARCH_INDEX_SAVE_INTERVAL', 60)
+    if os.path.exists(path):
+        try:
+            search_index.load(path)
+            _state['last_saved'] = time.monotonic()
+        except Exception as e:
+            print(f"❌ Error loading search index: {str(e)}")
+    # Once per process; init_search runs for every app the factory creates
+    if not _state['exit_hook']:
+        atexit.register(save_search_index, force=True)
+        _state['exit_hook'] = True
+
+
+def save_search_index(force=False):
+    """Persist the index if it changed and the save interval has passed"""
+    with _state_lock:
+        due = time.monotonic() - _state['last_saved'] >= _state['save_interval']
+        if not _state['path'] or not _state['dirty'] or not (force or due):
+            return False
+        _state['dirty'] = False
+        _state['last_saved'] = time.monotonic()
+    try:
+        search_index.save(_state['path'])
+        return True
+    except Exception as e:
+        print(f"❌ Error saving search index: {str(e)}")
+        return False
+
+
+def _schedule_save():
+    """Mark the index changed and arm one timer to snapshot it off the request thread when the interval is up"""
+    with _state_lock:
+        _state['dirty'] = True
+        # is_alive() is also False in a forked worker, whose copy of the parent's timer never runs
+        if not _state['path'] or (_state['timer'] is not None and _state['timer'].is_alive()):
+            return
+        delay = max(0.0, _state['last_saved'] + _state['save_interval'] - time.monotonic())
+        timer = _state['timer'] = threading.Timer(delay, _scheduled_save)
+        timer.daemon = True
+    timer.start()
+
+
+def _scheduled_save():
+    with _state_lock:
+        _state['timer'] = None
+    save_search_index(force=True)
+
+
+def catch_up_search_index():
+    """Index jobs other processes posted or edited since the last catch-up"""
+    changed = search_index.sync.catch_up(Job.query, search_index.add_job)
+    if changed:
+        _schedule_save()
+    return changed
+
+
+def rebuild_search_index(batch_size=1000):
+    """Re-index every job from the database and save a fresh snapshot"""
+    fresh = JobSearchIndex()
+    synced_at = datetime.utcnow()
+    query = Job.query.order_by(Job.id).yield_per(batch_size)
+    for job in query:
+        fresh.add_job(job)
+    with search_index._lock:
+        search_index._postings = fresh._postings
+        search_index._terms = fresh._terms
+        search_index._docs = fresh._docs
+        search_index._lengths = fresh._lengths
+        search_index._total_length = fresh._total_length
+        search_index.sync.reset(synced_at)
+    with _state_lock:
+        _state['dirty'] = True
+    save_search_index(force=True)
+    return len(search_index)
+
+
+# ============= INCREMENTAL UPDATES =============
+
+@event.listens_for(Job, 'after_insert')
+@event.listens_for(Job, 'after_update')
+def _queue_job_index(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('search_changes', {})[target.id] = (
+            target.title, target.description, target.skills_required,
+            target.budget, target.location, target.status, target.__dict__.get('updated_at')
+        )
+
+
+@event.listens_for(Job, 'after_delete')
+def _queue_job_removal(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('search_changes', {})[target.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_search_changes(session):
+    changes = session.info.pop('search_changes', None)
+    if not changes:
+        return
+    for job_id, fields in changes.items():
+        if fields is None:
+            search_index.remove(job_id)
+        else:
+            title, description, skills_required, budget, location, status, updated_at = fields
+            search_index.add(job_id, title, description, skills_required,
+                             budget=budget, location=location, status=status)
+            search_index.sync.seen(job_id, updated_at)
+    _schedule_save()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_search_changes(session):
+    session.info.pop('search_changes', None)
@@ -0,0 +1,220 @@
+import threading
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session, selectinload
+from app import db
+from app.jobsync import JobSync
+from app.models import Job, Skill, job_skills, parse_skills
+
+
+# ============= COMPRESSED BITMAPS =============
+
+class Bitmap:
+    """Set of non-negative ints split into 4096-bit chunks, one Python int per chunk.
+
+    Like a roaring bitmap, only chunks holding at least one member are
+    stored, so a rare skill costs a few hundred bytes however large the
+    job ids get, while AND/OR run a machine word at a time.
+    """
+
+    CHUNK_BITS = 12
+    CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+    __slots__ = ('_chunks',)
+
+    def __init__(self, chunks=None):
+        self._chunks = chunks if chunks is not None else {}
+
+    def add(self, value):
+        key = value >> self.CHUNK_BITS
+        self._chunks[key] = self._chunks.get(key, 0) | (1 << (value & self.CHUNK_MASK))
+
+    def discard(self, value):
+        key = value >> self.CHUNK_BITS
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            return
+        chunk &= ~(1 << (value & self.CHUNK_MASK))
+        if chunk:
+            self._chunks[key] = chunk
+        else:
+            del self._chunks[key]
+
+    def __contains__(self, value):
+        chunk = self._chunks.get(value >> self.CHUNK_BITS)
+        return chunk is not None and (chunk >> (value & self.CHUNK_MASK)) & 1 == 1
+
+    def __len__(self):
+        return sum(chunk.bit_count() for chunk in self._chunks.values())
+
+    def __bool__(self):
+        return bool(self._chunks)
+
+    def __and__(self, other):
+        small, large = sorted((self._chunks, other._chunks), key=len)
+        chunks = {}
+        for key, chunk in small.items():
+            both = chunk & large.get(key, 0)
+            if both:
+                chunks[key] = both
+        return Bitmap(chunks)
+
+    def __or__(self, other):
+        chunks = dict(self._chunks)
+        for key, chunk in other._chunks.items():
+            chunks[key] = chunks.get(key, 0) | chunk
+        return Bitmap(chunks)
+
+    def copy(self):
+        return Bitmap(dict(self._chunks))
+
+    def iter_descending(self):
+        """Members from largest to smallest, so job ids come out newest first"""
+        for key in sorted(self._chunks, reverse=True):
+            chunk = self._chunks[key]
+            base = key << self.CHUNK_BITS
+            while chunk:
+                bit = chunk.bit_length() - 1
+                yield base | bit
+                chunk ^= 1 << bit
+
+
+# ============= SKILL INDEX =============
+
+class SkillIndex:
+    """In-memory skill -> job id bitmaps for AND/OR skill filters over open jobs"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.sync = JobSync()
+        self._reset()
+
+    def _reset(self):
+        self._bitmaps = {}
+        self._job_skills = {}
+        self._open = Bitmap()
+        self.built = False
+
+    def __len__(self):
+        return len(self._job_skills)
+
+    def add(self, job_id, names=None, status='open'):
+        """Index (or re-index) one job; names=None keeps the skills it already has"""
+        with self._lock:
+            if names is None:
+                names = self._job_skills.get(job_id, ())
+            self.remove(job_id)
+            names = tuple(names)
+            for name in names:
+                bitmap = self._bitmaps.get(name)
+                if bitmap is None:
+                    bitmap = self._bitmaps[name] = Bitmap()
+                bitmap.add(job_id)
+            if status == 'open':
+                self._open.add(job_id)
+            self._job_skills[job_id] = names
+
+    def remove(self, job_id):
+        with self._lock:
+            names = self._job_skills.pop(job_id, None)
+            if names is None:
+                return
+            self._open.discard(job_id)
+            for name in names:
+                bitmap = self._bitmaps[name]
+                bitmap.discard(job_id)
+                if not bitmap:
+                    del self._bitmaps[name]
+
+    def match(self, all_of=(), any_of=(), open_only=True):
+        """Bitmap of jobs having every skill in all_of and at least one in any_of"""
+        all_of = [name for skill in all_of for name in parse_skills(skill)]
+        any_of = [name for skill in any_of for name in parse_skills(skill)]
+        with self._lock:
+            empty = Bitmap()
+            required = sorted((self._bitmaps.get(name, empty) for name in all_of), key=len)
+            result = self._open.copy() if open_only else None
+            for bitmap in required:
+                result = bitmap.copy() if result is None else result & bitmap
+            if any_of:
+                alternatives = empty
+                for name in any_of:
+                    alternatives = alternatives | self._bitmaps.get(name, empty)
+                result = alternatives if result is None else result & alternatives
+            return result if result is not None else empty
+
+
+skill_index = SkillIndex()
+
+
+def build_skill_index(batch_size=1000):
+    """Load every job's normalized skills from the job_skills table"""
+    fresh = SkillIndex()
+    synced_at = datetime.utcnow()
+    rows = db.session.query(Job.id, Job.status).order_by(Job.id).yield_per(batch_size)
+    names_by_job = {}
+    for job_id, skill_name in db.session.query(job_skills.c.job_id, Skill.name).join(
+        Skill, Skill.id == job_skills.c.skill_id
+    ).yield_per(batch_size):
+        names_by_job.setdefault(job_id, []).append(skill_name)
+    for job_id, status in rows:
+        fresh.add(job_id, names_by_job.get(job_id, ()), status)
+    with skill_index._lock:
+        skill_index._bitmaps = fresh._bitmaps
+        skill_index._job_skills = fresh._job_skills
+        skill_index._open = fresh._open
+        skill_index.sync.reset(synced_at)
+        skill_index.built = True
+    return len(skill_index)
+
+
+def ensure_skill_index():
+    """Build on first use, then pick up jobs other processes posted or edited since"""
+    if not skill_index.built:
+        build_skill_index()
+        return
+    skill_index.sync.catch_up(Job.query.options(selectinload(Job.skills)), lambda job: skill_index.add(
+        job.id, [skill.name for skill in job.skills], job.status
+    ))
+
+
+# ============= INCREMENTAL UPDATES =============
+
+@event.listens_for(Job, 'after_insert')
+@event.listens_for(Job, 'after_update')
+def _queue_job_skills(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is None:
+        return
+    # Only read skills the request already loaded; None keeps the indexed ones
+    skills = target.__dict__.get('skills')
+    names = [skill.name for skill in skills] if skills is not None else None
+    session.info.setdefault('skill_index_changes', {})[target.id] = (
+        names, target.status, target.__dict__.get('updated_at')
+    )
+
+
+@event.listens_for(Job, 'after_delete')
+def _queue_job_skills_removal(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('skill_index_changes', {})[target.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_skill_index_changes(session):
+    changes = session.info.pop('skill_index_changes', None)
+    if not changes or not skill_index.built:
+        return
+    for job_id, fields in changes.items():
+        if fields is None:
+            skill_index.remove(job_id)
+        else:
+            names, status, updated_at = fields
+            skill_index.add(job_id, names, status)
+            skill_index.sync.seen(job_id, updated_at)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_skill_index_changes(session):
+    session.info.pop('skill_index_changes', None)
@@ -0,0 +1,246 @@
+import random
+from sqlalchemy import and_, event, func, inspect, literal, null
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import get_history
+from app import db
+from app.models import User, Job, Application, Message, SummaryStat
+
+
+# ============= ADMIN SUMMARY STATISTICS =============
+
+# model -> (scope, bucket attribute, summed amount attribute)
+STAT_SOURCES = {
+    User: ('users', 'user_type', None),
+    Job: ('jobs', 'status', 'budget'),
+    Application: ('applications', 'status', 'proposed_rate'),
+    Message: ('messages', None, None),
+}
+
+AMOUNT_TOLERANCE = 0.01
+
+# Each write bumps one of this many rows per bucket, so concurrent writers
+# (every chat message lands in ('messages', 'all')) rarely wait on the same row lock
+SUMMARY_STAT_SLOTS = 16
+
+COUNTER_COLUMNS = ('row_count', 'amount_count', 'amount_total')
+
+
+def _stat_values(target, bucket_attr, amount_attr, previous=False):
+    """(bucket, amount) for a row as it is now, or as it was loaded when previous=True"""
+    def value(attr):
+        if attr is None:
+            return None
+        if previous:
+            history = get_history(target, attr)
+            if history.deleted:
+                return history.deleted[0]
+        return getattr(target, attr)
+
+    bucket = value(bucket_attr) if bucket_attr else 'all'
+    return (bucket if bucket is not None else 'none'), value(amount_attr)
+
+
+def _add_to_stat(connection, scope, bucket, row_count, amount_count, amount_total):
+    """Add to a random slot of a bucket in one upsert, so a bucket's first two writers cannot both insert"""
+    table = SummaryStat.__table__
+    values = {'scope': scope, 'bucket': bucket, 'slot': random.randrange(SUMMARY_STAT_SLOTS),
+              'row_count': row_count, 'amount_count': amount_count, 'amount_total': amount_total}
+    dialect = connection.dialect.name
+    if dialect == 'mysql':
+        statement = mysql.insert(table).values(**values)
+        statement = statement.on_duplicate_key_update({
+            column: table.c[column] + statement.inserted[column] for column in COUNTER_COLUMNS
+        })
+    elif dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        statement = insert(table).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.scope, table.c.bucket, table.c.slot],
+            set_={column: table.c[column] + statement.excluded[column] for column in COUNTER_COLUMNS}
+        )
+    else:
+        _update_or_insert_stat(connection, table, values)
+        return
+    connection.execute(statement)
+
+
+def _update_or_insert_stat(connection, table, values):
+    """Portable stand-in for the upsert: add to the slot, inserting it under a savepoint when it is missing"""
+    slot = and_(table.c.scope == values['scope'], table.c.bucket == values['bucket'], table.c.slot == values['slot'])
+    add = table.update().where(slot).values({column: table.c[column] + values[column] for column in COUNTER_COLUMNS})
+    if connection.execute(add).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(table.insert().values(**values))
+    except IntegrityError:
+        # Another writer inserted the slot first
+        connection.execute(add)
+
+
+def _adjust_stat(connection, scope, bucket, amount, rows):
+    """Add rows (+1/-1) to a bucket inside the flush's own transaction"""
+    amount_rows = 0 if amount is None else rows
+    amount_delta = 0.0 if amount is None else amount * rows
+    _add_to_stat(connection, scope, bucket, rows, amount_rows, amount_delta)
+
+
+def _register_stat_listeners(model, scope, bucket_attr, amount_attr):
+    @event.listens_for(model, 'after_insert')
+    def _count_insert(mapper, connection, target):
+        _adjust_stat(connection, scope, *_stat_values(target, bucket_attr, amount_attr), 1)
+
+    @event.listens_for(model, 'after_delete')
+    def _count_delete(mapper, connection, target):
+        _adjust_stat(connection, scope, *_stat_values(target, bucket_attr, amount_attr, previous=True), -1)
+
+    if bucket_attr or amount_attr:
+        @event.listens_for(model, 'after_update')
+        def _count_update(mapper, connection, target):
+            old = _stat_values(target, bucket_attr, amount_attr, previous=True)
+            new = _stat_values(target, bucket_attr, amount_attr)
+            if old != new:
+                _adjust_stat(connection, scope, *old, -1)
+                _adjust_stat(connection, scope, *new, 1)
+
+
+for _model, (_scope, _bucket_attr, _amount_attr) in STAT_SOURCES.items():
+    _register_stat_listeners(_model, _scope, _bucket_attr, _amount_attr)
+
+
+def uncount_rows(connection, model, ids):
+    """Subtract rows about to be bulk deleted, since bulk deletes skip the mapper events"""
+    source = STAT_SOURCES.get(model)
+    if source is None or not ids:
+        return
+    scope, bucket_attr, amount_attr = source
+    table = model.__table__
+    bucket_column = table.c[bucket_attr] if bucket_attr else literal('all')
+    amount_column = table.c[amount_attr] if amount_attr else null()
+    query = db.select(
+        bucket_column,
+        func.count(),
+        func.count(amount_column),
+        func.coalesce(func.sum(amount_column), 0)
+    ).where(table.c.id.in_(ids))
+    if bucket_attr:
+        query = query.group_by(bucket_column)
+
+    for bucket, row_count, amount_count, amount_total in connection.execute(query).all():
+        _add_to_stat(connection, scope, bucket if bucket is not None else 'none',
+                     -row_count, -amount_count, -float(amount_total))
+
+
+def compute_summary_stats():
+    """Recompute every bucket from the base tables: {(scope, bucket): (rows, amount rows, amount total)}"""
+    actual = {}
+    for model, (scope, bucket_attr, amount_attr) in STAT_SOURCES.items():
+        bucket_column = getattr(model, bucket_attr) if bucket_attr else literal('all')
+        amount_column = getattr(model, amount_attr) if amount_attr else null()
+        query = db.session.query(
+            bucket_column,
+            func.count(),
+            func.count(amount_column),
+            func.coalesce(func.sum(amount_column), 0)
+        ).select_from(model)
+        if bucket_attr:
+            query = query.group_by(bucket_column)
+        for bucket, row_count, amount_count, amount_total in query.all():
+            if row_count:
+                bucket = bucket if bucket is not None else 'none'
+                actual[(scope, bucket)] = (row_count, amount_count, float(amount_total))
+    return actual
+
+
+def rebuild_summary_stats():
+    """Correct every drifted bucket to freshly computed totals; returns the drifted buckets.
+
+    Both sides are read in one transaction (one snapshot under MySQL's default
+    REPEATABLE READ) and the difference is added like any other write, so
+    counts that writers add while it runs are kept instead of overwritten.
+    """
+    actual = compute_summary_stats()
+    stored = stored_summary_stats()
+
+    drift = []
+    connection = db.session.connection()
+    for key in sorted(set(actual) | set(stored)):
+        expected = actual.get(key, (0, 0, 0.0))
+        found = stored.get(key, (0, 0, 0.0))
+        if expected[:2] != found[:2] or abs(expected[2] - found[2]) > AMOUNT_TOLERANCE:
+            drift.append((key, found, expected))
+            _add_to_stat(connection, *key, *(want - have for want, have in zip(expected, found)))
+    db.session.commit()
+    return drift
+
+
+def stored_summary_stats():
+    """The running totals with their slots summed: {(scope, bucket): (rows, amount rows, amount total)}"""
+    rows = db.session.query(
+        SummaryStat.scope,
+        SummaryStat.bucket,
+        func.sum(SummaryStat.row_count),
+        func.sum(SummaryStat.amount_count),
+        func.sum(SummaryStat.amount_total)
+    ).group_by(SummaryStat.scope, SummaryStat.bucket)
+    return {
+        (scope, bucket): (int(row_count), int(amount_count), float(amount_total))
+        for scope, bucket, row_count, amount_count, amount_total in rows
+    }
+
+
+def shard_summary_stats():
+    """Recreate a pre-slot summary table with the slot key, then refill it (it is all derived data)"""
+    try:
+        columns = {column['name'] for column in inspect(db.engine).get_columns(SummaryStat.__tablename__)}
+        if 'slot' not in columns:
+            SummaryStat.__table__.drop(db.engine)
+            SummaryStat.__table__.create(db.engine)
+            rebuild_summary_stats()
+    except Exception as e:
+        print(f"❌ Error sharding summary statistics: {str(e)}")
+        db.session.rollback()
+        raise
+
+
+def seed_summary_stats():
+    """Fill an empty summary table once, e.g. the first start after upgrading"""
+    try:
+        if SummaryStat.query.first() is None:
+            rebuild_summary_stats()
+    except Exception as e:
+        print(f"❌ Error seeding summary statistics: {str(e)}")
+        db.session.rollback()
+        raise
+
+
+def get_dashboard_stats():
+    """Everything the admin dashboard's statistics need, from one small query"""
+    stats = {}
+    for (scope, bucket), (row_count, amount_count, amount_total) in sorted(stored_summary_stats().items()):
+        average = amount_total / amount_count if amount_count else None
+        stats.setdefault(scope, []).append((bucket, row_count, average))
+
+    user_stats = [
+        {'user_type': bucket, 'total_users': row_count}
+        for bucket, row_count, average in stats.get('users', [])
+        if bucket in ('freelancer', 'recruiter') and row_count
+    ]
+    job_stats = [
+        {'status': bucket, 'total_jobs': row_count, 'avg_budget': average}
+        for bucket, row_count, average in stats.get('jobs', []) if row_count
+    ]
+    app_stats = [
+        {'status': bucket, 'total_applications': row_count, 'avg_proposed_rate': average}
+        for bucket, row_count, average in stats.get('applications', []) if row_count
+    ]
+    return {
+        'user_stats': user_stats,
+        'job_stats': job_stats,
+        'app_stats': app_stats,
+        'total_users': sum(stat['total_users'] for stat in user_stats),
+        'total_jobs': sum(row_count for bucket, row_count, average in stats.get('jobs', [])),
+        'total_applications': sum(row_count for bucket, row_count, average in stats.get('applications', [])),
+        'total_messages': sum(row_count for bucket, row_count, average in stats.get('messages', []))
+    }
@@ -0,0 +1,13 @@
+"""Load benchmarks: a bulk data generator, a route harness and comparable JSON reports.
+
+    python -m benchmarks generate --scale small
+    python -m benchmarks run --concurrency 8 --requests 200 --output before.json
+    python -m benchmarks compare before.json after.json
+
+Hermetically, without a database server, in one process:
+
+    DATABASE_URL=sqlite:// python -m benchmarks run --generate small --writes
+
+An in-memory database is a single connection shared by every worker, so
+its numbers at --concurrency above 1 measure contention on that connection.
+"""
@@ -0,0 +1,98 @@
+import click
+from app import create_app, db
+from benchmarks import datagen, harness, report
+
+
+@click.group()
+def cli():
+    """Collabify load benchmarks"""
+
+
+@cli.command()
+@click.option('--scale', type=click.Choice(sorted(datagen.SCALES)), default='small', show_default=True)
+@click.option('--seed', type=int, default=42, show_default=True)
+@click.option('--batch-size', type=int, default=5000, show_default=True)
+def generate(scale, seed, batch_size):
+    """Bootstrap the schema and bulk-load a synthetic data set into DATABASE_URL"""
+    from app.schema import bootstrap_schema
+    app = create_app()
+    with app.app_context():
+        try:
+            bootstrap_schema()
+            counts = datagen.generate(scale, seed, batch_size, log=click.echo)
+        except Exception as e:
+            raise click.ClickException(f'Generating data failed: {str(e)}')
+    for table, rows in counts.items():
+        click.echo(f"   {table}: {rows}")
+
+
+@cli.command()
+@click.option('--concurrency', type=int, default=4, show_default=True, help='Workers per route')
+@click.option('--requests', type=int, default=100, show_default=True, help='Timed requests per route')
+@click.option('--warmup', type=int, default=5, show_default=True, help='Untimed requests per route first')
+@click.option('--writes', is_flag=True, help='Also run POSTs and GETs that change data')
+@click.option('--only', multiple=True, help='Only routes whose "METHOD /rule" contains this')
+@click.option('--server', is_flag=True, help='Go through a local threaded WSGI server instead of the test client')
+@click.option('--url', help='Go through an already running server at this base URL')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write the JSON report here')
+@click.option('--generate', 'generate_scale', type=click.Choice(sorted(datagen.SCALES)),
+              help='Load a data set first, e.g. into an in-memory DATABASE_URL=sqlite://')
+def run(concurrency, requests, warmup, writes, only, server, url, output, generate_scale):
+    """Drive every route at the given concurrency and report latency, throughput and queries"""
+    app = create_app()
+    if generate_scale:
+        from app.schema import bootstrap_schema
+        with app.app_context():
+            bootstrap_schema()
+            datagen.generate(generate_scale, log=click.echo)
+    # Every response reports its statement count; a remote server needs SQL_DEBUG_HEADERS too
+    app.config['SQL_DEBUG_HEADERS'] = True
+    scenarios = harness.discover_scenarios(app, writes=writes, only=only)
+    if not scenarios:
+        raise click.ClickException('No routes to benchmark')
+
+    local_server = None
+    if url:
+        driver, target = harness.HTTPDriver(url), url
+    elif server:
+        local_server, target = harness.start_local_server(app)
+        driver = harness.HTTPDriver(target)
+    else:
+        driver, target = harness.TestClientDriver(app), 'test_client'
+
+    try:
+        with app.app_context():
+            dialect = db.engine.dialect.name
+            data_set = datagen.table_counts()
+        click.echo(f"Benchmarking {len(scenarios)} routes via {target}, {concurrency} workers x {requests} requests")
+        routes, elapsed = harness.run_benchmark(app, driver, scenarios, requests, concurrency, warmup, log=click.echo)
+    finally:
+        if local_server is not None:
+            local_server.shutdown()
+
+    result = report.build_report(routes, elapsed, {
+        'target': target,
+        'dialect': dialect,
+        'concurrency': concurrency,
+        'requests_per_route': requests,
+        'writes': writes,
+        'data_set': data_set,
+    })
+    click.echo(report.format_table(result))
+    if output:
+        report.write_report(result, output)
+        click.echo(f"✅ Wrote {output}")
+
+
+@cli.command()
+@click.argument('base', type=click.Path(exists=True, dir_okay=False))
+@click.argument('new', type=click.Path(exists=True, dir_okay=False))
+@click.option('--metric', default='p95_ms', show_default=True,
+              type=click.Choice(['p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'throughput_rps', 'queries_per_request']))
+def compare(base, new, metric):
+    """Compare one metric per route between two JSON reports"""
+    click.echo(report.format_comparison(report.load_report(base), report.load_report(new), metric))
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,200 @@
+import random
+import time
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import User, Job, Application, Conversation, Message, Notification
+
+
+# ============= SYNTHETIC DATA GENERATOR =============
+
+# Rows per table for each --scale
+SCALES = {
+    'small': {'freelancers': 200, 'recruiters': 40, 'jobs': 500, 'applications': 3000,
+              'conversations': 400, 'messages': 8000, 'notifications': 4000},
+    'medium': {'freelancers': 2000, 'recruiters': 400, 'jobs': 5000, 'applications': 30000,
+               'conversations': 4000, 'messages': 80000, 'notifications': 40000},
+    'large': {'freelancers': 20000, 'recruiters': 4000, 'jobs': 50000, 'applications': 300000,
+              'conversations': 40000, 'messages': 800000, 'notifications': 400000},
+}
+
+# Accounts the harness logs in as; every generated user shares this password
+BENCH_PASSWORD = 'password'
+BENCH_FREELANCER = 'bench_freelancer'
+BENCH_RECRUITER = 'bench_recruiter'
+
+SKILLS = ['python', 'flask', 'django', 'sql', 'mysql', 'react', 'vue', 'typescript', 'go', 'rust',
+          'docker', 'kubernetes', 'aws', 'figma', 'seo', 'copywriting', 'data analysis', 'machine learning']
+TITLE_WORDS = ['Senior', 'Junior', 'Backend', 'Frontend', 'Full-stack', 'Data', 'Mobile', 'DevOps']
+ROLES = ['Developer', 'Engineer', 'Designer', 'Analyst', 'Consultant', 'Writer']
+LOCATIONS = ['Remote', 'Berlin', 'Lagos', 'Austin', 'Bangalore', 'Toronto', 'Lisbon']
+DURATIONS = ['1 week', '2 weeks', '1 month', '3 months', '6 months']
+JOB_STATUSES = ['open'] * 7 + ['in_progress', 'completed', 'cancelled']
+APPLICATION_STATUSES = ['pending'] * 6 + ['accepted', 'rejected']
+
+
+def _insert(table, rows, batch_size):
+    """Core executemany in batches; skips ORM events, so derived data is rebuilt afterwards"""
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(table.insert(), rows[start:start + batch_size])
+        db.session.commit()
+
+
+def _timestamps(rng, count, days=365):
+    """count ascending timestamps over the last `days` days, so ids follow time like real inserts"""
+    now = datetime.utcnow()
+    offsets = sorted(rng.uniform(0, days * 86400) for _ in range(count))
+    return [now - timedelta(seconds=days * 86400 - offset) for offset in offsets]
+
+
+def generate(scale='small', seed=42, batch_size=5000, log=print):
+    """Bulk-load a reproducible data set into an empty database; returns {table: rows}"""
+    if scale not in SCALES:
+        raise ValueError(f'Unknown scale: {scale}')
+    if User.query.filter(User.user_type != 'admin').first() is not None:
+        raise RuntimeError('The database already has users; benchmark data needs an empty schema')
+
+    sizes = SCALES[scale]
+    rng = random.Random(seed)
+    # Hashing is deliberately slow, so every account shares one hash
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    counts = {}
+    started = time.perf_counter()
+
+    # Users: the two named bench accounts first, then the crowd
+    user_rows = []
+    names = [(BENCH_FREELANCER, 'freelancer'), (BENCH_RECRUITER, 'recruiter')]
+    names += [(f'freelancer{i}', 'freelancer') for i in range(sizes['freelancers'])]
+    names += [(f'recruiter{i}', 'recruiter') for i in range(sizes['recruiters'])]
+    for (username, user_type), created_at in zip(names, _timestamps(rng, len(names), days=730)):
+        user_rows.append({'username': username, 'email': f'{username}@bench.example.com',
+                          'password_hash': password_hash, 'user_type': user_type, 'created_at': created_at})
+    _insert(User.__table__, user_rows, batch_size)
+    counts['users'] = len(user_rows)
+
+    users = db.session.query(User.id, User.username, User.user_type).filter(User.user_type != 'admin').all()
+    freelancer_ids = [user.id for user in users if user.user_type == 'freelancer']
+    recruiter_ids = [user.id for user in users if user.user_type == 'recruiter']
+    bench_ids = {user.username: user.id for user in users if user.username in (BENCH_FREELANCER, BENCH_RECRUITER)}
+
+    # Jobs: a power law over recruiters, with the bench recruiter among the busiest
+    recruiter_weights = [1.0 / (rank + 1) for rank in range(len(recruiter_ids))]
+    recruiter_pool = [bench_ids[BENCH_RECRUITER]] + [rid for rid in recruiter_ids if rid != bench_ids[BENCH_RECRUITER]]
+    job_rows = []
+    for created_at in _timestamps(rng, sizes['jobs']):
+        skills = rng.sample(SKILLS, rng.randint(2, 5))
+        title = f'{rng.choice(TITLE_WORDS)} {skills[0].title()} {rng.choice(ROLES)}'
+        job_rows.append({
+            'title': title,
+            'description': f'{title} needed. Must know {", ".join(skills)}. ' * rng.randint(1, 4),
+            'skills_required': ', '.join(skills),
+            'budget': round(rng.lognormvariate(7, 0.8), 2),
+            'duration': rng.choice(DURATIONS),
+            'location': rng.choice(LOCATIONS),
+            'status': rng.choice(JOB_STATUSES),
+            'recruiter_id': rng.choices(recruiter_pool, recruiter_weights)[0],
+            'application_count': 0,
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+    _insert(Job.__table__, job_rows, batch_size)
+    counts['jobs'] = len(job_rows)
+
+    jobs = db.session.query(Job.id, Job.created_at).order_by(Job.id).all()
+
+    # Applications: popular jobs attract most of them; one per (freelancer, job)
+    job_weights = [rng.paretovariate(1.2) for _ in jobs]
+    applied = set()
+    application_rows = []
+    for index in range(sizes['applications']):
+        freelancer_id = bench_ids[BENCH_FREELANCER] if index % 50 == 0 else rng.choice(freelancer_ids)
+        job_id, job_created = jobs[rng.choices(range(len(jobs)), job_weights)[0]]
+        if (freelancer_id, job_id) in applied:
+            continue
+        applied.add((freelancer_id, job_id))
+        created_at = job_created + timedelta(hours=rng.uniform(1, 24 * 30))
+        application_rows.append({
+            'job_id': job_id, 'freelancer_id': freelancer_id,
+            'cover_letter': 'I would love to work on this. ' * rng.randint(1, 6),
+            'proposed_rate': round(rng.uniform(15, 150), 2),
+            'status': rng.choice(APPLICATION_STATUSES),
+            'created_at': created_at, 'updated_at': created_at,
+        })
+    application_rows.sort(key=lambda row: row['created_at'])
+    _insert(Application.__table__, application_rows, batch_size)
+    counts['applications'] = len(application_rows)
+
+    # Conversations between freelancers and recruiters, the bench pair included
+    pairs = {(bench_ids[BENCH_FREELANCER], bench_ids[BENCH_RECRUITER])}
+    while len(pairs) < sizes['conversations']:
+        pairs.add((rng.choice(freelancer_ids), rng.choice(recruiter_ids)))
+    conversation_rows = []
+    for (user1_id, user2_id), created_at in zip(sorted(pairs), _timestamps(rng, len(pairs))):
+        conversation_rows.append({'user1_id': user1_id, 'user2_id': user2_id,
+                                  'created_at': created_at, 'updated_at': created_at})
+    _insert(Conversation.__table__, conversation_rows, batch_size)
+    counts['conversations'] = len(conversation_rows)
+
+    # Messages: a few busy conversations, most of it read except the tail
+    conversations = db.session.query(Conversation.id, Conversation.user1_id, Conversation.user2_id).all()
+    conversation_weights = [rng.paretovariate(1.1) for _ in conversations]
+    message_rows = []
+    for created_at in _timestamps(rng, sizes['messages']):
+        conversation_id, user1_id, user2_id = conversations[rng.choices(range(len(conversations)), conversation_weights)[0]]
+        sender_id, receiver_id = (user1_id, user2_id) if rng.random() < 0.5 else (user2_id, user1_id)
+        message_rows.append({
+            'conversation_id': conversation_id, 'sender_id': sender_id, 'receiver_id': receiver_id,
+            'content': rng.choice(['Hi!', 'Sounds good.', 'When can you start?', 'Sent the files.',
+                                   'Could you share your portfolio?', 'Thanks, talk soon.']) * rng.randint(1, 3),
+            'is_read': rng.random() < 0.9,
+            'created_at': created_at,
+        })
+    _insert(Message.__table__, message_rows, batch_size)
+    counts['messages'] = len(message_rows)
+
+    # Notifications, mostly read
+    notification_rows = []
+    for created_at in _timestamps(rng, sizes['notifications']):
+        notification_rows.append({
+            'user_id': rng.choice(freelancer_ids + recruiter_ids),
+            'message': rng.choice(['Your application was accepted', 'New applicant for your job',
+                                   'Your application was rejected']),
+            'type': rng.choice(['application_accepted', 'application_received', 'application_rejected']),
+            'is_read': rng.random() < 0.85,
+            'event_count': 1,
+            'created_at': created_at,
+            'last_seen_at': created_at,
+        })
+    _insert(Notification.__table__, notification_rows, batch_size)
+    counts['notifications'] = len(notification_rows)
+    log(f"✅ Inserted {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+
+    rebuild_derived_data(log)
+    return counts
+
+
+def table_counts():
+    """Rows per generated table, recorded with each benchmark run"""
+    models = [User, Job, Application, Conversation, Message, Notification]
+    return {model.__tablename__: db.session.query(db.func.count(model.id)).scalar() for model in models}
+
+
+def rebuild_derived_data(log=print):
+    """Recompute everything the mapper events would have maintained for the bulk-loaded rows"""
+    from app.models import (
+        backfill_job_skills, backfill_activity_events, backfill_read_watermarks,
+        backfill_conversation_summaries, reconcile_application_counts, reconcile_unread_counters
+    )
+    from app.search import rebuild_search_index
+    from app.stats import rebuild_summary_stats
+
+    started = time.perf_counter()
+    backfill_job_skills()
+    backfill_activity_events()
+    backfill_read_watermarks()
+    backfill_conversation_summaries()
+    reconcile_application_counts()
+    reconcile_unread_counters()
+    rebuild_summary_stats()
+    rebuild_search_index()
+    log(f"✅ Rebuilt derived data in {time.perf_counter() - started:.1f}s")
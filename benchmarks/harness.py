@@ -0,0 +1,265 @@
+import http.cookiejar
+import itertools
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from app import db
+from app.exports import EXPORT_KINDS
+from app.models import User, Job, Application, Conversation
+from benchmarks.datagen import BENCH_PASSWORD, BENCH_FREELANCER, BENCH_RECRUITER
+
+
+# ============= SCENARIOS =============
+
+# Never benchmarked: logout ends the worker's session, the SSE stream never
+# finishes, and the deletes would eat the data set
+SKIPPED_ENDPOINTS = {'logout', 'stream_messages', 'admin_delete_user', 'admin_delete_job'}
+
+# GET routes that change data; they only run with --writes like every POST
+WRITE_ENDPOINTS = {'update_application', 'new_conversation'}
+
+# Who runs each route; admin_* routes run as the admin, everything else as the bench freelancer
+ENDPOINT_ROLES = {
+    'index': 'anonymous',
+    'register': 'anonymous',
+    'login': 'anonymous',
+    'new_job': 'recruiter',
+    'update_application': 'recruiter',
+}
+
+ACCOUNTS = {
+    'admin': ('admin@colabify.com', 'admin123'),
+    'freelancer': (f'{BENCH_FREELANCER}@bench.example.com', BENCH_PASSWORD),
+    'recruiter': (f'{BENCH_RECRUITER}@bench.example.com', BENCH_PASSWORD),
+}
+
+QUERY_ARGS = {
+    'search_jobs': {'q': 'python developer'},
+}
+
+
+class Scenario:
+    """One benchmarked request: a method and URL rule, run as a role"""
+
+    def __init__(self, endpoint, method, rule, role, write):
+        self.endpoint = endpoint
+        self.method = method
+        self.rule = rule
+        self.role = role
+        self.write = write
+        self.name = f'{method} {rule}'
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def next_request(self, fixtures):
+        """(path, form data) for the next request; writes vary their ids and payloads"""
+        with self._lock:
+            number = next(self._sequence)
+        values = fixtures.url_values(self.endpoint, number)
+        path = self.rule
+        for name, value in values.items():
+            path = path.replace(f'<int:{name}>', str(value)).replace(f'<{name}>', str(value))
+        args = QUERY_ARGS.get(self.endpoint)
+        if args:
+            path = f'{path}?{urllib.parse.urlencode(args)}'
+        data = fixtures.form_data(self.endpoint, number) if self.method == 'POST' else None
+        return path, data
+
+
+def discover_scenarios(app, writes=False, only=None):
+    """A scenario for every method of every route in the main blueprint"""
+    scenarios = []
+    for rule in app.url_map.iter_rules():
+        blueprint, _, endpoint = rule.endpoint.rpartition('.')
+        if blueprint != 'main' or endpoint in SKIPPED_ENDPOINTS:
+            continue
+        for method in sorted(rule.methods & {'GET', 'POST'}):
+            write = method == 'POST' or endpoint in WRITE_ENDPOINTS
+            if write and not writes:
+                continue
+            role = 'admin' if endpoint.startswith('admin_') else ENDPOINT_ROLES.get(endpoint, 'freelancer')
+            scenario = Scenario(endpoint, method, rule.rule, role, write)
+            if only and not any(pattern in scenario.name for pattern in only):
+                continue
+            scenarios.append(scenario)
+    return sorted(scenarios, key=lambda scenario: scenario.name)
+
+
+class Fixtures:
+    """Real ids from the generated data, looked up once before the run"""
+
+    def __init__(self):
+        freelancer = User.query.filter_by(username=BENCH_FREELANCER).first()
+        recruiter = User.query.filter_by(username=BENCH_RECRUITER).first()
+        if freelancer is None or recruiter is None:
+            raise RuntimeError('No benchmark users; run `python -m benchmarks generate` first')
+        self.recruiter_id = recruiter.id
+        self.conversation_id = db.session.query(Conversation.id).filter_by(
+            user1_id=freelancer.id, user2_id=recruiter.id
+        ).scalar()
+        self.job_id = db.session.query(Job.id).filter_by(recruiter_id=recruiter.id).order_by(Job.id).limit(1).scalar()
+        # Jobs the freelancer has not applied to yet, so every apply inserts
+        applied = db.session.query(Application.job_id).filter_by(freelancer_id=freelancer.id)
+        self.unapplied_job_ids = [job_id for (job_id,) in db.session.query(Job.id).filter(
+            Job.status == 'open', Job.id.notin_(applied)
+        ).order_by(Job.id).limit(5000)]
+        self.application_ids = [app_id for (app_id,) in db.session.query(Application.id).join(Job).filter(
+            Job.recruiter_id == recruiter.id
+        ).order_by(Application.id).limit(5000)]
+        self.run_id = int(time.time())
+
+    def url_values(self, endpoint, number):
+        if endpoint == 'apply_job':
+            return {'job_id': self.unapplied_job_ids[number % len(self.unapplied_job_ids)]}
+        if endpoint == 'update_application':
+            return {'app_id': self.application_ids[number % len(self.application_ids)], 'action': 'accept'}
+        if endpoint == 'admin_export':
+            return {'kind': EXPORT_KINDS[number % len(EXPORT_KINDS)], 'fmt': 'csv'}
+        return {'job_id': self.job_id, 'conversation_id': self.conversation_id, 'user_id': self.recruiter_id}
+
+    def form_data(self, endpoint, number):
+        if endpoint == 'login':
+            email, password = ACCOUNTS['freelancer']
+            return {'email': email, 'password': password}
+        if endpoint == 'register':
+            username = f'bench_new_{self.run_id}_{number}'
+            return {'username': username, 'email': f'{username}@bench.example.com',
+                    'password': BENCH_PASSWORD, 'user_type': 'freelancer'}
+        if endpoint == 'new_job':
+            return {'title': f'Benchmark job {number}', 'description': 'Posted by the benchmark harness.',
+                    'skills_required': 'python, flask, sql', 'budget': '750', 'duration': '1 month',
+                    'location': 'Remote'}
+        if endpoint == 'apply_job':
+            return {'cover_letter': 'Posted by the benchmark harness.', 'proposed_rate': '45'}
+        if endpoint == 'send_message':
+            return {'content': f'Benchmark message {number}'}
+        return {}
+
+
+# ============= CLIENTS =============
+
+class TestClientDriver:
+    """Requests through Flask's test client, in this process"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def client(self, role):
+        # Anonymous routes get no cookie jar so a login does not stick between requests
+        client = self.app.test_client(use_cookies=role != 'anonymous')
+        if role != 'anonymous':
+            email, password = ACCOUNTS[role]
+            client.post('/login', data={'email': email, 'password': password})
+        return client
+
+    def request(self, client, method, path, data):
+        response = client.open(path, method=method, data=data)
+        # Drain streamed bodies (exports) so the whole response is timed
+        response.get_data()
+        queries = response.headers.get('X-SQL-Queries')
+        status = response.status_code
+        response.close()
+        return status, int(queries) if queries is not None else None
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPDriver:
+    """Requests over HTTP to a running server, e.g. `flask run` or gunicorn"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def client(self, role):
+        handlers = [_NoRedirect()]
+        if role != 'anonymous':
+            handlers.append(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        opener = urllib.request.build_opener(*handlers)
+        if role != 'anonymous':
+            email, password = ACCOUNTS[role]
+            self.request(opener, 'POST', '/login', {'email': email, 'password': password})
+        return opener
+
+    def request(self, opener, method, path, data):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with opener.open(request, timeout=60) as response:
+                response.read()
+                status, headers = response.status, response.headers
+        except urllib.error.HTTPError as e:
+            # Includes the 3xx responses _NoRedirect declines to follow
+            e.read()
+            status, headers = e.code, e.headers
+        queries = headers.get('X-SQL-Queries')
+        return status, int(queries) if queries is not None else None
+
+
+def start_local_server(app, host='127.0.0.1', port=0):
+    """Serve the app from a threaded werkzeug WSGI server in the background; returns (server, url)"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server(host, port, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_port}'
+
+
+# ============= RUNNER =============
+
+def run_scenario(driver, scenario, fixtures, requests, concurrency, warmup=0):
+    """Fire `requests` requests at one route from `concurrency` workers; returns (samples, seconds)"""
+    clients = [driver.client(scenario.role) for _ in range(concurrency)]
+    for number in range(warmup):
+        path, data = scenario.next_request(fixtures)
+        try:
+            driver.request(clients[number % concurrency], scenario.method, path, data)
+        except Exception:
+            pass
+
+    remaining = itertools.count()
+    samples = []
+    lock = threading.Lock()
+
+    def worker(client):
+        results = []
+        while next(remaining) < requests:
+            path, data = scenario.next_request(fixtures)
+            start = time.perf_counter()
+            try:
+                status, queries = driver.request(client, scenario.method, path, data)
+            except Exception:
+                status, queries = 'error', None
+            results.append((time.perf_counter() - start, status, queries))
+        with lock:
+            samples.extend(results)
+
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def run_benchmark(app, driver, scenarios, requests=100, concurrency=4, warmup=5, log=print):
+    """Run every scenario in turn; returns ({route: {'samples', 'elapsed'}}, total seconds)"""
+    with app.app_context():
+        fixtures = Fixtures()
+        db.session.remove()
+    routes = {}
+    started = time.perf_counter()
+    for scenario in scenarios:
+        samples, elapsed = run_scenario(driver, scenario, fixtures, requests, concurrency, warmup)
+        routes[scenario.name] = {'samples': samples, 'elapsed': elapsed}
+        log(f"   {scenario.name}: {len(samples) / elapsed:.1f} req/s")
+    return routes, time.perf_counter() - started
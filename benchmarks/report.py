@@ -0,0 +1,116 @@
+import json
+import os
+import platform
+import subprocess
+from collections import Counter
+from datetime import datetime
+
+
+# ============= LATENCY SUMMARIES =============
+
+def percentile(ordered, quantile):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * quantile))]
+
+
+def summarize(samples, elapsed):
+    """Summary for one route: samples are (seconds, status, queries or None)"""
+    latencies = sorted(seconds * 1000 for seconds, status, queries in samples)
+    statuses = Counter(str(status) for seconds, status, queries in samples)
+    queries = [queries for seconds, status, queries in samples if queries is not None]
+    errors = sum(count for status, count in statuses.items() if status == 'error' or int(status) >= 400)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'statuses': dict(sorted(statuses.items())),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else None,
+        'p50_ms': _round(percentile(latencies, 0.5)),
+        'p95_ms': _round(percentile(latencies, 0.95)),
+        'p99_ms': _round(percentile(latencies, 0.99)),
+        'max_ms': _round(latencies[-1] if latencies else None),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+
+# ============= REPORTS =============
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_report(routes, elapsed, settings):
+    """The JSON document for one run: metadata, per-route summaries and a total"""
+    samples = [sample for route in routes.values() for sample in route['samples']]
+    return {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            **settings,
+        },
+        'total': summarize(samples, elapsed),
+        'routes': {name: summarize(route['samples'], route['elapsed']) for name, route in sorted(routes.items())},
+    }
+
+
+def write_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def format_table(report):
+    """Plain-text table of a report's routes"""
+    lines = [f"{'route':<45} {'req':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'qpr':>6}"]
+    for name, stats in [*report['routes'].items(), ('TOTAL', report['total'])]:
+        lines.append(
+            f"{name[:45]:<45} {stats['requests']:>6} {stats['errors']:>4} {_cell(stats['throughput_rps'])} "
+            f"{_cell(stats['p50_ms'])} {_cell(stats['p95_ms'])} {_cell(stats['p99_ms'])} "
+            f"{_cell(stats['queries_per_request'], 6)}"
+        )
+    return '\n'.join(lines)
+
+
+def compare_reports(base, new, metric='p95_ms'):
+    """Rows of (route, base value, new value, change in percent) for routes in both runs"""
+    rows = []
+    for name in sorted(set(base['routes']) & set(new['routes'])):
+        before = base['routes'][name][metric]
+        after = new['routes'][name][metric]
+        change = None
+        if before and after is not None:
+            change = round((after - before) / before * 100, 1)
+        rows.append((name, before, after, change))
+    return rows
+
+
+def format_comparison(base, new, metric='p95_ms'):
+    lines = [f"{metric}: {base['meta'].get('git_commit')} -> {new['meta'].get('git_commit')}",
+             f"{'route':<45} {'base':>9} {'new':>9} {'change':>8}"]
+    for name, before, after, change in compare_reports(base, new, metric):
+        change_text = '' if change is None else f'{change:+.1f}%'
+        lines.append(f"{name[:45]:<45} {_cell(before, 9)} {_cell(after, 9)} {change_text:>8}")
+    only = sorted(set(base['routes']) ^ set(new['routes']))
+    if only:
+        lines.append(f"Not in both runs: {', '.join(only)}")
+    return '\n'.join(lines)
+
+
+def _cell(value, width=8):
+    return f"{'-':>{width}}" if value is None else f'{value:>{width}.1f}'
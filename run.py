@@ -3,4 +3,12 @@ from app import create_app
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Single development process: bring the schema up to date before serving.
+    # Multi-worker deployments run `flask bootstrap-db` once before starting workers.
+    from app.jobsync import warm_job_indexes
+    from app.schema import bootstrap_schema
+    with app.app_context():
+        bootstrap_schema()
+        # create_app skipped the warm-up if the schema was behind
+        warm_job_indexes()
+    app.run(debug=True)
@@ -0,0 +1,57 @@
+import contextvars
+import os
+import pytest
+from flask.testing import FlaskClient
+
+# Hermetic: a private in-memory database per app, writes applied inline
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['AUDIT_ASYNC'] = '0'
+os.environ['CHAT_BROKER_URL'] = 'memory://'
+os.environ['CACHE_URL'] = 'memory://'
+
+
+class IsolatedClient(FlaskClient):
+    """Runs each request in its own app context, as a server would, instead of the test's.
+
+    Otherwise every request shares the test's g and db.session, so one
+    client's logged-in user leaks into another client's requests.
+    """
+
+    def open(self, *args, **kwargs):
+        return contextvars.Context().run(super().open, *args, **kwargs)
+
+
+@pytest.fixture
+def app(tmp_path):
+    os.environ['SEARCH_INDEX_PATH'] = str(tmp_path / 'job_search.idx')
+    from app import create_app, db
+    app = create_app()
+    app.config['TESTING'] = True
+    app.test_client_class = IsolatedClient
+    with app.app_context():
+        # The job indexes live in the process; start them from this test's empty database
+        from app.popular import reload_popular_jobs
+        from app.recommend import build_recommender
+        from app.search import rebuild_search_index
+        from app.skills import build_skill_index
+        rebuild_search_index()
+        build_recommender()
+        build_skill_index()
+        reload_popular_jobs()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def register(app):
+    """Create a user through the register route and return a logged-in test client"""
+    def register(username, user_type='freelancer'):
+        client = app.test_client()
+        client.post('/register', data={'username': username, 'email': f'{username}@example.com',
+                                       'password': 'secret', 'user_type': user_type})
+        client.post('/login', data={'email': f'{username}@example.com', 'password': 'secret'})
+        return client
+    return register
+
@@ -0,0 +1,57 @@
+import atexit
+from app.audit import AuditWriter
+
+
+def _row(email, valid=True):
+    from app.models import EmailValidationLog
+    return (EmailValidationLog.__table__, {'email': email, 'is_valid': valid, 'action_type': 'login'})
+
+
+def _emails():
+    from app import db
+    from app.models import EmailValidationLog
+    return sorted(log.email for log in db.session.query(EmailValidationLog).all())
+
+
+def test_flush_writes_queued_rows_in_one_batch(app):
+    from app.models import EmailValidationLog
+    writer = AuditWriter(app)
+    writer.enabled = True
+    writer.flush_interval = 3600
+    for n in range(5):
+        writer.record(EmailValidationLog, email=f'u{n}@example.com', is_valid=True, action_type='login')
+    writer.close()
+    stats = writer.stats()
+    assert stats['written'] == 5 and stats['pending'] == 0
+    assert _emails() == [f'u{n}@example.com' for n in range(5)]
+
+
+def test_failed_write_is_retried(app, monkeypatch):
+    writer = AuditWriter(app)
+    writer.retry_backoff = 0
+    insert = writer._insert
+    failures = [RuntimeError('server has gone away')]
+    monkeypatch.setattr(writer, '_insert', lambda rows: failures.pop() if failures else insert(rows))
+    writer._write([_row('a@example.com'), _row('b@example.com')])
+    stats = writer.stats()
+    assert stats['retries'] == 1 and stats['errors'] == 0 and stats['dropped'] == 0
+    assert _emails() == ['a@example.com', 'b@example.com']
+
+
+def test_rejected_row_does_not_drop_the_batch(app):
+    writer = AuditWriter(app)
+    writer.retry_backoff = 0
+    writer._write([_row('a@example.com'), _row(None), _row('b@example.com')])
+    stats = writer.stats()
+    assert stats['retries'] == writer.write_attempts - 1
+    assert stats['errors'] == 1 and stats['dropped'] == 1 and stats['written'] == 2
+    assert _emails() == ['a@example.com', 'b@example.com']
+
+
+def test_exit_hook_is_registered_once(app, monkeypatch):
+    hooks = []
+    monkeypatch.setattr(atexit, 'register', hooks.append)
+    writer = AuditWriter()
+    for _ in range(3):
+        writer.init_app(app)
+    assert hooks == [writer.close]
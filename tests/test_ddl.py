@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app import db, ddl
+from app.models import User, create_all_views, create_email_validation_trigger
+
+
+def test_sqlite_triggers_reject_invalid_emails(app):
+    with pytest.raises(IntegrityError, match='Invalid email format'):
+        db.session.execute(text("INSERT INTO users (username, email, user_type) VALUES ('bob', 'bob@', 'freelancer')"))
+    db.session.rollback()
+
+    db.session.add(User(username='bob', email='bob@example.com', user_type='freelancer'))
+    db.session.commit()
+    with pytest.raises(IntegrityError, match='Invalid email format'):
+        db.session.execute(text("UPDATE users SET email = 'bob.example.com' WHERE username = 'bob'"))
+    db.session.rollback()
+
+
+def test_update_trigger_only_checks_changed_emails(app):
+    # A row that predates the triggers keeps working for updates that leave its email alone
+    db.session.execute(text('DROP TRIGGER validate_email_before_insert'))
+    db.session.execute(text("INSERT INTO users (username, email, user_type) VALUES ('old', 'legacy', 'freelancer')"))
+    create_email_validation_trigger()
+    User.adjust_unread_counts(db.session.query(User.id).filter_by(username='old').scalar(), messages=1)
+    db.session.commit()
+    assert db.session.query(User.unread_messages).filter_by(username='old').scalar() == 1
+
+
+def test_views_and_triggers_are_skipped_on_other_databases(app, monkeypatch):
+    monkeypatch.setattr(ddl, 'SUPPORTED_DIALECTS', ('mysql',))
+    create_all_views()
+    create_email_validation_trigger()
+    with pytest.raises(RuntimeError, match='run Collabify on MySQL'):
+        ddl.create_view('user_stats_view', 'SELECT 1')
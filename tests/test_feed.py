@@ -0,0 +1,28 @@
+from datetime import datetime
+
+
+def test_feed_pages_reach_every_open_job(app):
+    from app import db
+    from app.feed import get_open_jobs_page
+    from app.models import Job, User
+    recruiter = User(username='rita', email='rita@example.com', user_type='recruiter')
+    db.session.add(recruiter)
+    db.session.flush()
+    posted = datetime(2024, 1, 1)
+    # Ties on created_at are broken by id
+    db.session.add_all([
+        Job(title=f'Job {n}', description='work', recruiter_id=recruiter.id, created_at=posted,
+            status='closed' if n == 3 else 'open')
+        for n in range(7)
+    ])
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        page = get_open_jobs_page(cursor, per_page=2)
+        seen += [job['id'] for job in page.items]
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+    assert seen == sorted((job.id for job in Job.query.filter_by(status='open')), reverse=True)
+
@@ -0,0 +1,82 @@
+import re
+from app.models import User
+
+
+def inbox_order(client):
+    html = client.get('/messages').get_data(as_text=True)
+    return [int(conversation_id) for conversation_id in re.findall(r'href="/messages/(\d+)"', html)]
+
+
+def test_opening_a_conversation_keeps_inbox_order(app, register):
+    freelancer = register('freelancer1')
+    register('recruiter1', 'recruiter')
+    register('recruiter2', 'recruiter')
+    recruiter_ids = [User.query.filter_by(username=name).first().id for name in ('recruiter1', 'recruiter2')]
+
+    conversation_ids = []
+    for recruiter_id in recruiter_ids:
+        location = freelancer.get(f'/messages/new/{recruiter_id}').headers['Location']
+        conversation_id = int(location.rstrip('/').rsplit('/', 1)[-1])
+        freelancer.post(f'/messages/{conversation_id}/send', data={'content': 'Hello'})
+        conversation_ids.append(conversation_id)
+
+    recruiter = app.test_client()
+    recruiter.post('/login', data={'email': 'recruiter1@example.com', 'password': 'secret'})
+    before = inbox_order(freelancer)
+    assert before == list(reversed(conversation_ids))
+
+    # The recruiter reads the older thread, advancing its read watermark
+    recruiter.get(f'/messages/{conversation_ids[0]}')
+    assert inbox_order(freelancer) == before
+
+
+def test_require_column_fills_nulls_before_adding_the_constraint(app):
+    from datetime import datetime
+    from sqlalchemy import Column, DateTime, Integer, func
+    from sqlalchemy.orm import DeclarativeBase
+    from app import db
+    from app.models import require_column
+
+    class Base(DeclarativeBase):
+        pass
+
+    class LegacyConversation(Base):
+        """A conversations table from before updated_at was required"""
+        __tablename__ = 'legacy_conversations'
+        id = Column(Integer, primary_key=True)
+        created_at = Column(DateTime)
+        updated_at = Column(DateTime)
+
+    Base.metadata.create_all(db.engine)
+    started, touched = datetime(2024, 1, 1), datetime(2024, 6, 1)
+    db.session.add_all([
+        LegacyConversation(id=1, created_at=started, updated_at=touched),
+        LegacyConversation(id=2, created_at=started, updated_at=None),
+    ])
+    db.session.commit()
+
+    require_column(LegacyConversation.updated_at, func.coalesce(LegacyConversation.created_at, datetime.utcnow()))
+    rows = db.session.query(LegacyConversation.id, LegacyConversation.updated_at).order_by(LegacyConversation.id).all()
+    assert rows == [(1, touched), (2, started)]
+
+
+def test_inbox_pages_reach_every_conversation(app, register, monkeypatch):
+    from app import routes
+    monkeypatch.setattr(routes, 'INBOX_PAGE_SIZE', 2)
+    freelancer = register('freelancer1')
+    recruiter_ids = []
+    for n in range(5):
+        register(f'recruiter{n}', 'recruiter')
+        recruiter_ids.append(User.query.filter_by(username=f'recruiter{n}').first().id)
+    for recruiter_id in recruiter_ids:
+        freelancer.get(f'/messages/new/{recruiter_id}')
+
+    seen, cursor = [], None
+    while True:
+        html = freelancer.get('/messages' + (f'?cursor={cursor}' if cursor else '')).get_data(as_text=True)
+        seen += [int(conversation_id) for conversation_id in re.findall(r'href="/messages/(\d+)"', html)]
+        found = re.search(r'cursor=([\w-]+)', html)
+        if not found:
+            break
+        cursor = found.group(1)
+    assert sorted(seen) == sorted(set(seen)) and len(seen) == 5
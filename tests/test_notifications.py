@@ -0,0 +1,66 @@
+from app import db
+from app.models import Notification, User
+
+
+def _start_conversation(client, user_id):
+    location = client.get(f'/messages/new/{user_id}').headers['Location']
+    return int(location.rstrip('/').rsplit('/', 1)[-1])
+
+
+def _badge(user_id):
+    return db.session.query(User.unread_notifications).filter(User.id == user_id).scalar()
+
+
+def _unread(user_id):
+    return Notification.query.filter_by(user_id=user_id, is_read=False).order_by(Notification.id).all()
+
+
+def test_repeated_messages_bump_one_notification_per_conversation(app, register):
+    ann = register('ann')
+    register('rita', 'recruiter')
+    register('rob', 'recruiter')
+    rita = User.query.filter_by(username='rita').first()
+    rob = User.query.filter_by(username='rob').first()
+    to_rita = _start_conversation(ann, rita.id)
+    to_rob = _start_conversation(ann, rob.id)
+
+    for content in ('one', 'two', 'three'):
+        ann.post(f'/messages/{to_rita}/send', data={'content': content})
+    ann.post(f'/messages/{to_rob}/send', data={'content': 'hello'})
+
+    (notification,) = _unread(rita.id)
+    assert notification.event_count == 3 and notification.conversation_id == to_rita
+    assert _badge(rita.id) == 1
+    assert [n.conversation_id for n in _unread(rob.id)] == [to_rob]
+
+
+def test_a_read_notification_is_not_bumped(app, register):
+    ann = register('ann')
+    rita_client = register('rita', 'recruiter')
+    rita = User.query.filter_by(username='rita').first()
+    conversation_id = _start_conversation(ann, rita.id)
+
+    ann.post(f'/messages/{conversation_id}/send', data={'content': 'one'})
+    rita_client.get('/notifications')
+    assert _unread(rita.id) == [] and _badge(rita.id) == 0
+
+    ann.post(f'/messages/{conversation_id}/send', data={'content': 'two'})
+    (notification,) = _unread(rita.id)
+    assert notification.event_count == 1
+    assert Notification.query.filter_by(user_id=rita.id).count() == 2
+    assert _badge(rita.id) == 1
+
+
+def test_digest_mode_coalesces_across_conversations(app, register):
+    app.config['NOTIFICATION_DIGEST'] = True
+    register('rita', 'recruiter')
+    rita = User.query.filter_by(username='rita').first()
+    for username in ('ann', 'amy'):
+        sender = register(username)
+        conversation_id = _start_conversation(sender, rita.id)
+        sender.post(f'/messages/{conversation_id}/send', data={'content': 'hi'})
+
+    (notification,) = _unread(rita.id)
+    assert notification.event_count == 2 and notification.conversation_id is None
+    assert notification.message == 'New messages, latest from amy'
+    assert _badge(rita.id) == 1
@@ -0,0 +1,50 @@
+import pytest
+from app.pagination import decode_cursor, encode_cursor, paginate_sortable
+
+
+def _all_pages(query, sortable, id_column, sort, direction, per_page=2):
+    ids, cursor = [], None
+    while True:
+        page, sort, direction = paginate_sortable(query, sortable, id_column, sort=sort, direction=direction,
+                                                  cursor=cursor, per_page=per_page)
+        ids += [item.id for item in page.items]
+        if not page.has_next:
+            return ids
+        cursor = page.next_cursor
+
+
+def test_cursor_round_trip_keeps_types():
+    from datetime import datetime
+    stamp = datetime(2024, 5, 1, 12, 30)
+    assert decode_cursor(encode_cursor(stamp, None, 7)) == [stamp, None, 7]
+    assert decode_cursor('not a cursor!') is None
+
+
+@pytest.mark.parametrize('direction', ['asc', 'desc'])
+def test_null_sort_values_come_last_and_every_row_is_paged_once(app, direction):
+    from app import db
+    from app.models import Job, User
+    recruiter = User(username='rita', email='rita@example.com', user_type='recruiter')
+    db.session.add(recruiter)
+    db.session.flush()
+    budgets = [500, None, 100, None, 500, 300, None]
+    jobs = [Job(title=f'Job {n}', description='work', budget=budget, recruiter_id=recruiter.id)
+            for n, budget in enumerate(budgets)]
+    db.session.add_all(jobs)
+    db.session.commit()
+
+    descending = direction == 'desc'
+    priced = sorted((job for job in jobs if job.budget is not None),
+                    key=lambda job: (job.budget, job.id), reverse=descending)
+    unpriced = sorted((job for job in jobs if job.budget is None), key=lambda job: job.id, reverse=descending)
+    expected = [job.id for job in priced + unpriced]
+
+    for per_page in (1, 2, 3):
+        assert _all_pages(Job.query, {'budget': Job.budget}, Job.id, 'budget', direction, per_page) == expected
+
+
+def test_unknown_sort_falls_back_to_newest_id(app):
+    from app.models import User
+    page, sort, direction = paginate_sortable(User.query, {'name': User.username}, User.id, sort='password_hash')
+    assert (sort, direction) == ('id', 'desc')
+    assert [user.id for user in page.items] == sorted((user.id for user in User.query), reverse=True)
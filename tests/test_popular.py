@@ -0,0 +1,56 @@
+from app.popular import TopKCounter
+
+
+def test_top_k_is_exact_while_tracked_counts_cover_the_floor():
+    counter = TopKCounter(capacity=3)
+    counter.load([(1, 9), (2, 7), (3, 5)])
+    # A full load means an untracked id may have up to the last count
+    assert counter.top(2) == [(1, 9), (2, 7)]
+
+    # An untracked id at or below the floor cannot enter
+    counter.offer(5, 5)
+    assert 5 not in counter._counts
+    # One above it evicts the lowest, whose count becomes the floor
+    counter.offer(4, 6)
+    assert sorted(counter._counts) == [1, 2, 4] and counter._floor == 5
+    counter.offer(2, 11)
+    assert counter.top(3) == [(2, 11), (1, 9), (4, 6)]
+
+
+def test_top_k_asks_for_a_reload_when_a_tracked_count_drops_below_the_floor():
+    counter = TopKCounter(capacity=3)
+    counter.load([(1, 9), (2, 7), (3, 5)])
+    counter.offer(2, 4)
+    assert counter.top(2) == [(1, 9), (3, 5)]
+    assert counter.top(3) is None
+
+
+def test_partial_load_has_no_floor():
+    counter = TopKCounter(capacity=5)
+    counter.load([(1, 2), (2, 1)])
+    counter.offer(3, 1)
+    counter.discard(1)
+    assert counter.top(5) == [(3, 1), (2, 1)]
+
+
+def test_popular_jobs_follow_committed_applications(app):
+    from app import db
+    from app.models import Application, Job, User
+    from app.popular import get_popular_jobs
+
+    recruiter = User(username='rita', email='rita@example.com', user_type='recruiter')
+    freelancers = [User(username=f'ann{n}', email=f'ann{n}@example.com', user_type='freelancer') for n in range(3)]
+    db.session.add_all([recruiter, *freelancers])
+    db.session.flush()
+    jobs = [Job(title=f'Job {n}', description='work', recruiter_id=recruiter.id) for n in range(3)]
+    db.session.add_all(jobs)
+    db.session.commit()
+
+    for job, applicants in zip(jobs, (1, 3, 2)):
+        db.session.add_all(Application(job_id=job.id, freelancer_id=f.id) for f in freelancers[:applicants])
+    db.session.commit()
+    assert [(row.job_id, row.application_count) for row in get_popular_jobs(2)] == [(jobs[1].id, 3), (jobs[2].id, 2)]
+
+    db.session.delete(Application.query.filter_by(job_id=jobs[1].id).first())
+    db.session.commit()
+    assert [row.application_count for row in get_popular_jobs(3)] == [2, 2, 1]
@@ -0,0 +1,58 @@
+import pytest
+from werkzeug.security import generate_password_hash
+from app import db
+from app.instrumentation import query_budget
+from app.models import User, Job, Application, Conversation, Message
+
+ROWS = 8
+
+
+@pytest.fixture
+def clients(app):
+    """Logged-in clients for a recruiter, a freelancer and the admin, over ROWS jobs, applications and chats"""
+    password_hash = generate_password_hash('secret')
+    recruiter = User(username='rita', email='rita@example.com', user_type='recruiter', password_hash=password_hash)
+    freelancers = [User(username=f'fred{number}', email=f'fred{number}@example.com', user_type='freelancer',
+                        password_hash=password_hash) for number in range(ROWS)]
+    db.session.add_all([recruiter, *freelancers])
+    db.session.flush()
+    for number, freelancer in enumerate(freelancers):
+        job = Job(title=f'Job {number}', description='Work', budget=100, recruiter_id=recruiter.id)
+        db.session.add(job)
+        db.session.flush()
+        db.session.add_all([Application(job_id=job.id, freelancer_id=applicant.id, proposed_rate=40)
+                            for applicant in freelancers])
+        # Chats with freelancer 0, each with an unread message for them
+        other = recruiter if number == 0 else freelancer
+        conversation = Conversation(user1_id=freelancers[0].id, user2_id=other.id)
+        db.session.add(conversation)
+        db.session.flush()
+        message = Message(conversation_id=conversation.id, sender_id=other.id,
+                          receiver_id=freelancers[0].id, content='Hello')
+        db.session.add(message)
+        db.session.flush()
+        conversation.set_last_message(message)
+    db.session.commit()
+
+    logins = {'recruiter': ('rita@example.com', 'secret'), 'freelancer': ('fred0@example.com', 'secret'),
+              'admin': ('admin@colabify.com', 'admin123')}
+    clients = {}
+    for role, (email, password) in logins.items():
+        client = clients[role] = app.test_client()
+        client.post('/login', data={'email': email, 'password': password})
+    return clients
+
+
+# Statements per page however many rows it shows: the session's user, then the page's own queries
+@pytest.mark.parametrize('role, path, budget, shows', [
+    ('recruiter', '/applications', 2, 'fred7'),
+    ('freelancer', '/applications', 2, 'Job 7'),
+    ('admin', '/admin/jobs', 3, 'Job 7'),
+    ('admin', '/admin/applications', 3, 'fred7'),
+    ('freelancer', '/messages', 3, 'fred7'),
+])
+def test_page_stays_within_query_budget(clients, role, path, budget, shows):
+    with query_budget(budget, n_plus_one_threshold=3):
+        response = clients[role].get(path)
+    assert response.status_code == 200
+    assert shows in response.get_data(as_text=True)
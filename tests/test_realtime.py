@@ -0,0 +1,47 @@
+from app.realtime import ChatBroker
+
+
+class FakeSharedBackend:
+    shared = True
+
+    def __init__(self):
+        self.stamps = {}
+
+    def get_stamp(self, key):
+        return self.stamps.get(key)
+
+    def update_stamp(self, key, fields):
+        self.stamps.setdefault(key, {}).update(fields)
+
+
+def test_memory_broker_never_skips_the_database(app):
+    broker = ChatBroker(app)
+    broker.update_stamp(1, (10, 20), 5, read_by=10)
+    assert not broker.shared
+    assert not broker.is_up_to_date(1, 10, 5)
+
+
+def test_shared_broker_skips_idle_polls(app):
+    broker = ChatBroker(app)
+    broker._backend = FakeSharedBackend()
+    broker.update_stamp(1, (10, 20), 5, read_by=10)
+    assert broker.is_up_to_date(1, 10, 5)
+    assert not broker.is_up_to_date(1, 10, 4)
+
+
+def test_stamped_idle_poll_runs_no_queries(app, register, monkeypatch):
+    from app import broker
+    from app.instrumentation import query_budget
+    monkeypatch.setattr(broker, '_backend', FakeSharedBackend())
+    fred = register('fred')
+    rita = register('rita', 'recruiter')
+    fred.get('/messages/new/3')
+    rita.post('/messages/1/send', data={'content': 'hello'})
+    latest = fred.get('/messages/1/fetch?last_message_id=0').get_json()['messages'][-1]['id']
+
+    with query_budget(0):
+        response = fred.get(f'/messages/1/fetch?last_message_id={latest}')
+    assert response.get_json() == {'messages': []}
+
+    # Without a logged-in session the poll still goes through @login_required
+    assert app.test_client().get(f'/messages/1/fetch?last_message_id={latest}').status_code == 302
@@ -0,0 +1,97 @@
+from app.recommend import JobRecommender
+
+JOBS = [
+    (1, 'python, flask', 'Build a Flask API', 'open'),
+    (2, 'python, django', 'Django admin work', 'open'),
+    (3, 'react', 'Frontend for a Flask API', 'open'),
+]
+
+
+def test_updating_a_job_keeps_idf():
+    recommender = JobRecommender()
+    recommender.build(JOBS)
+    terms = ['python', 'flask', 'react', 'api']
+    before = [recommender.idf(term) for term in terms]
+
+    for status in ('in_progress', 'open'):
+        recommender.add(1, 'python, flask', 'Build a Flask API', status)
+    assert [recommender.idf(term) for term in terms] == before
+
+
+def test_removed_rows_are_compacted_and_snapshots_stay_intact():
+    recommender = JobRecommender()
+    recommender.build(JOBS)
+    matrix, job_ids, is_open, row_for_job = recommender._snapshot()
+
+    for _ in range(3):
+        recommender.add(1, 'python, flask', 'Build a Flask API', 'open')
+    recommender._snapshot()
+
+    # The snapshot handed out earlier never changes underneath its reader
+    assert list(job_ids) == [1, 2, 3] and is_open.all()
+    # Re-adding retired rows past COMPACT_RATIO dropped them from the matrix
+    assert recommender._matrix.shape[0] < 3 + 3
+    assert [job_id for job_id, score in recommender.recommend([2], k=5)] == [1]
+
+
+def test_catch_up_finds_jobs_other_workers_committed_in_between(app):
+    from datetime import datetime
+    from app import db
+    from app.models import Job, User
+    from app.recommend import ensure_recommender, recommender
+
+    recruiter = User(username='rita', email='rita@example.com', user_type='recruiter')
+    db.session.add(recruiter)
+    db.session.add(Job(title='API', description='Build a Flask API', skills_required='python, flask', recruiter_id=1))
+    db.session.commit()
+    ensure_recommender()
+
+    # Another worker: plain statements this process's listeners never see
+    now = datetime.utcnow()
+    db.session.execute(Job.__table__.insert().values(
+        id=2, title='ETL', description='Flask pipelines', skills_required='python', recruiter_id=recruiter.id,
+        status='open', created_at=now, updated_at=now
+    ))
+    db.session.commit()
+    db.session.add(Job(id=3, title='Bot', description='Flask chat bot', skills_required='python', recruiter_id=1))
+    db.session.commit()
+    ensure_recommender()
+    assert [job_id for job_id, score in recommender.recommend([1], k=5)] == [2, 3]
+
+    db.session.execute(Job.__table__.update().where(Job.id == 2).values(status='completed', updated_at=datetime.utcnow()))
+    db.session.commit()
+    ensure_recommender()
+    assert [job_id for job_id, score in recommender.recommend([1], k=5)] == [3]
+
+
+def test_precomputed_recommendations_skip_jobs_that_closed(app):
+    from app import db
+    from app.models import Application, Job, User
+    from app.recommend import precompute_recommendations, recommend_jobs
+
+    recruiter = User(username='rita', email='rita@example.com', user_type='recruiter')
+    freelancer = User(username='ann', email='ann@example.com', user_type='freelancer')
+    db.session.add_all([recruiter, freelancer])
+    db.session.flush()
+    db.session.add_all([
+        Job(id=job_id, skills_required=skills, title=description, description=description, status=status,
+            recruiter_id=recruiter.id)
+        for job_id, skills, description, status in JOBS
+    ])
+    db.session.add(Application(job_id=1, freelancer_id=freelancer.id))
+    db.session.commit()
+    assert precompute_recommendations() == 1
+    assert sorted(job_id for job_id, score in recommend_jobs(freelancer.id)) == [2, 3]
+
+    db.session.get(Job, 2).status = 'in_progress'
+    db.session.commit()
+    assert [job_id for job_id, score in recommend_jobs(freelancer.id)] == [3]
+
+
+def test_app_startup_warms_the_recommender(app, monkeypatch):
+    from app import create_app
+    from app.recommend import recommender
+    recommender._reset()
+    monkeypatch.setenv('WARM_JOB_INDEXES', '1')
+    create_app()
+    assert recommender.built
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+
+def _seed():
+    from app import db
+    from app.models import User, Conversation, Message, Notification
+    old = datetime.utcnow() - timedelta(days=400)
+    ann = User(username='ann', email='ann@example.com', user_type='freelancer')
+    bob = User(username='bob', email='bob@example.com', user_type='recruiter')
+    db.session.add_all([ann, bob])
+    db.session.flush()
+    db.session.add_all([
+        Notification(user_id=ann.id, message='read', is_read=True, last_seen_at=old),
+        Notification(user_id=ann.id, message='unread', is_read=False, last_seen_at=old),
+        Notification(user_id=ann.id, message='recent', is_read=True),
+    ])
+    conversation = Conversation(user1_id=ann.id, user2_id=bob.id)
+    db.session.add(conversation)
+    db.session.flush()
+    messages = [
+        Message(conversation_id=conversation.id, sender_id=bob.id, receiver_id=ann.id,
+                content=f'hi {n}', created_at=old)
+        for n in range(3)
+    ]
+    db.session.add_all(messages)
+    db.session.flush()
+    # ann has read the first two; the third is unread and backs the inbox summary
+    conversation.user1_last_read_id = messages[1].id
+    conversation.last_message_id = messages[2].id
+    db.session.commit()
+
+
+def test_defaults_archive_old_read_notifications_and_keep_messages(app):
+    from app import db
+    from app.models import Notification, Message, notifications_archive
+    from app.retention import apply_retention
+    _seed()
+    results = dict(apply_retention(pause=0))
+    assert results == {'notifications': 1, 'email_validation_logs': 0}
+    assert sorted(n.message for n in Notification.query.all()) == ['recent', 'unread']
+    archived = db.session.execute(db.select(notifications_archive.c.message)).scalars().all()
+    assert archived == ['read']
+    assert Message.query.count() == 3
+
+
+def test_message_retention_is_opt_in_and_keeps_unread_and_latest(app):
+    from app import db
+    from app.models import Message, messages_archive
+    from app.retention import apply_retention
+    _seed()
+    results = dict(apply_retention({'messages': 365}, only=('messages',), chunk_size=1, pause=0))
+    assert results == {'messages': 2}
+    assert [m.content for m in Message.query.all()] == ['hi 2']
+    archived = db.session.execute(db.select(messages_archive.c.content)).scalars().all()
+    assert sorted(archived) == ['hi 0', 'hi 1']
+
+
+def test_dry_run_only_counts(app):
+    from app.models import Notification
+    from app.retention import apply_retention
+    _seed()
+    assert apply_retention(only=('notifications',), dry_run=True) == [('notifications', 1)]
+    assert Notification.query.count() == 3
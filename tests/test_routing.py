@@ -0,0 +1,107 @@
+import pytest
+from app import db, replicas
+from app.models import Job, User
+from app.search import search_index
+
+
+@pytest.fixture(autouse=True)
+def replica_url(tmp_path, monkeypatch):
+    # A replica that has the schema but none of the primary's rows: maximally lagging
+    monkeypatch.setenv('DATABASE_REPLICA_URLS', f'sqlite:///{tmp_path}/replica.db')
+
+
+@pytest.fixture
+def replica(app):
+    engine = db.engines['replica0']
+    db.Model.metadata.create_all(engine, tables=[
+        table for table in db.Model.metadata.sorted_tables if not table.info.get('is_view')
+    ])
+    # Read-your-writes would send every read after the register/login POSTs to the primary
+    replicas.sticky_seconds = 0
+    return engine
+
+
+def test_search_keeps_indexed_jobs_a_lagging_replica_lacks(app, replica, register):
+    client = register('fred')
+    recruiter = User(username='rita', email='rita@example.com', user_type='recruiter')
+    db.session.add(recruiter)
+    db.session.flush()
+    db.session.add(Job(title='Python API', description='python work', recruiter_id=recruiter.id))
+    db.session.commit()
+
+    response = client.get('/jobs/search?q=python')
+    assert response.status_code == 200
+    assert b'Python API' in response.data
+    assert replicas.stats()['replica_reads']
+    assert [job_id for job_id, score in search_index.search('python')] == [1]
+
+
+def test_chat_views_that_mark_read_use_the_primary(app, replica, register):
+    from app.models import Conversation, Message
+    fred = register('fred')
+    rita = register('rita', 'recruiter')
+    fred.get('/messages/new/3')
+    rita.post('/messages/1/send', data={'content': 'hello'})
+    db.session.commit()
+    replica_reads = replicas.stats()['replica_reads']
+
+    assert fred.get('/messages/1').status_code == 200
+    assert fred.get('/messages/1/fetch?last_message_id=0').status_code == 200
+    assert replicas.stats()['replica_reads'] == replica_reads
+    conversation = db.session.get(Conversation, 1)
+    assert conversation.get_last_read_id(2) == db.session.query(Message.id).scalar()
+
+
+def _reads():
+    stats = replicas.stats()
+    return stats['replica_reads'], stats['primary_reads'], stats['fallbacks']
+
+
+def _delta(before):
+    return tuple(after - start for after, start in zip(_reads(), before))
+
+
+def test_read_replica_views_read_from_a_healthy_replica(app, replica, register):
+    client = register('fred')
+    before = _reads()
+    assert client.get('/messages').status_code == 200
+    replica_reads, primary_reads, fallbacks = _delta(before)
+    assert replica_reads and not primary_reads and not fallbacks
+
+    # Views without the decorator never touch the replica
+    before = _reads()
+    assert client.get('/notifications').status_code == 200
+    assert _delta(before)[0] == 0
+
+
+def test_a_session_reads_its_own_writes_from_the_primary(app, replica, register):
+    replicas.sticky_seconds = 60
+    client = register('fred')
+    before = _reads()
+    assert client.get('/messages').status_code == 200
+    replica_reads, primary_reads, fallbacks = _delta(before)
+    assert not replica_reads and primary_reads
+
+    # Another browser session that has not written still uses the replica
+    other = app.test_client()
+    other.post('/login', data={'email': 'fred@example.com', 'password': 'secret'})
+    with other.session_transaction() as session:
+        session.pop('_primary_until', None)
+    before = _reads()
+    other.get('/messages')
+    assert _delta(before)[0]
+
+
+@pytest.mark.parametrize('lag', [None, 60.0])
+def test_lagging_or_broken_replicas_fall_back_to_the_primary(app, replica, register, monkeypatch, lag):
+    client = register('fred')
+    measured = []
+    monkeypatch.setattr(replicas, '_lag', {})
+    monkeypatch.setattr(replicas, '_measure_lag', lambda engine: measured.append(engine) or lag)
+    before = _reads()
+    client.get('/messages')
+    client.get('/messages')
+    replica_reads, primary_reads, fallbacks = _delta(before)
+    assert not replica_reads and fallbacks
+    # Lag is re-measured at most every REPLICA_LAG_CHECK_INTERVAL seconds
+    assert len(measured) == 1
@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+import pytest
+from app import schema
+
+
+def test_migrations_are_numbered_in_order():
+    versions = [version for version, name, apply in schema.MIGRATIONS]
+    names = [name for version, name, apply in schema.MIGRATIONS]
+    assert versions == list(range(1, len(versions) + 1))
+    assert len(set(names)) == len(names)
+
+
+def test_bootstrap_applies_only_pending_migrations_in_order(app, monkeypatch):
+    assert schema.pending_migrations() == []
+    applied = []
+    # List order is the apply order
+    monkeypatch.setattr(schema, 'MIGRATIONS', schema.MIGRATIONS + [
+        (100, 'second', lambda: applied.append('second')),
+        (99, 'first', lambda: applied.append('first')),
+    ])
+    assert schema.pending_migrations() == [(100, 'second'), (99, 'first')]
+    assert schema.bootstrap_schema() == ['second', 'first']
+    assert applied == ['second', 'first']
+    assert schema.bootstrap_schema() == [] and applied == ['second', 'first']
+
+
+def test_a_failed_migration_stays_pending_and_stops_the_rest(app, monkeypatch):
+    calls = []
+
+    def flaky():
+        calls.append('flaky')
+        if len(calls) == 1:
+            raise RuntimeError('lock wait timeout')
+
+    monkeypatch.setattr(schema, 'MIGRATIONS', schema.MIGRATIONS + [
+        (99, 'flaky', flaky),
+        (100, 'after', lambda: calls.append('after')),
+    ])
+    with pytest.raises(RuntimeError):
+        schema.bootstrap_schema()
+    assert calls == ['flaky']
+    assert schema.pending_migrations() == [(99, 'flaky'), (100, 'after')]
+
+    assert schema.bootstrap_schema() == ['flaky', 'after']
+    assert calls == ['flaky', 'flaky', 'after']
+
+
+def test_applied_versions_are_read_under_the_lock(app, monkeypatch):
+    events = []
+
+    @contextmanager
+    def recording_lock():
+        events.append('locked')
+        yield
+        events.append('released')
+
+    applied_versions = schema.applied_versions
+    monkeypatch.setattr(schema, 'schema_lock', recording_lock)
+    monkeypatch.setattr(schema, 'applied_versions', lambda: events.append('read') or applied_versions())
+    schema.bootstrap_schema()
+    assert events == ['locked', 'read', 'released']
@@ -0,0 +1,65 @@
+import threading
+import time
+from app import search
+
+
+def test_repeated_schedules_arm_one_timer(app, monkeypatch):
+    saves = []
+    monkeypatch.setattr(search, 'save_search_index', lambda force=False: saves.append(force))
+    monkeypatch.setitem(search._state, 'save_interval', 3600)
+    monkeypatch.setitem(search._state, 'last_saved', time.monotonic())
+    monkeypatch.setitem(search._state, 'timer', None)
+    before = threading.active_count()
+    for _ in range(20):
+        search._schedule_save()
+    timer = search._state['timer']
+    assert timer is not None and timer.is_alive()
+    assert threading.active_count() == before + 1
+    assert search._state['dirty']
+    timer.cancel()
+    timer.join()
+    assert saves == []
+
+
+def test_catch_up_finds_jobs_other_workers_committed_in_between(app):
+    from datetime import datetime
+    from app import db
+    from app.models import Job, User
+    from app.search import catch_up_search_index, search_index
+
+    recruiter = User(username='rita', email='rita@example.com', user_type='recruiter')
+    db.session.add(recruiter)
+    db.session.add(Job(title='Python API', description='python work', recruiter_id=1))
+    db.session.commit()
+    catch_up_search_index()
+
+    # Another worker: a plain insert this process's listeners never see
+    now = datetime.utcnow()
+    db.session.execute(Job.__table__.insert().values(
+        id=2, title='Python ETL', description='python pipelines', recruiter_id=recruiter.id,
+        status='open', created_at=now, updated_at=now
+    ))
+    db.session.commit()
+    db.session.add(Job(id=3, title='Python bot', description='python chat', recruiter_id=recruiter.id))
+    db.session.commit()
+
+    catch_up_search_index()
+    assert sorted(job_id for job_id, score in search_index.search('python')) == [1, 2, 3]
+
+    # An edit from another worker is picked up as well
+    db.session.execute(Job.__table__.update().where(Job.id == 2).values(
+        title='Rust ETL', description='rust pipelines', updated_at=datetime.utcnow()
+    ))
+    db.session.commit()
+    catch_up_search_index()
+    assert sorted(job_id for job_id, score in search_index.search('python')) == [1, 3]
+
+
+def test_exit_snapshot_hook_is_registered_once(app, monkeypatch):
+    import atexit
+    hooks = []
+    monkeypatch.setattr(atexit, 'register', lambda *args, **kwargs: hooks.append(args))
+    monkeypatch.setitem(search._state, 'exit_hook', False)
+    for _ in range(3):
+        search.init_search(app)
+    assert hooks == [(search.save_search_index,)]
@@ -0,0 +1,83 @@
+from datetime import datetime
+from app import db
+from app.models import Job, Skill, User, job_skills
+from app.skills import Bitmap, SkillIndex, ensure_skill_index, skill_index
+
+
+def test_catch_up_finds_jobs_other_workers_committed_in_between(app):
+    recruiter = User(username='rita', email='rita@example.com', user_type='recruiter')
+    db.session.add(recruiter)
+    db.session.add(Job(title='API', description='Flask API', recruiter_id=1, skills=Skill.for_names(['python'])))
+    db.session.commit()
+    ensure_skill_index()
+
+    # Another worker: plain statements this process's listeners never see
+    now = datetime.utcnow()
+    db.session.execute(Job.__table__.insert().values(
+        id=2, title='ETL', description='Pipelines', recruiter_id=recruiter.id,
+        status='open', created_at=now, updated_at=now
+    ))
+    db.session.execute(job_skills.insert().values(job_id=2, skill_id=1))
+    db.session.commit()
+    db.session.add(Job(id=3, title='Bot', description='Chat bot', recruiter_id=1, skills=Skill.for_names(['python'])))
+    db.session.commit()
+    ensure_skill_index()
+    assert list(skill_index.match(all_of=['python']).iter_descending()) == [3, 2, 1]
+
+    db.session.execute(Job.__table__.update().where(Job.id == 2).values(status='completed', updated_at=datetime.utcnow()))
+    db.session.commit()
+    ensure_skill_index()
+    assert list(skill_index.match(all_of=['python']).iter_descending()) == [3, 1]
+
+
+def test_app_startup_warms_the_skill_index(app, monkeypatch):
+    from app import create_app
+    skill_index._reset()
+    monkeypatch.setenv('WARM_JOB_INDEXES', '1')
+    create_app()
+    assert skill_index.built
+
+
+def test_bitmap_set_operations_across_chunks():
+    # Members on both sides of several 4096-bit chunk boundaries
+    evens = Bitmap()
+    small = Bitmap()
+    for value in range(0, 10000, 2):
+        evens.add(value)
+    for value in (1, 4094, 4096, 8193, 9998, 50000):
+        small.add(value)
+
+    assert len(evens) == 5000 and 4096 in evens and 4097 not in evens
+    assert list((evens & small).iter_descending()) == [9998, 4096, 4094]
+    union = evens | small
+    assert len(union) == 5000 + 3 and 50000 in union and 8193 in union
+    assert list(small.iter_descending()) == [50000, 9998, 8193, 4096, 4094, 1]
+
+    # Emptying a chunk drops it, and copies are independent
+    copy = small.copy()
+    small.discard(50000)
+    small.discard(12345)
+    assert 50000 not in small and 50000 in copy
+    assert 50000 >> Bitmap.CHUNK_BITS not in small._chunks
+    assert not (Bitmap() & evens) and not Bitmap()
+
+
+def test_skill_index_and_or_filters():
+    index = SkillIndex()
+    index.add(1, ['python', 'flask'])
+    index.add(2, ['python', 'django'])
+    index.add(3, ['react'])
+    index.add(4, ['python', 'flask'], status='completed')
+
+    assert list(index.match(all_of=['python']).iter_descending()) == [2, 1]
+    assert list(index.match(all_of=['python'], any_of=['flask', 'react']).iter_descending()) == [1]
+    assert list(index.match(any_of=['django', 'react']).iter_descending()) == [3, 2]
+    assert list(index.match(all_of=['python', 'flask'], open_only=False).iter_descending()) == [4, 1]
+    assert not index.match(all_of=['python', 'rust'])
+
+    # Re-indexing without names keeps the skills; removing drops the job everywhere
+    index.add(1, status='in_progress')
+    assert list(index.match(all_of=['flask'], open_only=False).iter_descending()) == [4, 1]
+    assert list(index.match(all_of=['flask']).iter_descending()) == []
+    index.remove(3)
+    assert 'react' not in index._bitmaps and len(index) == 3
@@ -0,0 +1,56 @@
+from sqlalchemy import text
+from app import db
+from app.models import User, SummaryStat
+from app.stats import (
+    _update_or_insert_stat, compute_summary_stats, get_dashboard_stats, rebuild_summary_stats,
+    shard_summary_stats, stored_summary_stats
+)
+
+
+def test_sharded_counters_sum_to_the_base_tables(app, register):
+    freelancer = register('freelancer1')
+    register('recruiter1', 'recruiter')
+    recruiter_id = User.query.filter_by(username='recruiter1').first().id
+    location = freelancer.get(f'/messages/new/{recruiter_id}').headers['Location']
+    for number in range(30):
+        freelancer.post(f'{location}/send', data={'content': f'Message {number}'})
+
+    assert db.session.query(SummaryStat).filter_by(scope='messages').count() > 1
+    stats = get_dashboard_stats()
+    assert stats['total_messages'] == 30
+    assert stats['total_users'] == 2
+    assert rebuild_summary_stats() == []
+
+
+def test_shard_migration_recreates_a_pre_slot_table(app):
+    db.session.execute(text('DROP TABLE summary_stats'))
+    db.session.execute(text(
+        'CREATE TABLE summary_stats (scope VARCHAR(20), bucket VARCHAR(20), row_count INTEGER, '
+        'amount_count INTEGER, amount_total FLOAT, PRIMARY KEY (scope, bucket))'
+    ))
+    db.session.commit()
+    shard_summary_stats()
+    assert get_dashboard_stats()['total_users'] == 0
+    assert rebuild_summary_stats() == []
+
+
+def test_portable_fallback_inserts_then_adds_to_a_slot(app):
+    connection = db.session.connection()
+    for _ in range(2):
+        _update_or_insert_stat(connection, SummaryStat.__table__, {
+            'scope': 'jobs', 'bucket': 'open', 'slot': 3, 'row_count': 1, 'amount_count': 1, 'amount_total': 50.0
+        })
+    db.session.commit()
+    assert stored_summary_stats()[('jobs', 'open')] == (2, 2, 100.0)
+
+
+def test_rebuild_adds_the_drift_instead_of_replacing_rows(app):
+    db.session.add(SummaryStat(scope='users', bucket='recruiter', slot=5, row_count=7))
+    db.session.commit()
+
+    drift = rebuild_summary_stats()
+    assert [key for key, found, expected in drift] == [('users', 'recruiter')]
+    # The corrupted slot stays; an added correction cancels it
+    assert db.session.get(SummaryStat, ('users', 'recruiter', 5)) is not None
+    assert stored_summary_stats().get(('users', 'recruiter'), (0, 0, 0.0))[0] == 0
+    assert {key: value for key, value in stored_summary_stats().items() if value[0]} == compute_summary_stats()